@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Compares per log `LogBet` decoding (as done by `Etheroll.get_bets_logs()`)
+with `BetsColumns` batch decoding, example usage:
+```
+python benchmarks/bench_batch_decoder.py --count 100000
+```
+"""
+import argparse
+import random
+import time
+
+from hexbytes.main import HexBytes
+
+from pyetheroll.batch_decoder import BetsColumns
+from pyetheroll.transaction_debugger import TransactionDebugger
+
+LOG_BET_ABI = {
+    "inputs": [
+        {"indexed": True, "type": "bytes32", "name": "BetID"},
+        {"indexed": True, "type": "address", "name": "PlayerAddress"},
+        {"indexed": True, "type": "uint256", "name": "RewardValue"},
+        {"indexed": False, "type": "uint256", "name": "ProfitValue"},
+        {"indexed": False, "type": "uint256", "name": "BetValue"},
+        {"indexed": False, "type": "uint256", "name": "PlayerNumber"},
+        {"indexed": False, "type": "uint256", "name": "RandomQueryID"},
+    ],
+    "type": "event",
+    "name": "LogBet",
+    "anonymous": False,
+}
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser(description="LogBet decoding benchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    return parser.parse_args()
+
+
+def word(value):
+    return "%064x" % value
+
+
+def random_logs(count):
+    transaction_debugger = TransactionDebugger([LOG_BET_ABI])
+    topic0 = transaction_debugger.methods_infos["LogBet"]["sha3"].hex()
+    logs = []
+    for i in range(count):
+        bet_value = random.randint(10 ** 16, 10 ** 19)
+        profit_value = random.randint(10 ** 15, 10 ** 20)
+        logs.append(
+            {
+                "blockNumber": hex(5000000 + i),
+                "data": "0x"
+                + word(profit_value)
+                + word(bet_value)
+                + word(random.randint(2, 99))
+                + word(i),
+                "logIndex": hex(i % 200),
+                "timeStamp": hex(1523060226 + i),
+                "topics": [
+                    topic0,
+                    "0x" + word(random.getrandbits(256)),
+                    "0x" + word(random.getrandbits(160)),
+                    "0x" + word(bet_value + profit_value),
+                ],
+                "transactionHash": "0x" + word(random.getrandbits(256)),
+            }
+        )
+    return logs
+
+
+def decode_per_log(logs):
+    transaction_debugger = TransactionDebugger([LOG_BET_ABI])
+    for log in logs:
+        topics = [HexBytes(topic) for topic in log["topics"]]
+        transaction_debugger.decode_method(topics, log["data"])
+
+
+def decode_batch(logs):
+    BetsColumns.from_logs(LOG_BET_ABI, logs)
+
+
+def timeit(function, logs):
+    start = time.perf_counter()
+    function(logs)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_arg()
+    logs = random_logs(args.count)
+    per_log = timeit(decode_per_log, logs)
+    batch = timeit(decode_batch, logs)
+    print(f"per log: {per_log:.3f}s")
+    print(f"batch:   {batch:.3f}s ({per_log / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Compares the scalar `EtherollUtils.compute_profit()` with the NumPy
+`EtherollUtils.compute_profits()` over a bet sizes by chances payout table,
+example usage:
+```
+python benchmarks/bench_compute_profit.py --bet-sizes 100000
+```
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pyetheroll.utils import EtherollUtils
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser(description="Profit computing benchmark")
+    parser.add_argument("--bet-sizes", type=int, default=100000)
+    return parser.parse_args()
+
+
+def compute_scalar(bet_sizes, chances_win):
+    for bet_size in bet_sizes.tolist():
+        for chances in chances_win.tolist():
+            EtherollUtils.compute_profit(bet_size, chances)
+
+
+def compute_vectorized(bet_sizes, chances_win):
+    EtherollUtils.compute_profits(bet_sizes[:, np.newaxis], chances_win)
+
+
+def timeit(function, bet_sizes, chances_win):
+    start = time.perf_counter()
+    function(bet_sizes, chances_win)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_arg()
+    bet_sizes = np.arange(1, args.bet_sizes + 1) / 1000
+    chances_win = np.arange(1, 100)
+    evaluations = len(bet_sizes) * len(chances_win)
+    scalar = timeit(compute_scalar, bet_sizes, chances_win)
+    vectorized = timeit(compute_vectorized, bet_sizes, chances_win)
+    print(f"scalar:     {scalar:.3f}s ({evaluations / scalar:,.0f}/s)")
+    print(
+        f"vectorized: {vectorized:.3f}s ({evaluations / vectorized:,.0f}/s, "
+        f"{scalar / vectorized:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
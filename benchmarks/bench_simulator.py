@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Measures the simulator rolls per second on one process versus all cores,
+example usage:
+```
+python benchmarks/bench_simulator.py --sessions 100000 --rolls 1000
+```
+"""
+import argparse
+import os
+import time
+
+from pyetheroll.simulator import MartingaleStrategy, Simulator
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser(description="Simulator benchmark")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--rolls", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    return parser.parse_args()
+
+
+def timeit(simulator, sessions, rolls, processes):
+    start = time.perf_counter()
+    simulator.run(sessions, rolls, seed=0, processes=processes)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_arg()
+    simulator = Simulator(MartingaleStrategy(0.1), roll_under=50, bankroll=10)
+    rolls = args.sessions * args.rolls
+    single = timeit(simulator, args.sessions, args.rolls, 1)
+    multi = timeit(simulator, args.sessions, args.rolls, args.processes)
+    print(f"1 process:   {single:.3f}s ({rolls / single:,.0f} rolls/s)")
+    print(
+        f"{args.processes} processes: {multi:.3f}s "
+        f"({rolls / multi:,.0f} rolls/s, {single / multi:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Compares per transaction `playerRollDice` filtering and decoding (as done
+by `Etheroll.iter_bets_transactions()`) with `PlayerRollDiceParser` page
+parsing, example usage:
+```
+python benchmarks/bench_transactions_parser.py --count 10000
+```
+"""
+import argparse
+import random
+import time
+
+from pyetheroll.batch_decoder import PlayerRollDiceParser
+from pyetheroll.etheroll import decode_bet_transaction
+
+CONTRACT_ADDRESS = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+PLAYER_ROLL_DICE_METHOD_ID = "0xdc6dd152"
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser(
+        description="Transactions page parsing benchmark"
+    )
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    return parser.parse_args()
+
+
+def word(value):
+    return "%064x" % value
+
+
+def random_transactions(count):
+    transactions = []
+    for i in range(count):
+        # one transaction out of ten isn't a bet
+        if i % 10:
+            to = CONTRACT_ADDRESS.lower()
+            roll_under = random.randint(2, 99)
+            call_data = PLAYER_ROLL_DICE_METHOD_ID + word(roll_under)
+        else:
+            to = "0x" + "%040x" % random.getrandbits(160)
+            call_data = "0x"
+        transactions.append(
+            {
+                "blockNumber": str(5000000 + count - i),
+                "hash": "0x" + word(random.getrandbits(256)),
+                "input": call_data,
+                "timeStamp": str(1523060226 + count - i),
+                "to": to,
+                "value": str(random.randint(10 ** 16, 10 ** 19)),
+            }
+        )
+    return transactions
+
+
+def is_player_roll_dice_tx(transaction):
+    """Per transaction filter, as done before the page parser."""
+    return transaction["to"].lower() == CONTRACT_ADDRESS.lower() and (
+        transaction["input"].lower().startswith(PLAYER_ROLL_DICE_METHOD_ID)
+    )
+
+
+def parse_per_transaction(transactions):
+    transactions = filter(is_player_roll_dice_tx, transactions)
+    return tuple(map(decode_bet_transaction, transactions))
+
+
+def parse_page(transactions):
+    parser = PlayerRollDiceParser(CONTRACT_ADDRESS, PLAYER_ROLL_DICE_METHOD_ID)
+    return parser.parse(transactions)
+
+
+def parse_page_records(transactions):
+    return parse_page(transactions).to_records()
+
+
+def timeit(function, transactions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(transactions)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    args = parse_arg()
+    transactions = random_transactions(args.count)
+    assert parse_page_records(transactions) == parse_per_transaction(
+        transactions
+    )
+    per_transaction = timeit(parse_per_transaction, transactions, args.repeat)
+    columns = timeit(parse_page, transactions, args.repeat)
+    records = timeit(parse_page_records, transactions, args.repeat)
+    print(f"per transaction: {per_transaction * 1000:.1f}ms")
+    print(
+        f"page columns:    {columns * 1000:.1f}ms "
+        f"({per_transaction / columns:.1f}x)"
+    )
+    print(
+        f"page records:    {records * 1000:.1f}ms "
+        f"({per_transaction / records:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
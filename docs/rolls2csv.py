@@ -1,61 +1,212 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-Dumps last rolls to a CSV file, example usage:
+Dumps players rolls to a CSV file, example usage:
 ```
-./roll2csv --address 0x706a62cae6c65472cce04a8d013156d071f8c998 --csv rolls.csv
+./rolls2csv.py --address 0x706a62cae6c65472cce04a8d013156d071f8c998 \
+    --csv rolls.csv
 ```
+Or the full history of all the players listed in a file, one address per
+line, fetched concurrently:
+```
+./rolls2csv.py --addresses players.txt --csv rolls.csv --workers 8
+```
+Rows are written as they're fetched and, with `--addresses` or
+`--progress`, completed players are recorded to a progress file
+(`rolls.csv.progress` by default). An interrupted run then resumes with the
+remaining players only, dropping their partially written rows.
+Players failing to fetch are reported and left for the next run.
+Etherscan only serves the last 10000 transactions of a player, players
+reaching that limit are reported as their older rolls may be missing.
 Results example:
 ```
 Transaction hash,Date time,Bet size,Roll under
 0x5ccf0ee807ddbecfbfc8355478a7dfb0f562ac8f7d1a89e7699c3d9d17909120,4864-12-05 15:17:44,0.19,2
 0x51ca16cb583e7a9200524c8b34e89bbc543bb11f890811721e1948fd77b7c555,4864-12-05 15:15:17,0.1,3
 0xf932cd98955b3deb0fb96075c9f109455c3d763f75468655ddfe6d5d0fa951ba,4864-12-05 15:12:41,0.1,3
-0x4c93791068933692bd1f85cf8cba0bb0d7fdd78f9d5a457752243e0ec358a747,4864-12-05 14:42:56,0.5,12
-0x84809637b0f796bb53be439107557698bf7a09cfedb4286ff11f470340a24ee1,4864-12-05 14:41:58,0.5,3
-0x88a2429790e10f81136df14da4b8d6595e6de7e6a94bb3f8d8e92d42965100a2,4864-12-05 14:39:16,0.5,3
-0x30a914c957750c22e3005e5028531c2799175741c10d660733ef3b1a66bf9740,4864-12-05 14:21:52,0.5,3
-0x3d1d8b57a4c95ea0dab95c274fc5ebd47f8b8abc59ea54800db69c4b44a83b6a,4864-12-05 14:21:13,2.0,7
-0x3ca253933a9a51f7d4e6f7ec718f83bed1b213a60cc37188a897686f46efb38c,4864-12-05 14:17:28,2.0,11
 ```
+With `--addresses` or `--progress`, rows are prefixed with an `Address`
+column.
 """
 import argparse
 import csv
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pyetheroll.constants import ETHERSCAN_TRANSACTIONS_LIMIT
+from pyetheroll.etheroll import Etheroll, decode_bet_transaction
 
-from pyetheroll.etheroll import Etheroll
+HEADER = ['Transaction hash', 'Date time', 'Bet size', 'Roll under']
+ADDRESS_HEADER = ['Address', *HEADER]
+# transactions per Etherscan page
+PAGE_SIZE = 1000
 
 
 def parse_arg():
     parser = argparse.ArgumentParser(description='Dumps player rolls to CSV')
-    parser.add_argument('--address', help='Player address', required=True)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--address', help='Player address')
+    group.add_argument(
+        '--addresses', help='File of player addresses, one per line')
     parser.add_argument('--csv', help='CSV output file', required=True)
+    parser.add_argument(
+        '--progress',
+        help='Done addresses file, defaults to the CSV file `.progress` '
+        'with `--addresses`')
+    parser.add_argument(
+        '--workers', help='Players fetched concurrently', type=int,
+        default=8)
     return parser.parse_args()
 
 
-def get_last_bets_transactions(address):
-    etheroll = Etheroll()
-    return etheroll.get_last_bets_transactions(address)
+def read_addresses(filename):
+    """Returns the file addresses, skipping blank and `#` comment lines."""
+    with open(filename) as f:
+        lines = (line.split('#')[0].strip() for line in f)
+        return [line for line in lines if line]
 
 
-def dump_rolls(rolls, filename):
-    with open(filename, mode='w') as roll_file:
-        csv_write = csv.writer(roll_file)
-        csv_write.writerow(
-            ['Transaction hash', 'Date time', 'Bet size', 'Roll under'])
-        for roll in rolls:
-            csv_write.writerow([
+def read_progress(filename):
+    try:
+        return set(read_addresses(filename))
+    except FileNotFoundError:
+        return set()
+
+
+def keep_done_rows(filename, done):
+    """
+    Rewrites the CSV file with the rows of `done` players only, dropping
+    the partial rows of interrupted ones.
+    """
+    tmp_filename = filename + '.tmp'
+    with open(filename, newline='') as roll_file, \
+            open(tmp_filename, 'w', newline='') as tmp_file:
+        csv_write = csv.writer(tmp_file)
+        csv_write.writerows(
+            row for row in csv.reader(roll_file)
+            if row == ADDRESS_HEADER or row[0] in done)
+    os.replace(tmp_filename, filename)
+
+
+def fetch_rolls(etheroll, address, rows_queue, stop):
+    """
+    Queues the player rolls rows as they're fetched, followed by a
+    `(address, None)` end marker, or `(address, exception)` on failure.
+    Gives up early once `stop` is set.
+    """
+    if stop.is_set():
+        return
+    transactions_count = 0
+    try:
+        for transaction in etheroll.iter_transactions(address, PAGE_SIZE):
+            if stop.is_set():
+                return
+            transactions_count += 1
+            if not etheroll.is_player_roll_dice_tx(transaction):
+                continue
+            roll = decode_bet_transaction(transaction)
+            row = [
                 roll['transaction_hash'],
                 roll['datetime'],
                 roll['bet_size_ether'],
-                roll['roll_under']])
+                roll['roll_under'],
+            ]
+            rows_queue.put((address, row))
+    except Exception as exception:
+        rows_queue.put((address, exception))
+    else:
+        if transactions_count >= ETHERSCAN_TRANSACTIONS_LIMIT:
+            print(
+                f'{address} reached the {ETHERSCAN_TRANSACTIONS_LIMIT} '
+                'transactions Etherscan limit, older rolls may be missing',
+                file=sys.stderr)
+        rows_queue.put((address, None))
+
+
+def dump_rolls(addresses, filename, progress_filename=None, workers=8):
+    """
+    Fetches players rolls with `workers` threads and writes them to the
+    CSV file as they're fetched. With a `progress_filename`, players
+    already in the progress file are skipped and completed ones are
+    recorded to it. Rows are prefixed with the player address with
+    several players or a `progress_filename`.
+    Returns the number of dumped rolls and the failed players errors.
+    """
+    with_address = len(addresses) > 1 or progress_filename is not None
+    done = set()
+    if progress_filename is not None:
+        done = read_progress(progress_filename)
+    resume = bool(done) and os.path.exists(filename)
+    if resume:
+        keep_done_rows(filename, done)
+    addresses = [address for address in addresses if address not in done]
+    # requests are throttled by the shared Etherscan session rate limiter
+    etheroll = Etheroll.get_or_create()
+    # the writer is much faster than the fetching threads
+    rows_queue = queue.Queue()
+    stop = threading.Event()
+    rows_count = 0
+    errors = {}
+    progress_file = None
+    if progress_filename is not None:
+        progress_file = open(progress_filename, mode='a')
+    mode = 'a' if resume else 'w'
+    with open(filename, mode=mode, newline='') as roll_file, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        csv_write = csv.writer(roll_file)
+        if not resume:
+            csv_write.writerow(ADDRESS_HEADER if with_address else HEADER)
+        for address in addresses:
+            executor.submit(fetch_rolls, etheroll, address, rows_queue, stop)
+        remaining = len(addresses)
+        try:
+            while remaining:
+                address, item = rows_queue.get()
+                if isinstance(item, list):
+                    if with_address:
+                        item = [address, *item]
+                    csv_write.writerow(item)
+                    rows_count += 1
+                    continue
+                remaining -= 1
+                roll_file.flush()
+                if item is not None:
+                    errors[address] = item
+                    print(
+                        f'Failed to fetch {address}: {item!r}',
+                        file=sys.stderr)
+                elif progress_file is not None:
+                    # only recorded once all its rows are written
+                    progress_file.write(address + '\n')
+                    progress_file.flush()
+        finally:
+            # e.g. on KeyboardInterrupt, doesn't wait for all the players
+            stop.set()
+            if progress_file is not None:
+                progress_file.close()
+    return rows_count, errors
 
 
 def main():
     args = parse_arg()
-    address = args.address
+    if args.addresses:
+        addresses = read_addresses(args.addresses)
+    else:
+        addresses = [args.address]
     filename = args.csv
-    rolls = get_last_bets_transactions(address)
-    dump_rolls(rolls, filename)
+    progress_filename = args.progress
+    # single player runs always start over
+    if progress_filename is None and args.addresses:
+        progress_filename = filename + '.progress'
+    rows_count, errors = dump_rolls(
+        addresses, filename, progress_filename, args.workers)
+    print(f'Dumped {rows_count} rolls of {len(addresses)} players')
+    if errors:
+        print(f'Failed to fetch {len(errors)} players', file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == '__main__':
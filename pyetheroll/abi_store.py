@@ -0,0 +1,255 @@
+"""
+Persistent on-disk store of contract ABIs and their precomputed signatures.
+ABIs are content addressed by their SHA-256 and contracts map to them by
+`(chain_id, address)`, which never changes once a contract is deployed.
+Layout:
+    abis/<sha256>.json
+    signatures/<sha256>.json
+    contracts/<chain_id>/<address>
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from eth_utils import function_abi_to_4byte_selector
+from hexbytes.main import HexBytes
+from web3 import Web3
+
+from pyetheroll.constants import ABI_CACHE_SIZE, ChainID
+from pyetheroll.etherscan_utils import fetch_contract_abi
+from pyetheroll.utils import get_cache_dir, write_atomic
+
+# read only store shipped with the package, see `seed()`
+SEED_PATH = os.path.join(os.path.dirname(__file__), "abis")
+
+
+def canonical_json(contract_abi):
+    """Serializes so equivalent ABIs share the same content address."""
+    return json.dumps(contract_abi, sort_keys=True, separators=(",", ":"))
+
+
+def compute_signatures(contract_abi):
+    """
+    Returns the hex encoded events and functions signatures, plus the
+    functions selectors.
+    e.g.
+    >>> {
+    ...     "events": {"LogBet": "0x1cb5...75c4"},
+    ...     "functions": {"playerRollDice": "0xdc6d...0123"},
+    ...     "selectors": {"0xdc6dd152": "playerRollDice"},
+    ... }
+    """
+    signatures = {"events": {}, "functions": {}, "selectors": {}}
+    for description in contract_abi:
+        typ = description["type"]
+        if typ not in ("event", "function"):
+            continue
+        name = description["name"]
+        types = ",".join([x["type"] for x in description["inputs"]])
+        signature = Web3.keccak(text=f"{name}({types})").hex()
+        signatures[f"{typ}s"][name] = signature
+        if typ == "function":
+            selector = function_abi_to_4byte_selector(description)
+            signatures["selectors"]["0x" + selector.hex()] = name
+    return signatures
+
+
+def decode_signatures(signatures):
+    """
+    Converts the hex encoded `compute_signatures()` events and functions
+    signatures to `HexBytes` like `Etheroll.get_signatures()`.
+    """
+    for typ in ("events", "functions"):
+        signatures[typ] = {
+            name: HexBytes(signature)
+            for name, signature in signatures[typ].items()
+        }
+    return signatures
+
+
+class AbiStore:
+    """
+    Looks up contracts in `path` first, then in the read only `seed_path`.
+    Fetched ABIs are only ever written to `path`.
+    """
+
+    def __init__(self, path=None, seed_path=SEED_PATH):
+        self.path = path or get_cache_dir()
+        self.seed_path = seed_path
+
+    @staticmethod
+    def contract_key(chain_id: ChainID, address: str):
+        return os.path.join("contracts", str(chain_id.value), address.lower())
+
+    def read(self, relative_path):
+        """Returns the file content from the store or the seed, else None."""
+        for root in filter(None, (self.path, self.seed_path)):
+            try:
+                with open(os.path.join(root, relative_path)) as f:
+                    return f.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def get_abi_hash(self, chain_id: ChainID, address: str):
+        abi_hash = self.read(self.contract_key(chain_id, address))
+        return abi_hash and abi_hash.strip()
+
+    def get(self, chain_id: ChainID, address: str):
+        """Returns the contract ABI or None if it's not in the store."""
+        abi_hash = self.get_abi_hash(chain_id, address)
+        if abi_hash is None:
+            return None
+        json_abi = self.read(os.path.join("abis", f"{abi_hash}.json"))
+        return json_abi and json.loads(json_abi)
+
+    def get_signatures(self, chain_id: ChainID, address: str):
+        """
+        Returns the precomputed events and functions signatures as
+        `HexBytes` like `Etheroll.get_signatures()`, or None.
+        """
+        abi_hash = self.get_abi_hash(chain_id, address)
+        if abi_hash is None:
+            return None
+        signatures = self.read(os.path.join("signatures", f"{abi_hash}.json"))
+        if signatures is None:
+            return None
+        return decode_signatures(json.loads(signatures))
+
+    def put(self, chain_id: ChainID, address: str, contract_abi):
+        """Stores the contract ABI and its signatures, returns its hash."""
+        json_abi = canonical_json(contract_abi)
+        abi_hash = hashlib.sha256(json_abi.encode()).hexdigest()
+        abi_path = os.path.join(self.path, "abis", f"{abi_hash}.json")
+        # content addressed, already stored blobs are left untouched
+        if not os.path.exists(abi_path):
+            signatures = compute_signatures(contract_abi)
+            write_atomic(
+                os.path.join(self.path, "signatures", f"{abi_hash}.json"),
+                json.dumps(signatures, sort_keys=True),
+            )
+            write_atomic(abi_path, json_abi)
+        write_atomic(
+            os.path.join(self.path, self.contract_key(chain_id, address)),
+            abi_hash,
+        )
+        return abi_hash
+
+    def get_or_fetch(self, chain_id: ChainID, address: str, fetch):
+        """
+        Returns the stored contract ABI, else calls `fetch()` which should
+        return the JSON encoded ABI, e.g. `Contract.get_abi()`, and stores it.
+        """
+        contract_abi = self.get(chain_id, address)
+        if contract_abi is None:
+            contract_abi = json.loads(fetch())
+            self.put(chain_id, address, contract_abi)
+        return contract_abi
+
+
+class AbiStoreFactory:
+
+    _abi_store = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_or_create(cls):
+        """Returns the `AbiStore` shared by all Etheroll objects."""
+        with cls._lock:
+            if cls._abi_store is None:
+                cls._abi_store = AbiStore()
+            return cls._abi_store
+
+    @classmethod
+    def configure(cls, path=None, seed_path=SEED_PATH):
+        """Replaces the shared store, e.g. to use a different directory."""
+        with cls._lock:
+            cls._abi_store = AbiStore(path, seed_path)
+            return cls._abi_store
+
+
+class AbiResolver:
+    """
+    In-memory LRU of contracts ABIs in front of an optional persistent
+    `abi_store`. Concurrent lookups of the same contract share one fetch.
+    """
+
+    def __init__(self, abi_store=None, maxsize=ABI_CACHE_SIZE):
+        self.abi_store = abi_store
+        self.maxsize = maxsize
+        self._abis = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def load(self, chain_id: ChainID, address: str, fetch):
+        if self.abi_store is None:
+            return json.loads(fetch())
+        return self.abi_store.get_or_fetch(chain_id, address, fetch)
+
+    def get_or_fetch(self, chain_id: ChainID, address: str, fetch):
+        """Same as `AbiStore.get_or_fetch()`, from memory when possible."""
+        key = (chain_id, address.lower())
+        with self._lock:
+            if key in self._abis:
+                self._abis.move_to_end(key)
+                return self._abis[key]
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                loading = True
+            else:
+                loading = False
+        if not loading:
+            # another thread is already fetching it
+            return future.result()
+        try:
+            contract_abi = self.load(chain_id, address, fetch)
+        except Exception as exception:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exception)
+            raise
+        with self._lock:
+            self._abis[key] = contract_abi
+            if len(self._abis) > self.maxsize:
+                self._abis.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(contract_abi)
+        return contract_abi
+
+
+class AbiResolverFactory:
+
+    _abi_resolver = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_or_create(cls):
+        """Returns the `AbiResolver` in front of the shared `AbiStore`."""
+        with cls._lock:
+            if cls._abi_resolver is None:
+                abi_store = AbiStoreFactory.get_or_create()
+                cls._abi_resolver = AbiResolver(abi_store)
+            return cls._abi_resolver
+
+    @classmethod
+    def configure(cls, abi_store=None, maxsize=ABI_CACHE_SIZE):
+        """Replaces the shared resolver, e.g. to go without a store."""
+        with cls._lock:
+            cls._abi_resolver = AbiResolver(abi_store, maxsize)
+            return cls._abi_resolver
+
+
+def seed(contract_addresses, seed_path=SEED_PATH):
+    """
+    Fetches the given `{chain_id: address}` contracts ABI into the seed
+    store shipped with the package.
+    """
+    abi_store = AbiStore(path=seed_path, seed_path=None)
+    for chain_id, address in contract_addresses.items():
+        contract_abi = json.loads(fetch_contract_abi(chain_id, address))
+        abi_store.put(chain_id, address, contract_abi)
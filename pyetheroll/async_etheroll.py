@@ -0,0 +1,340 @@
+"""
+asyncio flavor of the Etheroll library.
+"""
+
+import asyncio
+import itertools
+import json
+
+import aiohttp
+from etherscan.client import ClientException
+from hexbytes.main import HexBytes
+
+from pyetheroll.batch_decoder import BetTransactionsColumns
+from pyetheroll.constants import (
+    DEFAULT_GAS_PRICE_WEI,
+    DEFAULT_LOGS_WORKERS,
+    DEFAULT_POOL_SIZE,
+    ETHERSCAN_MAX_RETRIES,
+    ChainID,
+)
+from pyetheroll.etheroll import (
+    Etheroll,
+    is_logs_range_full,
+    merge_logs,
+    sort_logs,
+)
+from pyetheroll.etherscan_utils import (
+    REQUESTS_HEADERS,
+    EtherscanSessionFactory,
+)
+from pyetheroll.nonce_manager import is_known_transaction
+from pyetheroll.rate_limiter import backoff_delay, is_rate_limited
+from pyetheroll.signer import UnlockedSigner
+from pyetheroll.utils import wei_to_ether
+
+
+class AsyncEtheroll:
+    """
+    Mirrors the `Etheroll` public API with coroutines, Etherscan and JSON-RPC
+    calls are made using `aiohttp` and don't block the event loop.
+    ABI, signatures and decoding are delegated to the wrapped `etheroll`.
+    Etherscan calls share the rate limiter of the synchronous calls.
+    """
+
+    def __init__(self, etheroll, pool_size=DEFAULT_POOL_SIZE):
+        self.etheroll = etheroll
+        self.pool_size = pool_size
+        self._session = None
+        self._rpc_ids = itertools.count()
+
+    @classmethod
+    async def create(
+        cls, chain_id: ChainID = ChainID.MAINNET, contract_address: str = None
+    ):
+        """
+        Creates the object, the wrapped `Etheroll` is retrieved in an executor
+        since it may have to fetch the contract ABI.
+        """
+        loop = asyncio.get_event_loop()
+        etheroll = await loop.run_in_executor(
+            None, Etheroll.get_or_create, chain_id, contract_address
+        )
+        return cls(etheroll)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self):
+        """Keep-alive `aiohttp` session, created within the event loop."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=REQUESTS_HEADERS
+            )
+        return self._session
+
+    @property
+    def rate_limiter(self):
+        """
+        Shared rate limiter, looked up on each call so it follows
+        `EtherscanSessionFactory.configure()`.
+        """
+        return EtherscanSessionFactory.get_adapter().rate_limiter
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def etherscan_get(self, url):
+        """
+        Throttled Etherscan API call, retrying rate limited responses.
+        Returns the decoded JSON response.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            async with self.session.get(url) as response:
+                status_code = response.status
+                text = await response.text()
+            if attempt >= ETHERSCAN_MAX_RETRIES or not is_rate_limited(
+                status_code, text
+            ):
+                return json.loads(text)
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def rpc(self, method, params):
+        """JSON-RPC call to the `etheroll` provider node."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._rpc_ids),
+            "method": method,
+            "params": params,
+        }
+        url = self.etheroll.provider.endpoint_uri
+        async with self.session.post(url, json=payload) as response:
+            response = await response.json()
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    async def get_block_number(self):
+        return int(await self.rpc("eth_blockNumber", []), 16)
+
+    async def player_roll_dice(
+        self,
+        bet_size_wei,
+        chances,
+        wallet_path=None,
+        wallet_password=None,
+        gas_price_wei=DEFAULT_GAS_PRICE_WEI,
+        signer=None,
+    ):
+        """
+        Signs and broadcasts `playerRollDice` transaction, from the wallet
+        or the already unlocked `signer`.
+        Returns transaction hash.
+        Keyfile loading and decryption run in an executor.
+        """
+        if signer is None:
+            if wallet_path is None:
+                raise ValueError("Either a wallet or a signer is required")
+            loop = asyncio.get_event_loop()
+            unlocked_signer = await loop.run_in_executor(
+                None, UnlockedSigner, wallet_path, wallet_password
+            )
+            with unlocked_signer:
+                return await self.player_roll_dice(
+                    bet_size_wei,
+                    chances,
+                    gas_price_wei=gas_price_wei,
+                    signer=unlocked_signer,
+                )
+
+        async def send(nonce):
+            transaction = self.etheroll.build_player_roll_dice_tx(
+                bet_size_wei, chances, nonce, gas_price_wei
+            )
+            signed_tx = signer.sign_transaction(transaction)
+            try:
+                return await self.rpc(
+                    "eth_sendRawTransaction", [signed_tx.rawTransaction.hex()]
+                )
+            except Exception as exception:
+                # sending it again with a new nonce would bet twice
+                if not is_known_transaction(exception):
+                    raise
+                return signed_tx.hash
+
+        # nonces are shared with the synchronous calls
+        tx_hash = await self.etheroll.nonce_manager.async_send(
+            signer.address, send
+        )
+        return HexBytes(tx_hash)
+
+    def get_transaction_page_url(self, address, page, offset, internal):
+        action = "txlistinternal" if internal else "txlist"
+        url = self.etheroll.ChainEtherscanAccount.PREFIX
+        url += f"module=account&action={action}&"
+        url += f"address={address}&page={page}&offset={offset}&sort=desc&"
+        url += f"apikey={self.etheroll.etherscan_api_key}"
+        return url
+
+    async def get_transaction_page(
+        self, address=None, page=1, offset=100, internal=False
+    ):
+        """Retrieves all transactions related to the given address."""
+        if address is None:
+            address = self.etheroll.contract_address
+        url = self.get_transaction_page_url(address, page, offset, internal)
+        response = await self.etherscan_get(url)
+        if response.get("status") != "1":
+            if "No transactions found" in response.get("message", ""):
+                return []
+            # e.g. "Max rate limit reached" or "Invalid API Key"
+            raise ClientException(response.get("result"))
+        return response["result"]
+
+    async def get_player_roll_dice_tx(self, address, page=1, offset=100):
+        """
+        Retrieves `address` last `playerRollDice` transactions associated with
+        the Etheroll contract.
+        """
+        transactions = await self.get_transaction_page(
+            address=address, page=page, offset=offset
+        )
+        return self.etheroll.filter_player_roll_dice_tx(transactions)
+
+    async def get_last_bets_transactions(
+        self, address=None, page=1, offset=100, wei=False
+    ):
+        """
+        Retrieves `address` last bets from transactions and returns the list
+        of bets infos. Does not return the actual roll result.
+        """
+        transactions = await self.get_player_roll_dice_tx(
+            address=address, page=page, offset=offset
+        )
+        return self.etheroll.decode_bets_transactions(transactions, wei)
+
+    async def get_last_bets_transactions_columns(
+        self, address=None, page=1, offset=100
+    ):
+        """Same as `Etheroll.get_last_bets_transactions_columns()`."""
+        transactions = await self.get_player_roll_dice_tx(
+            address=address, page=page, offset=offset
+        )
+        return BetTransactionsColumns.from_transactions(transactions)
+
+    async def get_logs(self, address, from_block, to_block="latest", **topics):
+        url = self.etheroll.get_logs_url(
+            address, from_block, to_block, **topics
+        )
+        response = await self.etherscan_get(url)
+        logs = response["result"]
+        # errors, e.g. "Max rate limit reached", are returned as the result
+        if not isinstance(logs, list):
+            raise ClientException(logs)
+        return logs
+
+    async def get_logs_chunked(
+        self,
+        address,
+        from_block,
+        to_block="latest",
+        max_workers=DEFAULT_LOGS_WORKERS,
+        **topics,
+    ):
+        """
+        Same as `Etheroll.get_logs_chunked()`, full block ranges get bisected
+        and fetched concurrently, up to `max_workers` requests at a time.
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_range_logs(start, end):
+            async with semaphore:
+                logs = await self.get_logs(address, start, end, **topics)
+            if not is_logs_range_full(logs, start, end):
+                return logs
+            if end == "latest":
+                end = await self.get_block_number()
+            middle = (start + end) // 2
+            halves = await asyncio.gather(
+                get_range_logs(start, middle), get_range_logs(middle + 1, end)
+            )
+            return list(itertools.chain(*halves))
+
+        return sort_logs(await get_range_logs(from_block, to_block))
+
+    async def get_bets_logs(
+        self, address, from_block, to_block="latest", wei=False
+    ):
+        """
+        Retrieves `address` last bets from event logs and returns the list
+        of bets with decoded info. Does not return the actual roll result.
+        Least recent first (index 0), most recent last (index -1).
+        """
+        bet_events = await self.get_logs_chunked(
+            self.etheroll.contract_address,
+            from_block,
+            to_block,
+            **self.etheroll.get_log_bet_topics(address),
+        )
+        return self.etheroll.decode_bet_events(bet_events, wei)
+
+    async def get_bet_results_logs(
+        self, address, from_block, to_block="latest", wei=False
+    ):
+        """
+        Retrieves `address` bet results from event logs and returns the list of
+        bet results with decoded info.
+        """
+        result_events = await self.get_logs_chunked(
+            self.etheroll.contract_address,
+            from_block,
+            to_block,
+            **self.etheroll.get_log_result_topics(address),
+        )
+        return self.etheroll.decode_result_events(result_events, wei)
+
+    async def get_merged_logs(self, address, wei=False):
+        """
+        Returns the merged logs.
+        Least recent first (index 0), most recent last (index -1).
+        `LogBet` and `LogResult` events are fetched concurrently.
+        """
+        transactions = await self.get_player_roll_dice_tx(address)
+        last_bets_blocks = self.etheroll.get_bets_blocks(transactions)
+        if last_bets_blocks is None:
+            return ()
+        from_block = last_bets_blocks["from_block"]
+        to_block = last_bets_blocks["to_block"]
+        bet_logs, bet_results_logs = await asyncio.gather(
+            self.get_bets_logs(address, from_block, to_block, wei),
+            self.get_bet_results_logs(address, from_block, to_block, wei),
+        )
+        return merge_logs(bet_logs, bet_results_logs)
+
+    async def get_balance(self, address, wei=False):
+        """
+        Retrieves the Ether balance of the given account, or the exact Wei
+        one with `wei=True`.
+        """
+        url = self.etheroll.ChainEtherscanAccount.PREFIX
+        url += f"module=account&action=balance&address={address}&"
+        url += f"tag=latest&apikey={self.etheroll.etherscan_api_key}"
+        response = await self.etherscan_get(url)
+        if response.get("status") != "1":
+            # e.g. "Max rate limit reached" or "Invalid API Key"
+            raise ClientException(response.get("result"))
+        balance_wei = int(response["result"])
+        if wei:
+            return balance_wei
+        return wei_to_ether(balance_wei)
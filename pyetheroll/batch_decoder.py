@@ -0,0 +1,428 @@
+"""
+Batch decoding of Etherscan event logs into NumPy columns.
+`LogBet` and `LogResult` have a static layout, so a whole batch of logs can
+be sliced into 32 bytes words in one pass rather than decoded log per log.
+`playerRollDice` transactions pages are parsed the same way.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from pyetheroll.constants import ROUND_DIGITS
+from pyetheroll.records import BetTransaction, WeiBetTransaction
+
+WORD_SIZE = 32
+WORD_HEX_SIZE = 2 * WORD_SIZE
+# maps the event ABI input name to its `(column name, column kind)`
+LOG_BET_COLUMNS = {
+    "BetID": ("bet_id", "bytes32"),
+    "PlayerAddress": ("player", "address"),
+    "RewardValue": ("reward_value_wei", "wei"),
+    "ProfitValue": ("profit_value_wei", "wei"),
+    "BetValue": ("bet_value_wei", "wei"),
+    "PlayerNumber": ("roll_under", "uint"),
+}
+LOG_RESULT_COLUMNS = {
+    "BetID": ("bet_id", "bytes32"),
+    "PlayerAddress": ("player", "address"),
+    "PlayerNumber": ("roll_under", "uint"),
+    "DiceResult": ("dice_result", "uint"),
+    "Value": ("bet_value_wei", "wei"),
+}
+LOG_REFUND_COLUMNS = {
+    "BetID": ("bet_id", "bytes32"),
+    "PlayerAddress": ("player", "address"),
+    "RefundValue": ("refund_value_wei", "wei"),
+}
+ADDRESS_SIZE = 20
+UINT64_HEX_SIZE = 16
+# any decimal of that many digits fits in 64 bits
+UINT64_MAX_DIGITS = 19
+
+
+def hex_matrix(hex_strings, width):
+    """
+    Concatenates hex strings of `width` characters and returns them as a
+    `(len(hex_strings), width // 2)` matrix of bytes.
+    """
+    if set(map(len, hex_strings)) - {width}:
+        raise ValueError(f"Expected hex strings of length {width}")
+    buffer = bytes.fromhex("".join(hex_strings))
+    matrix = np.frombuffer(buffer, dtype=np.uint8)
+    return matrix.reshape(len(hex_strings), width // 2)
+
+
+def hex_to_uint64(hex_strings):
+    """
+    Converts "0x" prefixed quantities, e.g. `blockNumber` or `timeStamp`,
+    to an uint64 array. Etherscan returns "0x" for zero, which is handled.
+    """
+    hex_strings = [hex_string[2:].zfill(16) for hex_string in hex_strings]
+    return hex_matrix(hex_strings, 16).view(">u8").ravel().astype(np.uint64)
+
+
+def decimal_to_uint64(decimal_strings):
+    """
+    Converts decimal quantities, e.g. Etherscan transactions `timeStamp`,
+    to an uint64 array, parsed in one pass.
+    """
+    if not "".join(decimal_strings).isdigit() and decimal_strings:
+        raise ValueError("Expected decimal strings")
+    if max(map(len, decimal_strings), default=0) > UINT64_MAX_DIGITS:
+        raise OverflowError("Value may not fit in 64 bits")
+    values = np.fromstring(" ".join(decimal_strings), np.uint64, sep=" ")
+    # empty strings are skipped by the parser
+    if len(values) != len(decimal_strings):
+        raise ValueError("Expected decimal strings")
+    return values
+
+
+def decimal_to_limbs(decimal_strings):
+    """
+    Converts decimal Wei amounts to `(n, 2)` limbs, see `words_to_limbs()`.
+    Amounts above 2**64 Wei are rare, they're converted one by one.
+    """
+    try:
+        low = decimal_to_uint64(decimal_strings)
+        return np.column_stack([np.zeros_like(low), low])
+    except OverflowError:
+        values = [int(decimal) for decimal in decimal_strings]
+        limbs = [(value >> 64, value & (2 ** 64 - 1)) for value in values]
+        return np.array(limbs, dtype=np.uint64).reshape(len(values), 2)
+
+
+def words_to_uint64(words):
+    """Converts `(n, 32)` big endian words to an uint64 array."""
+    if words[:, :-8].any():
+        raise OverflowError("Value doesn't fit in 64 bits")
+    return words[:, -8:].copy().view(">u8").ravel().astype(np.uint64)
+
+
+def words_to_limbs(words):
+    """
+    Converts `(n, 32)` big endian words to `(n, 2)` uint64 `[high, low]`
+    limbs, so Wei amounts above 2**64 (~18.4 Ether) are kept exact.
+    """
+    if words[:, :-16].any():
+        raise OverflowError("Value doesn't fit in 128 bits")
+    return words[:, -16:].copy().view(">u8").astype(np.uint64)
+
+
+def limbs_to_ether(limbs):
+    """Converts Wei limbs to a float64 Ether array."""
+    high = limbs[:, 0].astype(np.float64)
+    low = limbs[:, 1].astype(np.float64)
+    return (high * 2.0**64 + low) / 1e18
+
+
+def limbs_to_wei(limbs):
+    """Converts Wei limbs to a list of Python integers."""
+    if not limbs[:, 0].any():
+        return limbs[:, 1].tolist()
+    return [(high << 64) | low for high, low in limbs.tolist()]
+
+
+def columns_layout(event_abi, columns):
+    """
+    Returns the `(column name, column kind, word index)` of the wanted
+    columns and the number of topics and data words to slice per log.
+    Indexed inputs are stored in topics[1:], others in data, in order.
+    Dynamic types only store an offset in their head word which is skipped.
+    """
+    layout = []
+    indexed_inputs = [i for i in event_abi["inputs"] if i["indexed"]]
+    data_inputs = [i for i in event_abi["inputs"] if not i["indexed"]]
+    for word_index, event_input in enumerate(indexed_inputs + data_inputs):
+        if event_input["name"] in columns:
+            name, kind = columns[event_input["name"]]
+            layout.append((name, kind, word_index))
+    topics_count = len(indexed_inputs)
+    data_words_count = max(
+        [index + 1 - topics_count for _, _, index in layout] + [0]
+    )
+    return layout, topics_count, data_words_count
+
+
+class LogColumns:
+    """
+    Struct-of-arrays of a batch of decoded logs, one NumPy array per column.
+    On top of the event columns, `timestamp`, `block_number`, `log_index`
+    and `transaction_hash` columns are decoded from the log metadata.
+    Wei columns are `(n, 2)` uint64 limbs, see `words_to_limbs()`.
+    """
+
+    COLUMNS = {}
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @classmethod
+    def from_logs(cls, event_abi, logs):
+        """Decodes a list of raw Etherscan `getLogs` event logs."""
+        layout, topics_count, data_words_count = columns_layout(
+            event_abi, cls.COLUMNS
+        )
+        if set(len(log["topics"]) for log in logs) - {1 + topics_count}:
+            raise ValueError(f"Expected {1 + topics_count} topics per log")
+        # topics may or may not be "0x" prefixed, data always is
+        topics = hex_matrix(
+            [
+                topic[-WORD_HEX_SIZE:]
+                for log in logs
+                for topic in log["topics"][1:]
+            ],
+            WORD_HEX_SIZE,
+        ).reshape(len(logs), topics_count * WORD_SIZE)
+        data_width = WORD_HEX_SIZE * data_words_count
+        data_end = 2 + data_width
+        data = hex_matrix(
+            [log["data"][2:data_end] for log in logs], data_width
+        )
+        words = np.hstack([topics, data]).reshape(
+            len(logs), topics_count + data_words_count, WORD_SIZE
+        )
+        decoders = {
+            "bytes32": lambda w: w.copy(),
+            "address": lambda w: w[:, -ADDRESS_SIZE:].copy(),
+            "uint": words_to_uint64,
+            "wei": words_to_limbs,
+        }
+        columns = {
+            name: decoders[kind](words[:, word_index])
+            for name, kind, word_index in layout
+        }
+        columns.update(
+            {
+                "timestamp": hex_to_uint64([log["timeStamp"] for log in logs]),
+                "block_number": hex_to_uint64(
+                    [log["blockNumber"] for log in logs]
+                ),
+                "log_index": hex_to_uint64([log["logIndex"] for log in logs]),
+                "transaction_hash": np.array(
+                    [log["transactionHash"] for log in logs], dtype="U66"
+                ),
+            }
+        )
+        return cls(columns)
+
+    @classmethod
+    def concatenate(cls, columns_list):
+        """Concatenates non empty list of batches, e.g. from several shards."""
+        names = columns_list[0].columns.keys()
+        return cls(
+            {
+                name: np.concatenate([c[name] for c in columns_list])
+                for name in names
+            }
+        )
+
+    def take(self, indices):
+        """Returns the rows at `indices`, or matching a boolean mask."""
+        return type(self)(
+            {name: column[indices] for name, column in self.columns.items()}
+        )
+
+    def save(self, path):
+        """Saves the columns to a NumPy `.npz` file."""
+        np.savez(path, **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(dict(npz))
+
+    def bet_ids(self):
+        """Returns the `bet_id` column as hex strings."""
+        return [bytes(bet_id).hex() for bet_id in self["bet_id"]]
+
+    def ether(self, name):
+        """Returns the `name` Wei column in Ether, rounded like the logs."""
+        return [
+            round(value, ROUND_DIGITS)
+            for value in limbs_to_ether(self[name]).tolist()
+        ]
+
+    def common_dicts(self):
+        timestamps = self["timestamp"].tolist()
+        return [
+            {
+                "timestamp": hex(timestamp),
+                "datetime": datetime.utcfromtimestamp(timestamp),
+                "transaction_hash": transaction_hash,
+            }
+            for timestamp, transaction_hash in zip(
+                timestamps, self["transaction_hash"].tolist()
+            )
+        ]
+
+
+class BetsColumns(LogColumns):
+    """Columns of decoded `LogBet` events."""
+
+    COLUMNS = LOG_BET_COLUMNS
+
+    def to_dicts(self):
+        """Converts back to the `Etheroll.get_bets_logs()` format."""
+        rows = zip(
+            self.common_dicts(),
+            self.bet_ids(),
+            self.ether("reward_value_wei"),
+            self.ether("profit_value_wei"),
+            self.ether("bet_value_wei"),
+            self["roll_under"].tolist(),
+        )
+        return tuple(
+            dict(
+                common,
+                bet_id=bet_id,
+                reward_value_ether=reward_value_ether,
+                profit_value_ether=profit_value_ether,
+                bet_value_ether=bet_value_ether,
+                roll_under=roll_under,
+            )
+            for (
+                common,
+                bet_id,
+                reward_value_ether,
+                profit_value_ether,
+                bet_value_ether,
+                roll_under,
+            ) in rows
+        )
+
+
+class RefundsColumns(LogColumns):
+    """Columns of decoded `LogRefund` events."""
+
+    COLUMNS = LOG_REFUND_COLUMNS
+
+
+class BetResultsColumns(LogColumns):
+    """Columns of decoded `LogResult` events."""
+
+    COLUMNS = LOG_RESULT_COLUMNS
+
+    def to_dicts(self):
+        """Converts back to the `Etheroll.get_bet_results_logs()` format."""
+        rows = zip(
+            self.common_dicts(),
+            self.bet_ids(),
+            self["roll_under"].tolist(),
+            self["dice_result"].tolist(),
+            self.ether("bet_value_wei"),
+        )
+        return tuple(
+            dict(
+                common,
+                bet_id=bet_id,
+                roll_under=roll_under,
+                dice_result=dice_result,
+                bet_value_ether=bet_value_ether,
+            )
+            for (
+                common,
+                bet_id,
+                roll_under,
+                dice_result,
+                bet_value_ether,
+            ) in rows
+        )
+
+
+class BetTransactionsColumns(LogColumns):
+    """
+    Columns of `playerRollDice` transactions, see `PlayerRollDiceParser`.
+    `timestamp` and `block_number` are decoded from decimal, as Etherscan
+    returns them for transactions.
+    """
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Decodes a list of `playerRollDice` raw Etherscan transactions, with
+        a roll under fitting in 64 bits.
+        """
+        # last 64 bits of the `rollUnder` word
+        roll_unders = hex_matrix(
+            [
+                transaction["input"][-UINT64_HEX_SIZE:]
+                for transaction in transactions
+            ],
+            UINT64_HEX_SIZE,
+        )
+        columns = {
+            "bet_size_wei": decimal_to_limbs(
+                [transaction["value"] for transaction in transactions]
+            ),
+            "roll_under": roll_unders.view(">u8").ravel().astype(np.uint64),
+            "timestamp": decimal_to_uint64(
+                [transaction["timeStamp"] for transaction in transactions]
+            ),
+            "block_number": decimal_to_uint64(
+                [transaction["blockNumber"] for transaction in transactions]
+            ),
+            "transaction_hash": np.array(
+                [transaction["hash"] for transaction in transactions],
+                dtype="U66",
+            ),
+        }
+        return cls(columns)
+
+    def to_records(self, wei=False):
+        """
+        Converts to the `Etheroll.get_last_bets_transactions()` records.
+        """
+        record_class = WeiBetTransaction if wei else BetTransaction
+        # positional arguments, in the `BetTransaction()` order
+        return tuple(
+            map(
+                record_class,
+                limbs_to_wei(self["bet_size_wei"]),
+                self["roll_under"].tolist(),
+                map(str, self["block_number"].tolist()),
+                map(str, self["timestamp"].tolist()),
+                self["transaction_hash"].tolist(),
+            )
+        )
+
+
+class PlayerRollDiceParser:
+    """
+    Parses Etherscan transactions pages, keeping `playerRollDice` calls to
+    the `contract_address` only.
+    The lower case address and the expected input prefix are computed once
+    rather than per transaction.
+    """
+
+    def __init__(self, contract_address, selector):
+        self.contract_address = contract_address.lower()
+        # `rollUnder` is at most 100, so its word fits in 64 bits
+        zeros = "0" * (WORD_HEX_SIZE - UINT64_HEX_SIZE)
+        self.input_prefix = selector.lower() + zeros
+        self.input_length = len(selector) + WORD_HEX_SIZE
+
+    def is_player_roll_dice_tx(self, transaction):
+        to = transaction["to"]
+        if to != self.contract_address and to.lower() != self.contract_address:
+            return False
+        call_data = transaction["input"]
+        return len(call_data) == self.input_length and (
+            call_data.startswith(self.input_prefix)
+            or call_data.lower().startswith(self.input_prefix)
+        )
+
+    def filter(self, transactions):
+        return [t for t in transactions if self.is_player_roll_dice_tx(t)]
+
+    def parse(self, transactions):
+        """Returns the page `playerRollDice` as `BetTransactionsColumns`."""
+        return BetTransactionsColumns.from_transactions(
+            self.filter(transactions)
+        )
@@ -0,0 +1,256 @@
+"""
+Local SQLite store of decoded `LogBet` and `LogResult` events.
+Players history is synced incrementally from a per player checkpoint, so
+history views are served locally rather than refetched from Etherscan.
+"""
+import os
+import sqlite3
+import sys
+import threading
+
+from pyetheroll.constants import BET_STORE_REORG_DEPTH
+from pyetheroll.etheroll import merge_logs
+from pyetheroll.records import Bet, BetResult, WeiBet, WeiBetResult
+from pyetheroll.utils import get_cache_dir
+
+# bumped on schema changes, older stores are dropped and synced again
+SCHEMA_VERSION = 1
+# Wei amounts exceed SQLite 64 bits integers, they're stored as decimal TEXT
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bets (
+    chain_id INTEGER NOT NULL,
+    contract_address TEXT NOT NULL,
+    bet_id TEXT NOT NULL,
+    player TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    reward_value_wei TEXT NOT NULL,
+    profit_value_wei TEXT NOT NULL,
+    bet_value_wei TEXT NOT NULL,
+    roll_under INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, contract_address, bet_id)
+);
+CREATE INDEX IF NOT EXISTS bets_player_block
+    ON bets (chain_id, contract_address, player, block_number);
+CREATE TABLE IF NOT EXISTS bet_results (
+    chain_id INTEGER NOT NULL,
+    contract_address TEXT NOT NULL,
+    bet_id TEXT NOT NULL,
+    player TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    roll_under INTEGER NOT NULL,
+    dice_result INTEGER NOT NULL,
+    bet_value_wei TEXT NOT NULL,
+    PRIMARY KEY (chain_id, contract_address, bet_id)
+);
+CREATE INDEX IF NOT EXISTS bet_results_player_block
+    ON bet_results (chain_id, contract_address, player, block_number);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    chain_id INTEGER NOT NULL,
+    contract_address TEXT NOT NULL,
+    player TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, contract_address, player)
+);
+"""
+TABLES = ("bets", "bet_results", "checkpoints")
+# in the `Bet` and `BetResult` records arguments order
+BET_COLUMNS = (
+    "bet_id",
+    "reward_value_wei",
+    "profit_value_wei",
+    "bet_value_wei",
+    "roll_under",
+    "timestamp",
+    "transaction_hash",
+)
+BET_RESULT_COLUMNS = (
+    "bet_id",
+    "roll_under",
+    "dice_result",
+    "bet_value_wei",
+    "timestamp",
+    "transaction_hash",
+)
+
+
+def column_value(record, column):
+    value = getattr(record, column)
+    return str(value) if column.endswith("_wei") else value
+
+
+def row_values(row, columns):
+    return [
+        int(row[column]) if column.endswith("_wei") else row[column]
+        for column in columns
+    ]
+
+
+def log_position(log):
+    """Returns the `(block_number, log_index)` of an Etherscan event log."""
+    # Etherscan returns "0x" for a zero `logIndex`
+    return int(log["blockNumber"], 16), int(log["logIndex"][2:] or "0", 16)
+
+
+class BetStore:
+    """
+    Decoded bets of the `etheroll` contract, stored in the SQLite database
+    at `path`, `bets.sqlite` in the cache directory by default.
+    Each `sync()` refetches the last `reorg_depth` synced blocks, so events
+    dropped by a short chain reorganization are rewound.
+    """
+
+    def __init__(self, etheroll, path=None, reorg_depth=BET_STORE_REORG_DEPTH):
+        self.etheroll = etheroll
+        self.reorg_depth = reorg_depth
+        if path is None:
+            cache_dir = get_cache_dir()
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, "bets.sqlite")
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            for table in TABLES:
+                self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    @property
+    def scope(self):
+        """Rows are scoped by chain and contract."""
+        return self.etheroll.chain_id.value, self.etheroll.contract_address
+
+    def close(self):
+        self.connection.close()
+
+    def get_checkpoint(self, address):
+        """Returns the last synced block of the player, or None."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT block_number FROM checkpoints "
+                "WHERE chain_id = ? AND contract_address = ? AND player = ?",
+                (*self.scope, address.lower()),
+            ).fetchone()
+        return row and row["block_number"]
+
+    def sync(self, address, from_block=0):
+        """
+        Fetches and stores the player events since the last checkpoint,
+        or since `from_block` on the first sync.
+        The checkpoint is the node head minus the reorg depth, which also
+        covers Etherscan lagging behind the node, or the last block served
+        with events if higher. It's recorded even without events so idle
+        players don't refetch their whole history.
+        Returns the number of bets and bet results stored.
+        """
+        player = address.lower()
+        to_block = self.etheroll.web3.eth.blockNumber
+        checkpoint = self.get_checkpoint(address)
+        if checkpoint is not None:
+            from_block = max(checkpoint - self.reorg_depth + 1, 0)
+        (
+            bet_events,
+            result_events,
+        ) = self.etheroll.get_log_bet_and_result_events(
+            address, from_block, to_block
+        )
+        bets = zip(bet_events, self.etheroll.decode_bet_events(bet_events))
+        bet_rows = [
+            (
+                *self.scope,
+                player,
+                *log_position(event),
+                *(column_value(bet, column) for column in BET_COLUMNS),
+            )
+            for event, bet in bets
+        ]
+        results = zip(
+            result_events, self.etheroll.decode_result_events(result_events)
+        )
+        result_rows = [
+            (
+                *self.scope,
+                player,
+                *log_position(event),
+                *(column_value(result, c) for c in BET_RESULT_COLUMNS),
+            )
+            for event, result in results
+        ]
+        with self._lock, self.connection:
+            # rewinds the refetched blocks, reorged events are gone from it
+            for table in ("bets", "bet_results"):
+                self.connection.execute(
+                    f"DELETE FROM {table} "
+                    "WHERE chain_id = ? AND contract_address = ? "
+                    "AND player = ? AND block_number >= ?",
+                    (*self.scope, player, from_block),
+                )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO bets (chain_id, contract_address, "
+                "player, block_number, log_index, "
+                f"{', '.join(BET_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (5 + len(BET_COLUMNS)))})",
+                bet_rows,
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO bet_results (chain_id, "
+                "contract_address, player, block_number, log_index, "
+                f"{', '.join(BET_RESULT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (5 + len(BET_RESULT_COLUMNS)))})",
+                result_rows,
+            )
+            served_blocks = [row[3] for row in bet_rows + result_rows]
+            checkpoint = max([to_block - self.reorg_depth, *served_blocks])
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(chain_id, contract_address, player, block_number) "
+                "VALUES (?, ?, ?, ?)",
+                (*self.scope, player, max(checkpoint, 0)),
+            )
+        return len(bet_rows), len(result_rows)
+
+    def select(self, table, columns, address, from_block, to_block):
+        to_block = sys.maxsize if to_block is None else to_block
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(columns)} FROM {table} "
+                "WHERE chain_id = ? AND contract_address = ? AND player = ? "
+                "AND block_number BETWEEN ? AND ? "
+                "ORDER BY block_number, log_index",
+                (*self.scope, address.lower(), from_block, to_block),
+            ).fetchall()
+        return [row_values(row, columns) for row in rows]
+
+    def get_bets_logs(self, address, from_block=0, to_block=None, wei=False):
+        """
+        Stored bets in the `Etheroll.get_bets_logs()` format.
+        Least recent first (index 0), most recent last (index -1).
+        """
+        record_class = WeiBet if wei else Bet
+        rows = self.select("bets", BET_COLUMNS, address, from_block, to_block)
+        return tuple(record_class(*values) for values in rows)
+
+    def get_bet_results_logs(
+        self, address, from_block=0, to_block=None, wei=False
+    ):
+        """Stored bet results in `Etheroll.get_bet_results_logs()` format."""
+        record_class = WeiBetResult if wei else BetResult
+        rows = self.select(
+            "bet_results", BET_RESULT_COLUMNS, address, from_block, to_block
+        )
+        return tuple(record_class(*values) for values in rows)
+
+    def get_merged_logs(self, address, from_block=0, to_block=None, wei=False):
+        """Stored merged logs, see `Etheroll.get_merged_logs()`."""
+        bet_logs = self.get_bets_logs(address, from_block, to_block, wei)
+        bet_results_logs = self.get_bet_results_logs(
+            address, from_block, wei=wei
+        )
+        return merge_logs(bet_logs, bet_results_logs)
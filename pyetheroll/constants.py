@@ -1,13 +1,62 @@
 from enum import Enum
 
 ROUND_DIGITS = 2
+# contract house edge, payouts are multiplied by 990 / 1000
+HOUSE_EDGE = 990
+HOUSE_EDGE_DIVISOR = 1000
 DEFAULT_GAS_PRICE_GWEI = 4
 DEFAULT_GAS_PRICE_WEI = int(DEFAULT_GAS_PRICE_GWEI * 1e9)
 DEFAULT_ETHERSCAN_API_KEY = "YourApiKeyToken"
 DEFAULT_INFURA_PROJECT_ID = "7c841c560b1e4660a9683507cb27b2f8"
+# connections kept alive per host by the shared Etherscan session
+DEFAULT_POOL_SIZE = 10
+# Etherscan free tier calls per second
+ETHERSCAN_RATE_LIMIT = 5
+# retries on rate limit and server errors, with exponential backoff
+ETHERSCAN_MAX_RETRIES = 5
+ETHERSCAN_BACKOFF_FACTOR = 0.5
+ETHERSCAN_MAX_BACKOFF = 30
+# resends with a resynced nonce when the node rejects it
+NONCE_MAX_RETRIES = 1
+# seconds an `UnlockedSigner` keeps its key decrypted, None never expires
+SIGNER_TTL = 600
+# maximum records returned by one Etherscan `getLogs` call
+ETHERSCAN_LOGS_LIMIT = 1000
+# maximum transactions served through `page * offset` paging
+ETHERSCAN_TRANSACTIONS_LIMIT = 10000
+# calls sent per JSON-RPC batch request
+JSONRPC_BATCH_SIZE = 100
+# concurrent `getLogs` calls when fetching a block range by chunks
+DEFAULT_LOGS_WORKERS = 4
+# `LogBet` and `LogResult` events waiting for their counterpart while
+# streaming merged logs, per event
+MAX_PENDING_RESULTS = 10000
+# `Etheroll.get_or_create()` instances kept, and for how long (no expiry)
+ETHEROLL_REGISTRY_SIZE = 8
+ETHEROLL_REGISTRY_TTL = None
+# contracts ABIs kept in memory by the `AbiResolver`
+ABI_CACHE_SIZE = 128
+# blocks refetched on each `BetStore.sync()` to rewind short reorgs
+BET_STORE_REORG_DEPTH = 12
+# blocks per indexer shard and processes fetching them
+INDEXER_SHARD_SIZE = 100000
+DEFAULT_INDEXER_PROCESSES = 4
+# rows per Parquet row group of the merged bets export
+EXPORT_ROW_GROUP_SIZE = 100000
 
 
 class ChainID(Enum):
     MAINNET = 1
     MORDEN = 2
     ROPSTEN = 3
+
+
+class LogsStrategy(Enum):
+    """How `get_merged_logs()` fetches `LogBet` and `LogResult` events."""
+
+    # one `getLogs` query after the other
+    SEQUENTIAL = "sequential"
+    # both `getLogs` queries concurrently
+    THREADS = "threads"
+    # a single `getLogs` query ORing both events topics
+    COMBINED = "combined"
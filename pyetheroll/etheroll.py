@@ -1,40 +1,64 @@
 """
 Python Etheroll library.
 """
-import json
-
-import requests
-import requests_cache
-from eth_account import Account
-from eth_keyfile import load_keyfile
-from eth_utils import to_checksum_address
-from etherscan.client import EmptyResponse
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import zip_longest
+
+from etherscan.client import ClientException, EmptyResponse
 from hexbytes.main import HexBytes
 from web3 import Web3
 from web3.contract import Contract
 
-from pyetheroll.constants import DEFAULT_GAS_PRICE_WEI, ROUND_DIGITS, ChainID
+from pyetheroll.abi_store import (
+    AbiStoreFactory,
+    compute_signatures,
+    decode_signatures,
+)
+from pyetheroll.batch_decoder import (
+    BetResultsColumns,
+    BetsColumns,
+    BetTransactionsColumns,
+    PlayerRollDiceParser,
+)
+from pyetheroll.constants import (
+    DEFAULT_GAS_PRICE_WEI,
+    DEFAULT_LOGS_WORKERS,
+    ETHEROLL_REGISTRY_SIZE,
+    ETHEROLL_REGISTRY_TTL,
+    ETHERSCAN_LOGS_LIMIT,
+    ETHERSCAN_TRANSACTIONS_LIMIT,
+    MAX_PENDING_RESULTS,
+    ChainID,
+    LogsStrategy,
+)
 from pyetheroll.etherscan_utils import (
     ChainEtherscanAccountFactory,
     ChainEtherscanContractFactory,
+    EtherscanSessionFactory,
+    build_logs_url,
 )
+from pyetheroll.nonce_manager import NonceManagerFactory, is_known_transaction
+from pyetheroll.records import (
+    Bet,
+    BetResult,
+    BetTransaction,
+    WeiBet,
+    WeiBetResult,
+    WeiBetTransaction,
+)
+from pyetheroll.registry import Registry
+from pyetheroll.signer import UnlockedSigner
 from pyetheroll.transaction_debugger import (
     HTTPProviderFactory,
     TransactionDebugger,
 )
-from pyetheroll.utils import get_etherscan_api_key, timestamp2datetime
-
-REQUESTS_CACHE_PARAMS = {
-    "cache_name": "requests_cache",
-    "backend": "sqlite",
-    "fast_save": True,
-    # we cache most of the request for a pretty long period, but not forever
-    # as we still want some very outdate data to get wiped at some point
-    "expire_after": 30 * 24 * 60 * 60,
-}
-REQUESTS_HEADERS = {
-    "User-Agent": "https://github.com/AndreMiras/pyetheroll",
-}
+from pyetheroll.utils import (
+    get_etherscan_api_key,
+    timestamp2datetime,
+    wei_to_ether,
+)
 
 
 def abi_definitions(contract_abi, typ):
@@ -44,33 +68,175 @@ def abi_definitions(contract_abi, typ):
 
 def merge_logs(bet_logs, bet_results_logs):
     """Merges bet logs (LogBet) with bet results logs (LogResult)."""
-    merged_logs = ()
     # per bet ID dictionary
-    bet_results_dict = {}
-    for bet_result in bet_results_logs:
-        bet_id = bet_result["bet_id"]
-        bet_results_dict = dict(bet_results_dict, **{bet_id: bet_result})
-    for bet_log in bet_logs:
-        bet_id = bet_log["bet_id"]
-        bet_result = bet_results_dict.get(bet_id)
-        merged_log = {"bet_log": bet_log, "bet_result": bet_result}
-        merged_logs += (merged_log,)
+    bet_results_dict = {
+        bet_result["bet_id"]: bet_result for bet_result in bet_results_logs
+    }
+    merged_logs = tuple(
+        {
+            "bet_log": bet_log,
+            "bet_result": bet_results_dict.get(bet_log["bet_id"]),
+        }
+        for bet_log in bet_logs
+    )
     return merged_logs
 
 
-def update_user_agent(headers=None):
+def is_past_cutoff(transaction, from_block=None, since=None):
+    """
+    Returns True if the transaction is older than the `from_block` block
+    number or the `since` datetime.
+    """
+    if from_block is not None and int(transaction["blockNumber"]) < from_block:
+        return True
+    if since is not None:
+        return timestamp2datetime(transaction["timeStamp"]) < since
+    return False
+
+
+def decode_bet_transaction(transaction, wei=False):
+    """
+    Returns the `BetTransaction` of a `playerRollDice` transaction, or the
+    `WeiBetTransaction` one.
+    """
+    # `playerRollDice(uint256 rollUnder)`, rollUnder is 256 bits
+    # let's strip it from methodID and keep only 32 bytes
+    keep_length = 2 * 32
+    roll_under = transaction["input"][-keep_length:]
+    roll_under = int(roll_under, 16)
+    record_class = WeiBetTransaction if wei else BetTransaction
+    return record_class(
+        bet_size_wei=int(transaction["value"]),
+        roll_under=roll_under,
+        block_number=transaction["blockNumber"],
+        timestamp=transaction["timeStamp"],
+        transaction_hash=transaction["hash"],
+    )
+
+
+def iter_merge_logs(
+    bet_logs, bet_results_logs, max_pending=MAX_PENDING_RESULTS
+):
+    """
+    Streaming version of `merge_logs()`.
+    Both iterables are consumed alternately, so they can be generators of
+    logs still being fetched, and merged logs are yielded as soon as a bet
+    and its result were both seen, i.e. in resolution order.
+    Unresolved bets are yielded last with a `None` result.
+    Bets and results waiting for their counterpart are kept in pending
+    tables holding at most `max_pending` entries each, the oldest ones being
+    evicted first so memory stays bounded:
+      - an evicted bet is yielded right away with a `None` result
+      - an evicted result is yielded right away with a `None` bet log, so
+        callers can still resolve its bet if it comes later
+    """
+    pending_bets = OrderedDict()
+    pending_results = OrderedDict()
+    for bet_log, bet_result in zip_longest(bet_logs, bet_results_logs):
+        if bet_result is not None:
+            bet_id = bet_result["bet_id"]
+            pending_bet = pending_bets.pop(bet_id, None)
+            if pending_bet is not None:
+                yield {"bet_log": pending_bet, "bet_result": bet_result}
+            else:
+                pending_results[bet_id] = bet_result
+                if len(pending_results) > max_pending:
+                    _, evicted_result = pending_results.popitem(last=False)
+                    yield {"bet_log": None, "bet_result": evicted_result}
+        if bet_log is not None:
+            bet_id = bet_log["bet_id"]
+            pending_result = pending_results.pop(bet_id, None)
+            if pending_result is not None:
+                yield {"bet_log": bet_log, "bet_result": pending_result}
+            else:
+                pending_bets[bet_id] = bet_log
+                if len(pending_bets) > max_pending:
+                    _, evicted_bet = pending_bets.popitem(last=False)
+                    yield {"bet_log": evicted_bet, "bet_result": None}
+    for bet_log in pending_bets.values():
+        yield {"bet_log": bet_log, "bet_result": None}
+
+
+def sort_logs(logs):
+    """
+    Orders Etherscan event logs by block and log index and drops duplicates.
+    Note Etherscan returns "0x" for a zero `logIndex`.
+    """
+    unique_logs = {
+        (log["transactionHash"], log["logIndex"]): log for log in logs
+    }
+    return sorted(
+        unique_logs.values(),
+        key=lambda log: (
+            int(log["blockNumber"], 16),
+            int(log["logIndex"][2:] or "0", 16),
+        ),
+    )
+
+
+def is_logs_range_full(logs, from_block, to_block):
+    """
+    Tells if the `getLogs` response hit the Etherscan records limit, in which
+    case its block range has to be bisected.
+    Raises `ValueError` if a single block hits the limit, since it can't be
+    split any further and its logs would be silently truncated.
+    """
+    if len(logs) < ETHERSCAN_LOGS_LIMIT:
+        return False
+    if from_block == to_block:
+        raise ValueError(
+            f"Block {from_block} logs exceed the Etherscan "
+            f"{ETHERSCAN_LOGS_LIMIT} records limit"
+        )
+    return True
+
+
+def get_logs_bisected(
+    get_range_logs,
+    from_block,
+    to_block,
+    max_workers=DEFAULT_LOGS_WORKERS,
+    get_block_number=None,
+):
     """
-    Default `requests` user agent is blocked on Ropsten, refs:
-      - https://github.com/corpetty/py-etherscan-api/issues/70
-      - https://www.reddit.com/r/etherscan/comments/dtg8xl/
+    Calls `get_range_logs(from_block, to_block)` without the Etherscan
+    records limit. Full responses get their block range bisected and the
+    sub-ranges are fetched concurrently using up to `max_workers` threads.
+    A "latest" `to_block` is resolved with `get_block_number()` when bisected.
+    Logs are returned ordered by block and log index, without duplicates.
     """
-    headers = headers or {}
-    return dict(headers, **REQUESTS_HEADERS)
+
+    def get_block_range_logs(block_range):
+        return block_range, get_range_logs(*block_range)
+
+    logs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(get_block_range_logs, (from_block, to_block))
+        }
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                (start, end), range_logs = future.result()
+                if not is_logs_range_full(range_logs, start, end):
+                    logs.extend(range_logs)
+                    continue
+                if end == "latest":
+                    end = get_block_number()
+                middle = (start + end) // 2
+                futures |= {
+                    executor.submit(get_block_range_logs, (start, middle)),
+                    executor.submit(get_block_range_logs, (middle + 1, end)),
+                }
+    return sort_logs(logs)
 
 
 class Etheroll:
 
-    _etheroll = None
+    # instances shared per `(chain_id, contract_address)`
+    _registry = Registry(
+        maxsize=ETHEROLL_REGISTRY_SIZE, ttl=ETHEROLL_REGISTRY_TTL
+    )
     CONTRACT_ADDRESSES = {
         ChainID.MAINNET: "0xf478c8Bc5448236d52067c96F8f4C8376E62Fa8f",
         ChainID.ROPSTEN: "0xe12c6dEb59f37011d2D9FdeC77A6f1A8f3B8B1e8",
@@ -97,18 +263,28 @@ class Etheroll:
         self.ChainEtherscanAccount = ChainEtherscanAccountFactory.create(
             self.chain_id
         )
-        # object construction needs to be within the context manager because
-        # the requests.Session object to be patched is initialized in the
-        # constructor
-        with requests_cache.enabled(**REQUESTS_CACHE_PARAMS):
-            self.etherscan_contract_api = ChainEtherscanContract(
-                address=self.contract_address, api_key=self.etherscan_api_key
-            )
-            self.etherscan_contract_api.http.headers = update_user_agent(
-                self.etherscan_contract_api.http.headers
-            )
-            self.contract_abi = json.loads(
-                self.etherscan_contract_api.get_abi()
+        self.etherscan_contract_api = ChainEtherscanContract(
+            address=self.contract_address, api_key=self.etherscan_api_key
+        )
+        # shares the connections pool and rate limiter of other calls
+        self.etherscan_contract_api.http = (
+            EtherscanSessionFactory.get_or_create()
+        )
+        # the ABI of a deployed contract never changes, so it's only fetched
+        # once and then read from the local store along with its signatures
+        abi_store = AbiStoreFactory.get_or_create()
+        self.contract_abi = abi_store.get_or_fetch(
+            self.chain_id,
+            self.contract_address,
+            self.etherscan_contract_api.get_abi,
+        )
+        signatures = abi_store.get_signatures(
+            self.chain_id, self.contract_address
+        )
+        # e.g. a store or seed lacking the signatures of that ABI
+        if signatures is None:
+            signatures = decode_signatures(
+                compute_signatures(self.contract_abi)
             )
         # contract_factory_class = ConciseContract
         contract_factory_class = Contract
@@ -117,10 +293,13 @@ class Etheroll:
             address=self.contract_address,
             ContractFactoryClass=contract_factory_class,
         )
-        # retrieve signatures
-        self.events_signatures = self.get_events_signatures(self.contract_abi)
-        self.functions_signatures = self.get_functions_signatures(
-            self.contract_abi
+        # decoding tables are compiled once per ABI
+        self.transaction_debugger = TransactionDebugger(self.contract_abi)
+        self.events_signatures = signatures["events"]
+        self.functions_signatures = signatures["functions"]
+        self._player_roll_dice_parser = None
+        self.nonce_manager = NonceManagerFactory.get_or_create(
+            self.chain_id, self.web3
         )
 
     @classmethod
@@ -129,15 +308,15 @@ class Etheroll:
     ):
         """
         Gets or creates the Etheroll object.
-        Also recreates the object if one init property changed.
+        One object is kept per chain ID and contract address, so switching
+        between them doesn't rebuild it, see `Registry`.
         """
         contract_address = contract_address or cls.CONTRACT_ADDRESSES[chain_id]
-        if cls._etheroll is None or (
-            cls._etheroll.chain_id,
-            cls._etheroll.contract_address,
-        ) != (chain_id, contract_address):
-            cls._etheroll = cls(chain_id, contract_address)
-        return cls._etheroll
+        # addresses are case insensitive, e.g. checksummed or not
+        return cls._registry.get_or_create(
+            (chain_id, contract_address.lower()),
+            lambda: cls(chain_id, contract_address),
+        )
 
     def definitions(self, contract_abi, typ):
         """
@@ -197,24 +376,16 @@ class Etheroll:
         events_logs = event_filter.get_all_entries()
         return events_logs
 
-    def player_roll_dice(
+    def build_player_roll_dice_tx(
         self,
         bet_size_wei,
         chances,
-        wallet_path,
-        wallet_password,
+        nonce,
         gas_price_wei=DEFAULT_GAS_PRICE_WEI,
     ):
-        """
-        Signs and broadcasts `playerRollDice` transaction.
-        Returns transaction hash.
-        """
+        """Builds the unsigned `playerRollDice` transaction."""
         roll_under = chances
         gas = 310000
-        wallet_encrypted = load_keyfile(wallet_path)
-        address = wallet_encrypted["address"]
-        from_address_normalized = to_checksum_address(address)
-        nonce = self.web3.eth.getTransactionCount(from_address_normalized)
         transaction = {
             "chainId": self.chain_id.value,
             "gas": gas,
@@ -225,40 +396,97 @@ class Etheroll:
         transaction = self.contract.functions.playerRollDice(
             roll_under
         ).buildTransaction(transaction)
-        private_key = Account.decrypt(wallet_encrypted, wallet_password)
-        signed_tx = self.web3.eth.account.signTransaction(
-            transaction, private_key
+        return transaction
+
+    def send_transaction(
+        self, build_tx, wallet_path=None, wallet_password=None, signer=None
+    ):
+        """
+        Signs and broadcasts the `build_tx(nonce)` transaction, with the
+        next nonce of the `NonceManager`.
+        The `signer` is used if given, else the wallet is decrypted for this
+        transaction only, see `UnlockedSigner`.
+        Returns transaction hash.
+        """
+        if signer is None:
+            if wallet_path is None:
+                raise ValueError("Either a wallet or a signer is required")
+            with UnlockedSigner(wallet_path, wallet_password) as signer:
+                return self.send_transaction(build_tx, signer=signer)
+
+        def send(nonce):
+            signed_tx = signer.sign_transaction(build_tx(nonce))
+            try:
+                return self.web3.eth.sendRawTransaction(
+                    signed_tx.rawTransaction
+                )
+            except Exception as exception:
+                # sending it again with a new nonce would bet twice
+                if not is_known_transaction(exception):
+                    raise
+                return signed_tx.hash
+
+        return self.nonce_manager.send(signer.address, send)
+
+    def player_roll_dice(
+        self,
+        bet_size_wei,
+        chances,
+        wallet_path=None,
+        wallet_password=None,
+        gas_price_wei=DEFAULT_GAS_PRICE_WEI,
+        signer=None,
+    ):
+        """
+        Signs and broadcasts `playerRollDice` transaction, from the wallet
+        or the already unlocked `signer`.
+        Returns transaction hash.
+        """
+        build_tx = partial(
+            self.build_player_roll_dice_tx,
+            bet_size_wei,
+            chances,
+            gas_price_wei=gas_price_wei,
+        )
+        return self.send_transaction(
+            build_tx, wallet_path, wallet_password, signer
         )
-        tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-        return tx_hash
 
     def transaction(
         self,
         to,
         value,
-        wallet_path,
-        wallet_password,
+        wallet_path=None,
+        wallet_password=None,
         gas_price_wei=DEFAULT_GAS_PRICE_WEI,
+        signer=None,
     ):
         gas = 25000
-        wallet_encrypted = load_keyfile(wallet_path)
-        address = wallet_encrypted["address"]
-        from_address_normalized = to_checksum_address(address)
-        nonce = self.web3.eth.getTransactionCount(from_address_normalized)
-        transaction = {
-            "chainId": self.chain_id.value,
-            "gas": gas,
-            "gasPrice": gas_price_wei,
-            "nonce": nonce,
-            "value": value,
-            "to": to,
-        }
-        private_key = Account.decrypt(wallet_encrypted, wallet_password)
-        signed_tx = self.web3.eth.account.signTransaction(
-            transaction, private_key
+
+        def build_tx(nonce):
+            return {
+                "chainId": self.chain_id.value,
+                "gas": gas,
+                "gasPrice": gas_price_wei,
+                "nonce": nonce,
+                "value": value,
+                "to": to,
+            }
+
+        return self.send_transaction(
+            build_tx, wallet_path, wallet_password, signer
         )
-        tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-        return tx_hash
+
+    def get_etherscan_account_api(self, address):
+        """
+        Returns an Etherscan account API client for the given address.
+        It uses the shared session rather than opening its own connections.
+        """
+        etherscan_account_api = self.ChainEtherscanAccount(
+            address=address, api_key=self.etherscan_api_key
+        )
+        etherscan_account_api.http = EtherscanSessionFactory.get_or_create()
+        return etherscan_account_api
 
     def get_transaction_page(
         self, address=None, page=1, offset=100, internal=False
@@ -268,21 +496,74 @@ class Etheroll:
             address = self.contract_address
         # that one should not be cached, because we want the user to know
         # realtime what's happening with his transaction
-        etherscan_account_api = self.ChainEtherscanAccount(
-            address=address, api_key=self.etherscan_api_key
-        )
-        etherscan_account_api.http.headers = update_user_agent(
-            etherscan_account_api.http.headers
-        )
+        etherscan_account_api = self.get_etherscan_account_api(address)
         sort = "desc"
         try:
             transactions = etherscan_account_api.get_transaction_page(
                 page=page, offset=offset, sort=sort, internal=internal
             )
-        except EmptyResponse:
+        except EmptyResponse as exception:
+            # other errors, e.g. "NOTOK" when rate limited, are not empty
+            if "No transactions found" not in str(exception):
+                raise
             transactions = []
         return transactions
 
+    def iter_transaction_pages(
+        self,
+        address=None,
+        offset=100,
+        internal=False,
+        from_block=None,
+        since=None,
+    ):
+        """
+        Lazily yields all the transactions pages, most recent first.
+        The next page is prefetched while the current one is consumed.
+        Paging stops on the last page, or on the first one reaching the
+        `from_block`/`since` cutoff, see `is_past_cutoff()`.
+        """
+        max_page = ETHERSCAN_TRANSACTIONS_LIMIT // offset
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                self.get_transaction_page, address, 1, offset, internal
+            )
+            for page in range(1, max_page + 1):
+                transactions = future.result()
+                last_page = (
+                    len(transactions) < offset
+                    or page == max_page
+                    or is_past_cutoff(transactions[-1], from_block, since)
+                )
+                if not last_page:
+                    future = executor.submit(
+                        self.get_transaction_page,
+                        address,
+                        page + 1,
+                        offset,
+                        internal,
+                    )
+                yield transactions
+                if last_page:
+                    break
+
+    def iter_transactions(
+        self, address=None, offset=100, from_block=None, since=None
+    ):
+        """
+        Lazily yields all the transactions, most recent first, down to the
+        `from_block`/`since` cutoff.
+        """
+        pages = self.iter_transaction_pages(
+            address, offset, from_block=from_block, since=since
+        )
+        for transactions in pages:
+            for transaction in transactions:
+                if is_past_cutoff(transaction, from_block, since):
+                    pages.close()
+                    return
+                yield transaction
+
     def get_player_roll_dice_tx(self, address, page=1, offset=100):
         """
         Retrieves `address` last `playerRollDice` transactions associated with
@@ -292,62 +573,104 @@ class Etheroll:
         transactions = self.get_transaction_page(
             address=address, page=page, offset=offset
         )
-        # keeps only transactions sent to Etheroll contract
-        transactions = filter(
-            lambda t: t["to"].lower() == self.contract_address.lower(),
-            transactions,
-        )
-        # keeps only transactions to `playerRollDice` methodID
-        method_id = self.functions_signatures["playerRollDice"].hex()[:10]
-        self.functions_signatures
-        transactions = filter(
-            lambda t: t["input"].lower().startswith(method_id), transactions
+        return self.filter_player_roll_dice_tx(transactions)
+
+    def iter_player_roll_dice_tx(
+        self, address, offset=100, from_block=None, since=None
+    ):
+        """
+        Lazily yields all the `address` `playerRollDice` transactions, see
+        `iter_transactions()`.
+        """
+        return filter(
+            self.is_player_roll_dice_tx,
+            self.iter_transactions(address, offset, from_block, since),
         )
-        # let's not keep it as an iterator
-        transactions = list(transactions)
-        return transactions
 
-    def get_last_bets_transactions(self, address=None, page=1, offset=100):
+    @property
+    def player_roll_dice_parser(self):
+        """Built on first use, as only needed with transactions."""
+        if self._player_roll_dice_parser is None:
+            method_id = self.functions_signatures["playerRollDice"].hex()[:10]
+            self._player_roll_dice_parser = PlayerRollDiceParser(
+                self.contract_address, method_id
+            )
+        return self._player_roll_dice_parser
+
+    def is_player_roll_dice_tx(self, transaction):
+        """
+        Returns True for `playerRollDice` transactions sent to the Etheroll
+        contract.
+        """
+        return self.player_roll_dice_parser.is_player_roll_dice_tx(transaction)
+
+    def filter_player_roll_dice_tx(self, transactions):
+        """
+        Keeps only `playerRollDice` transactions sent to the Etheroll contract.
+        """
+        return self.player_roll_dice_parser.filter(transactions)
+
+    def get_last_bets_transactions(
+        self, address=None, page=1, offset=100, wei=False
+    ):
         """
         Retrieves `address` last bets from transactions and returns the list
         of bets infos. Does not return the actual roll result.
+        Amounts are exact integer Wei rather than Ether with `wei=True`.
         """
-        bets = ()
         transactions = self.get_player_roll_dice_tx(
             address=address, page=page, offset=offset
         )
-        for transaction in transactions:
-            # from Wei to Ether
-            bet_size_ether = int(transaction["value"]) / 1e18
-            # `playerRollDice(uint256 rollUnder)`, rollUnder is 256 bits
-            # let's strip it from methodID and keep only 32 bytes
-            keep_length = 2 * 32
-            roll_under = transaction["input"][-keep_length:]
-            roll_under = int(roll_under, 16)
-            block_number = transaction["blockNumber"]
-            timestamp = transaction["timeStamp"]
-            date_time = timestamp2datetime(timestamp)
-            transaction_hash = transaction["hash"]
-            bet = {
-                "bet_size_ether": bet_size_ether,
-                "roll_under": roll_under,
-                "block_number": block_number,
-                "timestamp": timestamp,
-                "datetime": date_time,
-                "transaction_hash": transaction_hash,
-            }
-            bets += (bet,)
-        return bets
+        return self.decode_bets_transactions(transactions, wei)
 
-    def get_bets_logs(self, address, from_block, to_block="latest"):
+    def get_last_bets_transactions_columns(
+        self, address=None, page=1, offset=100
+    ):
+        """
+        Same as `get_last_bets_transactions()`, but keeps the bets as
+        `BetTransactionsColumns`, building the records being most of the
+        decoding time.
+        """
+        transactions = self.get_player_roll_dice_tx(
+            address=address, page=page, offset=offset
+        )
+        return BetTransactionsColumns.from_transactions(transactions)
+
+    def iter_bets_transactions(
+        self, address=None, offset=100, from_block=None, since=None, wei=False
+    ):
+        """
+        Lazily yields all the `address` bets infos from transactions, most
+        recent first, see `iter_transactions()`.
+        """
+        transactions = self.iter_player_roll_dice_tx(
+            address, offset, from_block, since
+        )
+        return map(partial(decode_bet_transaction, wei=wei), transactions)
+
+    def decode_bets_transactions(self, transactions, wei=False):
+        """
+        Returns the bets infos of `playerRollDice` transactions, decoded in
+        one pass, see `BetTransactionsColumns`.
+        """
+        columns = BetTransactionsColumns.from_transactions(transactions)
+        return columns.to_records(wei)
+
+    def get_bets_logs(self, address, from_block, to_block="latest", wei=False):
         """
         Retrieves `address` last bets from event logs and returns the list
         of bets with decoded info. Does not return the actual roll result.
         Least recent first (index 0), most recent last (index -1).
+        Amounts are exact integer Wei rather than Ether with `wei=True`.
         """
-        bets = ()
         bet_events = self.get_log_bet_events(address, from_block, to_block)
-        transaction_debugger = TransactionDebugger(self.contract_abi)
+        return self.decode_bet_events(bet_events, wei)
+
+    def decode_bet_events(self, bet_events, wei=False):
+        """Decodes raw `LogBet` events to `Bet`, or `WeiBet`, records."""
+        record_class = WeiBet if wei else Bet
+        bets = []
+        transaction_debugger = self.transaction_debugger
         for bet_event in bet_events:
             topics = [HexBytes(topic) for topic in bet_event["topics"]]
             log_data = bet_event["data"]
@@ -355,40 +678,39 @@ class Etheroll:
                 topics, log_data
             )
             call = decoded_method["call"]
-            bet_id = call["BetID"].hex()
-            reward_value = call["RewardValue"]
-            reward_value_ether = round(reward_value / 1e18, ROUND_DIGITS)
-            profit_value = call["ProfitValue"]
-            profit_value_ether = round(profit_value / 1e18, ROUND_DIGITS)
-            bet_value = call["BetValue"]
-            bet_value_ether = round(bet_value / 1e18, ROUND_DIGITS)
-            roll_under = call["PlayerNumber"]
-            timestamp = bet_event["timeStamp"]
-            date_time = timestamp2datetime(timestamp)
-            transaction_hash = bet_event["transactionHash"]
-            bet = {
-                "bet_id": bet_id,
-                "reward_value_ether": reward_value_ether,
-                "profit_value_ether": profit_value_ether,
-                "bet_value_ether": bet_value_ether,
-                "roll_under": roll_under,
-                "timestamp": timestamp,
-                "datetime": date_time,
-                "transaction_hash": transaction_hash,
-            }
-            bets += (bet,)
-        return bets
+            bet = record_class(
+                bet_id=call["BetID"].hex(),
+                reward_value_wei=call["RewardValue"],
+                profit_value_wei=call["ProfitValue"],
+                bet_value_wei=call["BetValue"],
+                roll_under=call["PlayerNumber"],
+                timestamp=bet_event["timeStamp"],
+                transaction_hash=bet_event["transactionHash"],
+            )
+            bets.append(bet)
+        return tuple(bets)
 
-    def get_bet_results_logs(self, address, from_block, to_block="latest"):
+    def get_bet_results_logs(
+        self, address, from_block, to_block="latest", wei=False
+    ):
         """
         Retrieves `address` bet results from event logs and returns the list of
         bet results with decoded info.
+        Amounts are exact integer Wei rather than Ether with `wei=True`.
         """
-        results = ()
         result_events = self.get_log_result_events(
             address, from_block, to_block
         )
-        transaction_debugger = TransactionDebugger(self.contract_abi)
+        return self.decode_result_events(result_events, wei)
+
+    def decode_result_events(self, result_events, wei=False):
+        """
+        Decodes raw `LogResult` events to `BetResult`, or `WeiBetResult`,
+        records.
+        """
+        record_class = WeiBetResult if wei else BetResult
+        results = []
+        transaction_debugger = self.transaction_debugger
         for result_event in result_events:
             topics = [HexBytes(topic) for topic in result_event["topics"]]
             log_data = result_event["data"]
@@ -396,32 +718,53 @@ class Etheroll:
                 topics, log_data
             )
             call = decoded_method["call"]
-            bet_id = call["BetID"].hex()
-            roll_under = call["PlayerNumber"]
-            dice_result = call["DiceResult"]
-            # not to be mistaken with what the user bet here, in this case it's
-            # what he will receive/loss as a result of his bet
-            bet_value = call["Value"]
-            bet_value_ether = round(bet_value / 1e18, ROUND_DIGITS)
-            timestamp = result_event["timeStamp"]
-            date_time = timestamp2datetime(timestamp)
-            transaction_hash = result_event["transactionHash"]
-            bet = {
-                "bet_id": bet_id,
-                "roll_under": roll_under,
-                "dice_result": dice_result,
-                "bet_value_ether": bet_value_ether,
-                "timestamp": timestamp,
-                "datetime": date_time,
-                "transaction_hash": transaction_hash,
-            }
-            results += (bet,)
-        return results
+            result = record_class(
+                bet_id=call["BetID"].hex(),
+                roll_under=call["PlayerNumber"],
+                dice_result=call["DiceResult"],
+                # not to be mistaken with what the user bet here, in this
+                # case it's what he will receive/loss as a result of his bet
+                bet_value_wei=call["Value"],
+                timestamp=result_event["timeStamp"],
+                transaction_hash=result_event["transactionHash"],
+            )
+            results.append(result)
+        return tuple(results)
+
+    def get_bets_columns(self, address, from_block, to_block="latest"):
+        """
+        Same as `get_bets_logs()`, but batch decodes the `LogBet` events into
+        `BetsColumns`, which is much faster on large block ranges.
+        """
+        bet_events = self.get_log_bet_events(address, from_block, to_block)
+        event_abi = self.transaction_debugger.methods_infos["LogBet"]["abi"]
+        return BetsColumns.from_logs(event_abi, bet_events)
+
+    def get_bet_results_columns(self, address, from_block, to_block="latest"):
+        """
+        Same as `get_bet_results_logs()`, but batch decodes the `LogResult`
+        events into `BetResultsColumns`.
+        """
+        result_events = self.get_log_result_events(
+            address, from_block, to_block
+        )
+        event_abi = self.transaction_debugger.methods_infos["LogResult"][
+            "abi"
+        ]
+        return BetResultsColumns.from_logs(event_abi, result_events)
 
     def get_last_bets_blocks(self, address):
         """Returns a block range containing the "last" bets."""
         # retrieves recent `playerRollDice` transactions
         transactions = self.get_player_roll_dice_tx(address)
+        return self.get_bets_blocks(transactions)
+
+    @staticmethod
+    def get_bets_blocks(transactions):
+        """
+        Returns a block range containing the bets of the given (most recent
+        first) `playerRollDice` transactions.
+        """
         if not transactions:
             return None
         # take the oldest block of the recent transactions
@@ -437,20 +780,48 @@ class Etheroll:
         ret = {"from_block": from_block, "to_block": to_block}
         return ret
 
-    def get_merged_logs(self, address):
+    def get_merged_logs(
+        self, address, strategy=LogsStrategy.THREADS, wei=False
+    ):
         """
         Returns the merged logs.
         Least recent first (index 0), most recent last (index -1).
+        The `strategy` defines how `LogBet` and `LogResult` events are
+        fetched once the block range is known, see `LogsStrategy`.
+        Amounts are exact integer Wei rather than Ether with `wei=True`.
         """
         last_bets_blocks = self.get_last_bets_blocks(address)
         if last_bets_blocks is None:
             return ()
         from_block = last_bets_blocks["from_block"]
         to_block = last_bets_blocks["to_block"]
-        bet_logs = self.get_bets_logs(address, from_block, to_block)
-        bet_results_logs = self.get_bet_results_logs(
-            address, from_block, to_block
-        )
+        if strategy == LogsStrategy.SEQUENTIAL:
+            bet_logs = self.get_bets_logs(address, from_block, to_block, wei)
+            bet_results_logs = self.get_bet_results_logs(
+                address, from_block, to_block, wei
+            )
+        elif strategy == LogsStrategy.THREADS:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                bet_logs_future = executor.submit(
+                    self.get_bets_logs, address, from_block, to_block, wei
+                )
+                bet_results_logs_future = executor.submit(
+                    self.get_bet_results_logs,
+                    address,
+                    from_block,
+                    to_block,
+                    wei,
+                )
+            bet_logs = bet_logs_future.result()
+            bet_results_logs = bet_results_logs_future.result()
+        elif strategy == LogsStrategy.COMBINED:
+            bet_events, result_events = self.get_log_bet_and_result_events(
+                address, from_block, to_block
+            )
+            bet_logs = self.decode_bet_events(bet_events, wei)
+            bet_results_logs = self.decode_result_events(result_events, wei)
+        else:
+            raise ValueError(f"Unknown strategy {strategy}")
         merged_logs = merge_logs(bet_logs, bet_results_logs)
         return merged_logs
 
@@ -466,54 +837,18 @@ class Etheroll:
         topic_opr=None,
     ):
         """Builds the Etherscan API URL call for the `getLogs` action."""
-        url = self.ChainEtherscanAccount.PREFIX
-        url += "module=logs&action=getLogs&"
-        url += f"apikey={self.etherscan_api_key}&"
-        url += f"address={address}&"
-        url += f"fromBlock={from_block}&"
-        url += f"toBlock={to_block}&"
-        if topic0 is not None:
-            url += f"topic0={topic0}&"
-        if topic1 is not None:
-            url += f"topic1={topic1}&"
-        if topic2 is not None:
-            url += f"topic2={topic2}&"
-        if topic3 is not None:
-            url += f"topic3={topic3}&"
-        if topic_opr is not None:
-            topic0_1_opr = topic_opr.get("topic0_1_opr", "")
-            topic0_1_opr = (
-                "topic0_1_opr={}&".format(topic0_1_opr) if topic0_1_opr else ""
-            )
-            topic1_2_opr = topic_opr.get("topic1_2_opr", "")
-            topic1_2_opr = (
-                "topic1_2_opr={}&".format(topic1_2_opr) if topic1_2_opr else ""
-            )
-            topic2_3_opr = topic_opr.get("topic2_3_opr", "")
-            topic2_3_opr = (
-                "topic2_3_opr={}&".format(topic2_3_opr) if topic2_3_opr else ""
-            )
-            topic0_2_opr = topic_opr.get("topic0_2_opr", "")
-            topic0_2_opr = (
-                "topic0_2_opr={}&".format(topic0_2_opr) if topic0_2_opr else ""
-            )
-            topic0_3_opr = topic_opr.get("topic0_3_opr", "")
-            topic0_3_opr = (
-                "topic0_3_opr={}&".format(topic0_3_opr) if topic0_3_opr else ""
-            )
-            topic1_3_opr = topic_opr.get("topic1_3_opr", "")
-            topic1_3_opr = (
-                "topic1_3_opr={}&".format(topic1_3_opr) if topic1_3_opr else ""
-            )
-            url += (
-                topic0_1_opr
-                + topic1_2_opr
-                + topic2_3_opr
-                + topic0_2_opr
-                + topic0_3_opr
-                + topic1_3_opr
-            )
-        return url
+        return build_logs_url(
+            self.ChainEtherscanAccount.PREFIX,
+            self.etherscan_api_key,
+            address,
+            from_block,
+            to_block,
+            topic0,
+            topic1,
+            topic2,
+            topic3,
+            topic_opr,
+        )
 
     def get_logs(
         self,
@@ -541,12 +876,45 @@ class Etheroll:
             topic_opr,
         )
 
-        headers = update_user_agent()
-        response = requests.get(url, headers=headers)
+        session = EtherscanSessionFactory.get_or_create()
+        response = session.get(url)
         response = response.json()
         logs = response["result"]
+        # errors, e.g. "Max rate limit reached", are returned as the result
+        if not isinstance(logs, list):
+            raise ClientException(logs)
         return logs
 
+    def get_logs_chunked(
+        self,
+        address,
+        from_block,
+        to_block="latest",
+        topic0=None,
+        topic1=None,
+        topic2=None,
+        topic3=None,
+        topic_opr=None,
+        max_workers=DEFAULT_LOGS_WORKERS,
+    ):
+        """
+        Same as `get_logs()` without the Etherscan records limit, full block
+        ranges get bisected, see `get_logs_bisected()`.
+        """
+
+        def get_range_logs(start, end):
+            return self.get_logs(
+                address, start, end, topic0, topic1, topic2, topic3, topic_opr
+            )
+
+        return get_logs_bisected(
+            get_range_logs,
+            from_block,
+            to_block,
+            max_workers,
+            lambda: self.web3.eth.blockNumber,
+        )
+
     def get_log_bet_events(
         self, player_address, from_block, to_block="latest"
     ):
@@ -555,20 +923,22 @@ class Etheroll:
         between two blocks.
         """
         address = self.contract_address
-        topic0 = self.events_signatures["LogBet"].hex()
-        # adds zero padding to match topic format (32 bytes)
-        topic2 = "0x" + player_address[2:].zfill(2 * 32)
-        topic_opr = {"topic0_2_opr": "and"}
-        logs = self.get_logs(
+        logs = self.get_logs_chunked(
             address,
             from_block,
             to_block,
-            topic0,
-            topic2=topic2,
-            topic_opr=topic_opr,
+            **self.get_log_bet_topics(player_address),
         )
         return logs
 
+    def get_log_bet_topics(self, player_address):
+        """`getLogs` topics filtering `player_address` `LogBet` events."""
+        topic0 = self.events_signatures["LogBet"].hex()
+        # adds zero padding to match topic format (32 bytes)
+        topic2 = "0x" + player_address[2:].zfill(2 * 32)
+        topic_opr = {"topic0_2_opr": "and"}
+        return {"topic0": topic0, "topic2": topic2, "topic_opr": topic_opr}
+
     def get_log_result_events(
         self, player_address, from_block, to_block="latest"
     ):
@@ -576,33 +946,68 @@ class Etheroll:
         Retrieves all `LogResult` events associated with `player_address`
         between two blocks.
         """
-        log_result_signature = self.events_signatures["LogResult"].hex()
         address = self.contract_address
+        logs = self.get_logs_chunked(
+            address,
+            from_block,
+            to_block,
+            **self.get_log_result_topics(player_address),
+        )
+        return logs
+
+    def get_log_result_topics(self, player_address):
+        """`getLogs` topics filtering `player_address` `LogResult` events."""
+        log_result_signature = self.events_signatures["LogResult"].hex()
         topic0 = log_result_signature
         # adds zero padding to match topic format (32 bytes)
         topic3 = "0x" + player_address[2:].zfill(2 * 32)
         topic_opr = {"topic0_3_opr": "and"}
-        logs = self.get_logs(
+        return {"topic0": topic0, "topic3": topic3, "topic_opr": topic_opr}
+
+    def get_log_bet_and_result_events(
+        self, player_address, from_block, to_block="latest"
+    ):
+        """
+        Retrieves both `LogBet` and `LogResult` events associated with
+        `player_address` between two blocks using a single `getLogs` query.
+        The player is `LogBet` topic2 and `LogResult` topic3, so both are
+        ORed and events are then split by their topic0 signature.
+        Returns a `(bet_events, result_events)` tuple.
+        """
+        address = self.contract_address
+        # adds zero padding to match topic format (32 bytes)
+        player_topic = "0x" + player_address[2:].lower().zfill(2 * 32)
+        logs = self.get_logs_chunked(
             address,
             from_block,
             to_block,
-            topic0,
-            topic3=topic3,
-            topic_opr=topic_opr,
+            topic2=player_topic,
+            topic3=player_topic,
+            topic_opr={"topic2_3_opr": "or"},
         )
-        return logs
-
-    def get_balance(self, address):
+        log_bet_topic = self.events_signatures["LogBet"].hex()
+        log_result_topic = self.events_signatures["LogResult"].hex()
+        bet_events = []
+        result_events = []
+        for log in logs:
+            # topics may or may not be "0x" prefixed
+            topics = ["0x" + topic[-64:].lower() for topic in log["topics"]]
+            # both filters are ORed, so makes sure the player is at the
+            # expected position of the given event
+            if topics[0] == log_bet_topic and topics[2] == player_topic:
+                bet_events.append(log)
+            elif topics[0] == log_result_topic and topics[3] == player_topic:
+                result_events.append(log)
+        return bet_events, result_events
+
+    def get_balance(self, address, wei=False):
         """
         Retrieves the Ether balance of the given account, refs:
         https://github.com/AndreMiras/EtherollApp/issues/8
+        Returns the exact integer Wei balance with `wei=True`.
         """
-        etherscan_account_api = self.ChainEtherscanAccount(
-            address=address, api_key=self.etherscan_api_key
-        )
-        etherscan_account_api.http.headers = update_user_agent(
-            etherscan_account_api.http.headers
-        )
+        etherscan_account_api = self.get_etherscan_account_api(address)
         balance_wei = int(etherscan_account_api.get_balance())
-        balance_eth = round(balance_wei / 1e18, ROUND_DIGITS)
-        return balance_eth
+        if wei:
+            return balance_wei
+        return wei_to_ether(balance_wei)
@@ -1,7 +1,25 @@
+import threading
+import time
+
+import requests
 from etherscan.accounts import Account as EtherscanAccount
 from etherscan.contracts import Contract as EtherscanContract
+from requests.adapters import HTTPAdapter
+
+from pyetheroll.constants import (
+    DEFAULT_POOL_SIZE,
+    ETHERSCAN_MAX_RETRIES,
+    ChainID,
+)
+from pyetheroll.rate_limiter import TokenBucket, backoff_delay, is_rate_limited
+from pyetheroll.utils import get_etherscan_api_key
 
-from pyetheroll.constants import ChainID
+# default `requests` user agent is blocked on Ropsten
+REQUESTS_HEADERS = {
+    "User-Agent": "https://github.com/AndreMiras/pyetheroll",
+}
+# `rate_limiter` sentinel explicitly disabling the sessions throttling
+NO_RATE_LIMIT = object()
 
 
 class RopstenEtherscanContract(EtherscanContract):
@@ -42,3 +60,170 @@ class ChainEtherscanAccountFactory:
     def create(cls, chain_id=ChainID.MAINNET):
         ChainEtherscanAccount = cls.ACCOUNTS[chain_id]
         return ChainEtherscanAccount
+
+
+class EtherscanAdapter(HTTPAdapter):
+    """
+    Transport adapter throttling requests with the `rate_limiter` and
+    retrying rate limited or server errors responses with jittered
+    exponential backoff.
+    The rate limiter can be any object with an `acquire()` method.
+    """
+
+    def __init__(
+        self,
+        *args,
+        rate_limiter=None,
+        rate_limit_retries=ETHERSCAN_MAX_RETRIES,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
+
+    def send(self, request, stream=False, **kwargs):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = super().send(request, stream=stream, **kwargs)
+            # the payload can't be checked without consuming the stream
+            if (
+                stream
+                or attempt >= self.rate_limit_retries
+                or not is_rate_limited(response.status_code, response.text)
+            ):
+                return response
+            response.close()
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+
+class EtherscanSessionFactory:
+    """
+    Creates the keep-alive `requests.Session` shared by all Etherscan calls,
+    so connections get reused rather than reopened on every call.
+    Calls are throttled by a shared rate limiter, `TokenBucket` by default,
+    `NO_RATE_LIMIT` disables throttling.
+    """
+
+    _session = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def create(cls, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None):
+        if rate_limiter is None:
+            rate_limiter = TokenBucket()
+        elif rate_limiter is NO_RATE_LIMIT:
+            rate_limiter = None
+        session = requests.Session()
+        adapter = EtherscanAdapter(
+            rate_limiter=rate_limiter,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(REQUESTS_HEADERS)
+        return session
+
+    @classmethod
+    def get_or_create(cls):
+        """Returns the process-wide session, creating it on first use."""
+        with cls._lock:
+            if cls._session is None:
+                cls._session = cls.create()
+            return cls._session
+
+    @classmethod
+    def get_adapter(cls):
+        """
+        Returns the shared session adapter, so other sessions can mount it
+        to share the connections pool and rate limiter.
+        """
+        return cls.get_or_create().get_adapter("https://")
+
+    @classmethod
+    def configure(cls, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None):
+        """
+        Replaces the process-wide session with a `pool_size` one,
+        throttled by a new `TokenBucket` unless `rate_limiter` is given.
+        """
+        session = cls.create(pool_size, rate_limiter)
+        with cls._lock:
+            previous_session, cls._session = cls._session, session
+        if previous_session is not None:
+            previous_session.close()
+        return session
+
+
+def build_logs_url(
+    prefix,
+    api_key,
+    address,
+    from_block,
+    to_block="latest",
+    topic0=None,
+    topic1=None,
+    topic2=None,
+    topic3=None,
+    topic_opr=None,
+):
+    """Builds the Etherscan API URL call for the `getLogs` action."""
+    url = prefix
+    url += "module=logs&action=getLogs&"
+    url += f"apikey={api_key}&"
+    url += f"address={address}&"
+    url += f"fromBlock={from_block}&"
+    url += f"toBlock={to_block}&"
+    if topic0 is not None:
+        url += f"topic0={topic0}&"
+    if topic1 is not None:
+        url += f"topic1={topic1}&"
+    if topic2 is not None:
+        url += f"topic2={topic2}&"
+    if topic3 is not None:
+        url += f"topic3={topic3}&"
+    if topic_opr is not None:
+        topic0_1_opr = topic_opr.get("topic0_1_opr", "")
+        topic0_1_opr = (
+            "topic0_1_opr={}&".format(topic0_1_opr) if topic0_1_opr else ""
+        )
+        topic1_2_opr = topic_opr.get("topic1_2_opr", "")
+        topic1_2_opr = (
+            "topic1_2_opr={}&".format(topic1_2_opr) if topic1_2_opr else ""
+        )
+        topic2_3_opr = topic_opr.get("topic2_3_opr", "")
+        topic2_3_opr = (
+            "topic2_3_opr={}&".format(topic2_3_opr) if topic2_3_opr else ""
+        )
+        topic0_2_opr = topic_opr.get("topic0_2_opr", "")
+        topic0_2_opr = (
+            "topic0_2_opr={}&".format(topic0_2_opr) if topic0_2_opr else ""
+        )
+        topic0_3_opr = topic_opr.get("topic0_3_opr", "")
+        topic0_3_opr = (
+            "topic0_3_opr={}&".format(topic0_3_opr) if topic0_3_opr else ""
+        )
+        topic1_3_opr = topic_opr.get("topic1_3_opr", "")
+        topic1_3_opr = (
+            "topic1_3_opr={}&".format(topic1_3_opr) if topic1_3_opr else ""
+        )
+        url += (
+            topic0_1_opr
+            + topic1_2_opr
+            + topic2_3_opr
+            + topic0_2_opr
+            + topic0_3_opr
+            + topic1_3_opr
+        )
+    return url
+
+
+def fetch_contract_abi(chain_id, contract_address):
+    """Fetches the JSON encoded contract ABI from Etherscan."""
+    api_key = get_etherscan_api_key()
+    ChainEtherscanContract = ChainEtherscanContractFactory.create(chain_id)
+    api = ChainEtherscanContract(address=contract_address, api_key=api_key)
+    api.http = EtherscanSessionFactory.get_or_create()
+    return api.get_abi()
@@ -0,0 +1,232 @@
+"""
+Apache Arrow/Parquet export of merged bets, requires the `arrow` extra:
+```
+pip install pyetheroll[arrow]
+```
+Bets are joined with their results in chunks and written in row groups, so
+histories of any size are exported in bounded memory.
+Wei amounts are exact `decimal256(76, 0)` columns.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pyetheroll.batch_decoder import (
+    ADDRESS_SIZE,
+    WORD_SIZE,
+    BetResultsColumns,
+    BetsColumns,
+)
+from pyetheroll.constants import EXPORT_ROW_GROUP_SIZE, MAX_PENDING_RESULTS
+
+WEI_TYPE = pa.decimal256(76, 0)
+# Parquet has no second precision timestamps
+TIMESTAMP_TYPE = pa.timestamp("ms")
+MERGED_BETS_SCHEMA = pa.schema(
+    [
+        ("bet_id", pa.binary(WORD_SIZE)),
+        ("player", pa.binary(ADDRESS_SIZE)),
+        ("block_number", pa.uint64()),
+        ("log_index", pa.uint64()),
+        ("timestamp", TIMESTAMP_TYPE),
+        ("transaction_hash", pa.string()),
+        ("reward_value_wei", WEI_TYPE),
+        ("profit_value_wei", WEI_TYPE),
+        ("bet_value_wei", WEI_TYPE),
+        ("roll_under", pa.uint8()),
+        # null while the bet isn't resolved
+        ("dice_result", pa.uint8()),
+        ("result_value_wei", WEI_TYPE),
+        ("result_timestamp", TIMESTAMP_TYPE),
+        ("result_transaction_hash", pa.string()),
+    ]
+)
+
+
+def fixed_size_binary_array(matrix):
+    """Converts a `(n, size)` uint8 matrix to a `binary(size)` array."""
+    size = matrix.shape[1]
+    buffer = pa.py_buffer(np.ascontiguousarray(matrix).tobytes())
+    return pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(size), len(matrix), [None, buffer]
+    )
+
+
+def wei_array(limbs, mask=None):
+    """
+    Converts Wei limbs to a decimal array, `mask` marking nulls.
+    Decimals are stored as 256 bits little endian integers, so the limbs are
+    laid out in that buffer directly, low limb first.
+    """
+    words = np.zeros((len(limbs), 4), dtype="<u8")
+    words[:, 0] = limbs[:, 1]
+    words[:, 1] = limbs[:, 0]
+    validity = None
+    if mask is not None:
+        validity = pa.py_buffer(np.packbits(~mask, bitorder="little"))
+    return pa.Array.from_buffers(
+        WEI_TYPE, len(limbs), [validity, pa.py_buffer(words)]
+    )
+
+
+def timestamp_array(timestamps, mask=None):
+    """Converts Unix timestamps in seconds to a timestamp array."""
+    milliseconds = timestamps.astype(np.int64) * 1000
+    return pa.array(milliseconds, type=TIMESTAMP_TYPE, mask=mask)
+
+
+def merged_bets_batch(bets, results, result_indices):
+    """
+    Returns the `MERGED_BETS_SCHEMA` record batch of `bets`, joined with the
+    `results` at `result_indices`, -1 for unresolved bets.
+    """
+    mask = result_indices < 0
+    matched = None
+    if results is not None and len(results):
+        # unresolved rows take any result, they're masked anyway
+        matched = results.take(np.where(mask, 0, result_indices))
+    arrays = [
+        fixed_size_binary_array(bets["bet_id"]),
+        fixed_size_binary_array(bets["player"]),
+        pa.array(bets["block_number"], type=pa.uint64()),
+        pa.array(bets["log_index"], type=pa.uint64()),
+        timestamp_array(bets["timestamp"]),
+        pa.array(bets["transaction_hash"], type=pa.string()),
+        wei_array(bets["reward_value_wei"]),
+        wei_array(bets["profit_value_wei"]),
+        wei_array(bets["bet_value_wei"]),
+        pa.array(bets["roll_under"].astype(np.uint8), type=pa.uint8()),
+    ]
+    if matched is None:
+        bet_fields = len(arrays)
+        result_fields = list(MERGED_BETS_SCHEMA)[bet_fields:]
+        arrays += [
+            pa.nulls(len(bets), type=field.type) for field in result_fields
+        ]
+    else:
+        arrays += [
+            pa.array(
+                matched["dice_result"].astype(np.uint8),
+                type=pa.uint8(),
+                mask=mask,
+            ),
+            wei_array(matched["bet_value_wei"], mask),
+            timestamp_array(matched["timestamp"], mask),
+            pa.array(matched["transaction_hash"], type=pa.string(), mask=mask),
+        ]
+    return pa.RecordBatch.from_arrays(arrays, schema=MERGED_BETS_SCHEMA)
+
+
+class ParquetExporter:
+    """
+    Streams merged bets to a Parquet file.
+    Chunks of bets and results are passed to `write()`, e.g. per indexer
+    shard, a bet whose result comes in a later chunk is kept pending.
+    Up to `max_pending` bets wait for their result, older ones and the
+    ones still pending on `close()` are written unresolved.
+    """
+
+    def __init__(
+        self,
+        path,
+        row_group_size=EXPORT_ROW_GROUP_SIZE,
+        max_pending=MAX_PENDING_RESULTS,
+    ):
+        self.row_group_size = row_group_size
+        self.max_pending = max_pending
+        self.writer = pq.ParquetWriter(path, MERGED_BETS_SCHEMA)
+        self.pending_bets = None
+        self.pending_results = None
+        self.batches = []
+        self.buffered_rows = 0
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def buffer(self, batch):
+        self.batches.append(batch)
+        self.buffered_rows += batch.num_rows
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered rows, by row groups of `row_group_size`."""
+        if self.batches:
+            table = pa.Table.from_batches(self.batches)
+            self.writer.write_table(table, row_group_size=self.row_group_size)
+            self.rows += table.num_rows
+        self.batches = []
+        self.buffered_rows = 0
+
+    @staticmethod
+    def concatenate(pending, columns):
+        if pending is None or not len(pending):
+            return columns
+        return type(columns).concatenate([pending, columns])
+
+    def write(self, bets: BetsColumns, results: BetResultsColumns):
+        """Joins and writes the resolved bets of the chunk."""
+        bets = self.concatenate(self.pending_bets, bets)
+        # pending bets come first whatever their block, puts them back in
+        # chain order so rows are written and evicted oldest first
+        bets = bets.take(np.lexsort((bets["log_index"], bets["block_number"])))
+        results = self.concatenate(self.pending_results, results)
+        results_by_bet_id = {
+            bet_id.tobytes(): index
+            for index, bet_id in enumerate(results["bet_id"])
+        }
+        result_indices = np.array(
+            [
+                results_by_bet_id.get(bet_id.tobytes(), -1)
+                for bet_id in bets["bet_id"]
+            ],
+            dtype=np.int64,
+        )
+        resolved = result_indices >= 0
+        # the oldest pending bets over the limit are written unresolved
+        overflow = max(0, int((~resolved).sum()) - self.max_pending)
+        unresolved_indices = np.flatnonzero(~resolved)
+        written = resolved.copy()
+        written[unresolved_indices[:overflow]] = True
+        if written.any():
+            self.buffer(
+                merged_bets_batch(
+                    bets.take(written), results, result_indices[written]
+                )
+            )
+        self.pending_bets = bets.take(~written)
+        # results waiting for their bet, the oldest are dropped
+        unused = np.ones(len(results), dtype=bool)
+        unused[result_indices[resolved]] = False
+        unused_indices = np.flatnonzero(unused)
+        first_kept = max(0, len(unused_indices) - self.max_pending)
+        self.pending_results = results.take(unused_indices[first_kept:])
+
+    def close(self):
+        """Writes the bets still pending unresolved and closes the file."""
+        if self.pending_bets is not None and len(self.pending_bets):
+            result_indices = np.full(len(self.pending_bets), -1)
+            self.buffer(
+                merged_bets_batch(
+                    self.pending_bets, self.pending_results, result_indices
+                )
+            )
+            self.pending_bets = None
+        self.flush()
+        self.writer.close()
+
+
+def export_merged_bets(path, chunks, row_group_size=EXPORT_ROW_GROUP_SIZE):
+    """
+    Exports `(bets, results)` columns chunks to a Parquet file, e.g.
+    >>> export_merged_bets("bets.parquet", indexer.iter_load())
+    Returns the number of exported bets.
+    """
+    with ParquetExporter(path, row_group_size) as exporter:
+        for bets, results in chunks:
+            exporter.write(bets, results)
+    return exporter.rows
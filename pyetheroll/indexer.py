@@ -0,0 +1,315 @@
+"""
+Full contract events indexer, backfills all the contract history.
+The block range is split into shards which are fetched and decoded by a
+process pool. Each shard is stored as NumPy `.npz` columns and recorded in
+a manifest, so an interrupted run resumes where it stopped.
+Example usage:
+```
+python -m pyetheroll.indexer --path ~/etheroll-index --from-block 5000000
+```
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from etherscan.client import ClientException
+
+from pyetheroll.batch_decoder import (
+    BetResultsColumns,
+    BetsColumns,
+    RefundsColumns,
+)
+from pyetheroll.constants import (
+    DEFAULT_INDEXER_PROCESSES,
+    ETHERSCAN_RATE_LIMIT,
+    INDEXER_SHARD_SIZE,
+    ChainID,
+)
+from pyetheroll.etheroll import Etheroll, get_logs_bisected
+from pyetheroll.etherscan_utils import (
+    ChainEtherscanAccountFactory,
+    EtherscanSessionFactory,
+    build_logs_url,
+)
+from pyetheroll.rate_limiter import TokenBucket
+from pyetheroll.utils import write_atomic
+
+EVENTS_COLUMNS = {
+    "LogBet": BetsColumns,
+    "LogResult": BetResultsColumns,
+    "LogRefund": RefundsColumns,
+}
+MANIFEST_FILENAME = "manifest.json"
+
+
+def fetch_range_logs(session, job, from_block, to_block):
+    """Fetches the job event logs of the block range, in one request."""
+    url = build_logs_url(
+        job["prefix"],
+        job["api_key"],
+        job["address"],
+        from_block,
+        to_block,
+        topic0=job["topic0"],
+    )
+    logs = session.get(url).json()["result"]
+    # errors, e.g. "Max rate limit reached", are returned as the result
+    if not isinstance(logs, list):
+        raise ClientException(logs)
+    return logs
+
+
+def init_worker(rate):
+    """Splits the Etherscan rate limit between the pool processes."""
+    EtherscanSessionFactory.configure(rate_limiter=TokenBucket(rate))
+
+
+def index_shard(job):
+    """
+    Process pool worker, fetches, decodes and saves one shard of events.
+    Returns the job with the number of indexed events.
+    """
+    session = EtherscanSessionFactory.get_or_create()
+    # full responses get bisected the same way as `get_logs_chunked()`
+    logs = get_logs_bisected(
+        partial(fetch_range_logs, session, job),
+        job["from_block"],
+        job["to_block"],
+    )
+    columns_class = EVENTS_COLUMNS[job["event"]]
+    columns = columns_class.from_logs(job["event_abi"], logs)
+    os.makedirs(os.path.dirname(job["path"]), exist_ok=True)
+    columns.save(job["path"])
+    return dict(job, count=len(columns))
+
+
+class Indexer:
+    """
+    Indexes the `etheroll` contract events into the `path` directory.
+    `etherscan_prefix` overrides the Etherscan API URL, e.g. for tests.
+    """
+
+    def __init__(
+        self,
+        etheroll,
+        path,
+        shard_size=INDEXER_SHARD_SIZE,
+        processes=DEFAULT_INDEXER_PROCESSES,
+        etherscan_prefix=None,
+        events=tuple(EVENTS_COLUMNS),
+    ):
+        self.etheroll = etheroll
+        self.path = path
+        self.shard_size = shard_size
+        self.processes = processes
+        self.etherscan_prefix = (
+            etherscan_prefix or etheroll.ChainEtherscanAccount.PREFIX
+        )
+        # events missing from the contract ABI are skipped
+        self.events = [
+            event for event in events if event in etheroll.events_signatures
+        ]
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.path, MANIFEST_FILENAME)
+
+    def read_manifest(self):
+        """
+        Returns the manifest of indexed shards, e.g.
+        >>> {
+        ...     "chain_id": 1,
+        ...     "contract_address": "0xf478...Fa8f",
+        ...     "shards": {"LogBet/5000000": {"to_block": 5099999, ...}},
+        ... }
+        """
+        manifest = {
+            "chain_id": self.etheroll.chain_id.value,
+            "contract_address": self.etheroll.contract_address,
+            "shards": {},
+        }
+        try:
+            with open(self.manifest_path) as f:
+                stored_manifest = json.load(f)
+        except FileNotFoundError:
+            return manifest
+        scope = ("chain_id", "contract_address")
+        if any(stored_manifest[key] != manifest[key] for key in scope):
+            raise ValueError(f"{self.path} indexes another contract")
+        return stored_manifest
+
+    def write_manifest(self, manifest):
+        write_atomic(self.manifest_path, json.dumps(manifest, indent=2))
+
+    def get_shards(self, from_block, to_block):
+        """
+        Yields the `(from_block, to_block)` shards, aligned on `shard_size`
+        so they stay the same across runs. The last one can be partial.
+        """
+        start = from_block
+        while start <= to_block:
+            end = (start // self.shard_size + 1) * self.shard_size - 1
+            yield start, min(end, to_block)
+            start = end + 1
+
+    def get_jobs(self, manifest, from_block, to_block):
+        """Returns the jobs of shards not indexed yet, or only partially."""
+        jobs = []
+        methods_infos = self.etheroll.transaction_debugger.methods_infos
+        for event in self.events:
+            topic0 = self.etheroll.events_signatures[event].hex()
+            event_abi = methods_infos[event]["abi"]
+            for start, end in self.get_shards(from_block, to_block):
+                key = f"{event}/{start}"
+                shard = manifest["shards"].get(key)
+                if shard is not None and shard["to_block"] >= end:
+                    continue
+                jobs.append(
+                    {
+                        "key": key,
+                        "event": event,
+                        "event_abi": event_abi,
+                        "prefix": self.etherscan_prefix,
+                        "api_key": self.etheroll.etherscan_api_key,
+                        "address": self.etheroll.contract_address,
+                        "topic0": topic0,
+                        "from_block": start,
+                        "to_block": end,
+                        "path": os.path.join(self.path, f"{key}.npz"),
+                    }
+                )
+        return jobs
+
+    def run(self, from_block=0, to_block=None):
+        """
+        Indexes the events between both blocks, the latest one by default.
+        The manifest is updated as soon as each shard completes, a failing
+        shard doesn't discard the others, its error is raised once all the
+        jobs are done so the next run only retries the failed shards.
+        Returns the number of indexed shards and events.
+        """
+        if to_block is None:
+            to_block = self.etheroll.web3.eth.blockNumber
+        manifest = self.read_manifest()
+        jobs = self.get_jobs(manifest, from_block, to_block)
+        count = 0
+        errors = []
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=init_worker,
+            initargs=(ETHERSCAN_RATE_LIMIT / self.processes,),
+        ) as executor:
+            futures = [executor.submit(index_shard, job) for job in jobs]
+            for future in as_completed(futures):
+                try:
+                    job = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                manifest["shards"][job["key"]] = {
+                    "event": job["event"],
+                    "from_block": job["from_block"],
+                    "to_block": job["to_block"],
+                    "count": job["count"],
+                    "path": os.path.relpath(job["path"], self.path),
+                }
+                self.write_manifest(manifest)
+                count += job["count"]
+        if errors:
+            raise errors[0]
+        return {"shards": len(jobs), "events": count}
+
+    def empty_columns(self, event):
+        event_abi = self.etheroll.transaction_debugger.methods_infos[event][
+            "abi"
+        ]
+        return EVENTS_COLUMNS[event].from_logs(event_abi, [])
+
+    def load(self, event):
+        """Returns all the indexed `event` columns, in block order."""
+        manifest = self.read_manifest()
+        shards = sorted(
+            (
+                shard
+                for shard in manifest["shards"].values()
+                if shard["event"] == event
+            ),
+            key=lambda shard: shard["from_block"],
+        )
+        columns_class = EVENTS_COLUMNS[event]
+        columns_list = [
+            columns_class.load(os.path.join(self.path, shard["path"]))
+            for shard in shards
+        ]
+        columns_list = [columns for columns in columns_list if len(columns)]
+        if not columns_list:
+            return self.empty_columns(event)
+        return columns_class.concatenate(columns_list)
+
+    def iter_load(self, events=("LogBet", "LogResult")):
+        """
+        Yields the indexed `events` columns tuples shard by shard, in block
+        order, so the history can be streamed, e.g. to `export_merged_bets()`.
+        """
+        manifest = self.read_manifest()
+        shards = {
+            (shard["event"], shard["from_block"]): shard
+            for shard in manifest["shards"].values()
+        }
+        starts = sorted(
+            {from_block for event, from_block in shards if event in events}
+        )
+        for start in starts:
+            columns_tuple = []
+            for event in events:
+                shard = shards.get((event, start))
+                if shard is None:
+                    columns = self.empty_columns(event)
+                else:
+                    columns = EVENTS_COLUMNS[event].load(
+                        os.path.join(self.path, shard["path"])
+                    )
+                columns_tuple.append(columns)
+            yield tuple(columns_tuple)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Etheroll events indexer")
+    parser.add_argument("--path", required=True)
+    # only chains served by Etherscan
+    parser.add_argument(
+        "--chain",
+        choices=[
+            chain_id.name.lower()
+            for chain_id in ChainEtherscanAccountFactory.ACCOUNTS
+        ],
+        default=ChainID.MAINNET.name.lower(),
+    )
+    parser.add_argument("--contract-address")
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--to-block", type=int)
+    parser.add_argument("--shard-size", type=int, default=INDEXER_SHARD_SIZE)
+    parser.add_argument(
+        "--processes", type=int, default=DEFAULT_INDEXER_PROCESSES
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    chain_id = ChainID[args.chain.upper()]
+    etheroll = Etheroll(chain_id, args.contract_address)
+    indexer = Indexer(
+        etheroll,
+        os.path.expanduser(args.path),
+        shard_size=args.shard_size,
+        processes=args.processes,
+    )
+    stats = indexer.run(args.from_block, args.to_block)
+    print(f"Indexed {stats['events']} events in {stats['shards']} shards")
+
+
+if __name__ == "__main__":
+    main()
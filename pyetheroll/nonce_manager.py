@@ -0,0 +1,135 @@
+"""
+Local allocation of transactions nonces.
+Nonces are read from the chain once per address, then handed out from
+memory, so transactions sent back to back from one account don't race for
+the same nonce nor pay a `getTransactionCount` round trip each.
+"""
+import asyncio
+import threading
+
+from pyetheroll.constants import NONCE_MAX_RETRIES
+
+# node errors meaning the nonce is taken, retried with another one
+NONCE_ERRORS = (
+    "nonce too low",
+    "replacement transaction underpriced",
+)
+# node errors meaning the local nonces are behind the chain
+RESYNC_ERRORS = ("nonce too low",)
+# node errors meaning this very signed transaction was already received, it
+# must not be signed again with another nonce, see `is_known_transaction()`
+KNOWN_TRANSACTION_ERRORS = (
+    "already known",
+    "known transaction",
+)
+
+
+def is_error(exception, errors):
+    message = str(exception).lower()
+    return any(error in message for error in errors)
+
+
+def is_nonce_error(exception):
+    return is_error(exception, NONCE_ERRORS)
+
+
+def is_known_transaction(exception):
+    """
+    Tells if the node already has the sent transaction, e.g. on a retried
+    broadcast, senders should then return its hash as a success.
+    """
+    return is_error(exception, KNOWN_TRANSACTION_ERRORS)
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces per address, atomically across threads.
+    An address is seeded with its "pending" transaction count on first use
+    and resynced the same way after `reset()`.
+    Use `NonceManagerFactory` to share the manager of a chain.
+    """
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self._nonces = {}
+        self._lock = threading.Lock()
+
+    def next_nonce(self, address):
+        with self._lock:
+            if address not in self._nonces:
+                self._nonces[address] = self.web3.eth.getTransactionCount(
+                    address, "pending"
+                )
+            nonce = self._nonces[address]
+            self._nonces[address] += 1
+            return nonce
+
+    def reset(self, address):
+        """Resyncs the address from the chain on its next nonce."""
+        with self._lock:
+            self._nonces.pop(address, None)
+
+    def release(self, address, nonce, exception):
+        """
+        Gives back the `nonce` of a send which failed with `exception`.
+        "nonce too low" resyncs the address from the chain, nonces already
+        taken on the node are kept, other errors only roll the nonce back if
+        no later one was handed out, so the nonces of sends still in flight
+        are never reissued.
+        """
+        with self._lock:
+            if is_error(exception, RESYNC_ERRORS):
+                self._nonces.pop(address, None)
+            elif is_nonce_error(exception) or is_known_transaction(exception):
+                pass
+            elif self._nonces.get(address) == nonce + 1:
+                self._nonces[address] = nonce
+
+    def send(self, address, send, max_retries=NONCE_MAX_RETRIES):
+        """
+        Calls `send(nonce)` with the next `address` nonce, e.g. to sign and
+        broadcast a transaction, and returns its result.
+        On failure the nonce is released, see `release()`, and rejected
+        nonces are retried with a fresh one up to `max_retries`.
+        """
+        for retry in range(max_retries + 1):
+            nonce = self.next_nonce(address)
+            try:
+                return send(nonce)
+            except Exception as exception:
+                self.release(address, nonce, exception)
+                if retry == max_retries or not is_nonce_error(exception):
+                    raise
+
+    async def async_send(self, address, send, max_retries=NONCE_MAX_RETRIES):
+        """
+        Same as `send()` with a `send(nonce)` coroutine function, the nonce
+        is allocated in an executor since seeding it is a blocking call.
+        """
+        loop = asyncio.get_event_loop()
+        for retry in range(max_retries + 1):
+            nonce = await loop.run_in_executor(None, self.next_nonce, address)
+            try:
+                return await send(nonce)
+            except Exception as exception:
+                self.release(address, nonce, exception)
+                if retry == max_retries or not is_nonce_error(exception):
+                    raise
+
+
+class NonceManagerFactory:
+    """
+    Shares one `NonceManager` per chain across the process, so nonces are
+    allocated per `(chain_id, address)` whatever the `Etheroll` instance.
+    """
+
+    _nonce_managers = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_or_create(cls, chain_id, web3):
+        """Returns the `chain_id` manager, seeding nonces using `web3`."""
+        with cls._lock:
+            if chain_id not in cls._nonce_managers:
+                cls._nonce_managers[chain_id] = NonceManager(web3)
+            return cls._nonce_managers[chain_id]
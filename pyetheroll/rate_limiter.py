@@ -0,0 +1,80 @@
+"""
+Client side rate limiting of Etherscan API calls.
+"""
+import random
+import threading
+import time
+
+from pyetheroll.constants import (
+    ETHERSCAN_BACKOFF_FACTOR,
+    ETHERSCAN_MAX_BACKOFF,
+    ETHERSCAN_RATE_LIMIT,
+)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled with `rate` tokens per second up to `capacity`.
+    Tokens can be borrowed ahead, so concurrent callers queue up fairly
+    rather than all retrying at once.
+    Also records how long callers had to wait for a token.
+    """
+
+    def __init__(self, rate=ETHERSCAN_RATE_LIMIT, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.acquired = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token and returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.updated_at
+            self.tokens = min(
+                self.capacity, self.tokens + elapsed * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= 1
+            delay = max(0.0, -self.tokens / self.rate)
+            self.acquired += 1
+            self.waited += delay
+            return delay
+
+    def acquire(self):
+        """Blocks until a token is available, returns the time waited."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    @property
+    def stats(self):
+        """
+        e.g.
+        >>> {"acquired": 10, "waited": 1.2}
+        """
+        return {"acquired": self.acquired, "waited": self.waited}
+
+
+def backoff_delay(
+    attempt,
+    backoff_factor=ETHERSCAN_BACKOFF_FACTOR,
+    max_backoff=ETHERSCAN_MAX_BACKOFF,
+):
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(max_backoff, backoff_factor * 2 ** attempt))
+
+
+def is_rate_limited(status_code, text):
+    """
+    Returns True on rate limit and server errors.
+    Etherscan reports its rate limit with a 200 status code and payloads
+    like: `{"status":"0","message":"NOTOK","result":"Max rate limit reached"}`
+    """
+    if status_code == 429 or status_code >= 500:
+        return True
+    return "rate limit reached" in text
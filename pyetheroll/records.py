@@ -0,0 +1,212 @@
+"""
+Compact read-only records of decoded bets.
+They replace the per bet dicts, storing integer Wei amounts in `__slots__`
+while still reading, and comparing equal, like the former dicts.
+Ether amounts and the `datetime` are computed on access.
+The `Wei*` variants expose the exact Wei amounts instead of Ether ones.
+"""
+from collections.abc import Mapping
+
+from pyetheroll.utils import timestamp2datetime, wei_to_ether
+
+
+class Record(Mapping):
+    """
+    Base record, `KEYS` are the keys of the dict it replaces, they're read
+    from attributes or properties of the same name.
+    """
+
+    __slots__ = ("timestamp", "transaction_hash", "_datetime")
+
+    KEYS = ()
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    @property
+    def datetime(self):
+        if self._datetime is None:
+            self._datetime = timestamp2datetime(self.timestamp)
+        return self._datetime
+
+
+class Bet(Record):
+    """`LogBet` event, see `Etheroll.get_bets_logs()`."""
+
+    __slots__ = (
+        "bet_id",
+        "reward_value_wei",
+        "profit_value_wei",
+        "bet_value_wei",
+        "roll_under",
+    )
+
+    KEYS = (
+        "bet_id",
+        "reward_value_ether",
+        "profit_value_ether",
+        "bet_value_ether",
+        "roll_under",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
+
+    def __init__(
+        self,
+        bet_id,
+        reward_value_wei,
+        profit_value_wei,
+        bet_value_wei,
+        roll_under,
+        timestamp,
+        transaction_hash,
+    ):
+        self.bet_id = bet_id
+        self.reward_value_wei = reward_value_wei
+        self.profit_value_wei = profit_value_wei
+        self.bet_value_wei = bet_value_wei
+        self.roll_under = roll_under
+        self.timestamp = timestamp
+        self.transaction_hash = transaction_hash
+        self._datetime = None
+
+    @property
+    def reward_value_ether(self):
+        return wei_to_ether(self.reward_value_wei)
+
+    @property
+    def profit_value_ether(self):
+        return wei_to_ether(self.profit_value_wei)
+
+    @property
+    def bet_value_ether(self):
+        return wei_to_ether(self.bet_value_wei)
+
+
+class BetResult(Record):
+    """`LogResult` event, see `Etheroll.get_bet_results_logs()`."""
+
+    __slots__ = ("bet_id", "roll_under", "dice_result", "bet_value_wei")
+
+    KEYS = (
+        "bet_id",
+        "roll_under",
+        "dice_result",
+        "bet_value_ether",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
+
+    def __init__(
+        self,
+        bet_id,
+        roll_under,
+        dice_result,
+        bet_value_wei,
+        timestamp,
+        transaction_hash,
+    ):
+        self.bet_id = bet_id
+        self.roll_under = roll_under
+        self.dice_result = dice_result
+        self.bet_value_wei = bet_value_wei
+        self.timestamp = timestamp
+        self.transaction_hash = transaction_hash
+        self._datetime = None
+
+    @property
+    def bet_value_ether(self):
+        """What the player receives or loses, not the bet size."""
+        return wei_to_ether(self.bet_value_wei)
+
+
+class BetTransaction(Record):
+    """
+    `playerRollDice` transaction, see `Etheroll.get_last_bets_transactions()`.
+    """
+
+    __slots__ = ("bet_size_wei", "roll_under", "block_number")
+
+    KEYS = (
+        "bet_size_ether",
+        "roll_under",
+        "block_number",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
+
+    def __init__(
+        self,
+        bet_size_wei,
+        roll_under,
+        block_number,
+        timestamp,
+        transaction_hash,
+    ):
+        self.bet_size_wei = bet_size_wei
+        self.roll_under = roll_under
+        self.block_number = block_number
+        self.timestamp = timestamp
+        self.transaction_hash = transaction_hash
+        self._datetime = None
+
+    @property
+    def bet_size_ether(self):
+        # not rounded, unlike events values
+        return self.bet_size_wei / 1e18
+
+
+class WeiBet(Bet):
+    __slots__ = ()
+
+    KEYS = (
+        "bet_id",
+        "reward_value_wei",
+        "profit_value_wei",
+        "bet_value_wei",
+        "roll_under",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
+
+
+class WeiBetResult(BetResult):
+    __slots__ = ()
+
+    KEYS = (
+        "bet_id",
+        "roll_under",
+        "dice_result",
+        "bet_value_wei",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
+
+
+class WeiBetTransaction(BetTransaction):
+    __slots__ = ()
+
+    KEYS = (
+        "bet_size_wei",
+        "roll_under",
+        "block_number",
+        "timestamp",
+        "datetime",
+        "transaction_hash",
+    )
@@ -0,0 +1,103 @@
+"""
+Thread-safe keyed registry of shared objects.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class Registry:
+    """
+    Keeps up to `maxsize` objects, evicting the least recently used ones.
+    Objects older than `ttl` seconds, if set, are recreated on next access.
+    An object is only created once even if several threads ask for it
+    concurrently, other keys can be accessed meanwhile.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # per key `(value, created_at)`, least recently used first
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get(key) is not None
+
+    def _get(self, key):
+        """Returns the entry as most recently used, under the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, created_at = entry
+        if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key, value):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_create(self, key, create):
+        """Returns the `key` object, calling `create()` on misses."""
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # another thread may have created it meanwhile
+            with self._lock:
+                entry = self._get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+            try:
+                value = create()
+                with self._lock:
+                    self._set(key, value)
+            finally:
+                # also released if `create()` raises, later calls retry it
+                with self._lock:
+                    self._key_locks.pop(key, None)
+            return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self):
+        """
+        e.g.
+        >>> {"size": 2, "hits": 10, "misses": 2, "evictions": 0, ...}
+        """
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,68 @@
+"""
+Signing many transactions with a keyfile decrypted once.
+Keyfiles decryption is deliberately slow (scrypt or PBKDF2), paying it per
+transaction caps the bet rate to a few per second.
+Example usage:
+```
+with UnlockedSigner(wallet_path, wallet_password, ttl=3600) as signer:
+    for chances in (10, 20, 30):
+        etheroll.player_roll_dice(bet_size_wei, chances, signer=signer)
+```
+"""
+import threading
+import time
+
+from eth_account import Account
+from eth_keyfile import load_keyfile
+from eth_utils import to_checksum_address
+
+from pyetheroll.constants import SIGNER_TTL
+
+
+class UnlockedSigner:
+    """
+    Keyfile account unlocked for `ttl` seconds, or until `close()`.
+    The key is then overwritten in memory, best effort as signing still
+    makes short lived copies of it.
+    """
+
+    def __init__(self, wallet_path, wallet_password, ttl=SIGNER_TTL):
+        wallet_encrypted = load_keyfile(wallet_path)
+        self.address = to_checksum_address(wallet_encrypted["address"])
+        private_key = Account.decrypt(wallet_encrypted, wallet_password)
+        self._private_key = bytearray(private_key)
+        self.expires_at = None if ttl is None else time.monotonic() + ttl
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._private_key is None
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and (
+            time.monotonic() >= self.expires_at
+        )
+
+    def close(self):
+        """Zeroes the decrypted key, the signer can't be used anymore."""
+        with self._lock:
+            if self._private_key is not None:
+                self._private_key[:] = bytes(len(self._private_key))
+                self._private_key = None
+
+    def sign_transaction(self, transaction):
+        """Returns the signed transaction, see `Account.signTransaction()`."""
+        if self.expired:
+            self.close()
+        with self._lock:
+            if self._private_key is None:
+                raise ValueError("Signer is closed or expired")
+            private_key = bytes(self._private_key)
+        return Account.signTransaction(transaction, private_key)
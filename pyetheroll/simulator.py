@@ -0,0 +1,186 @@
+"""
+Monte Carlo simulation of players sessions against the contract payouts.
+Sessions are simulated side by side as NumPy arrays, one roll at a time,
+and can be split across a process pool.
+Example usage:
+```
+simulator = Simulator(MartingaleStrategy(0.1), roll_under=50, bankroll=10)
+result = simulator.run(sessions=100000, rolls=1000, seed=42, processes=4)
+result.summary()
+```
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pyetheroll.utils import EtherollUtils
+
+# percentiles of the sessions max drawdowns reported by `summary()`
+DRAWDOWN_PERCENTILES = (50, 90, 99)
+
+
+class FlatStrategy:
+    """Always bets `bet_size`."""
+
+    def __init__(self, bet_size):
+        self.bet_size = bet_size
+
+    def bet_sizes(self, bankrolls, previous_bets, previous_wins):
+        return np.full(len(bankrolls), self.bet_size)
+
+
+class ProportionalStrategy:
+    """Bets a `fraction` of the current bankroll, e.g. Kelly betting."""
+
+    def __init__(self, fraction):
+        self.fraction = fraction
+
+    def bet_sizes(self, bankrolls, previous_bets, previous_wins):
+        return bankrolls * self.fraction
+
+
+class MartingaleStrategy:
+    """Multiplies the bet by `factor` after a loss, back to `bet_size`."""
+
+    def __init__(self, bet_size, factor=2):
+        self.bet_size = bet_size
+        self.factor = factor
+
+    def bet_sizes(self, bankrolls, previous_bets, previous_wins):
+        if previous_bets is None:
+            return np.full(len(bankrolls), self.bet_size)
+        return np.where(
+            previous_wins, self.bet_size, previous_bets * self.factor
+        )
+
+
+class SimulationResult:
+    """
+    Per session `final_bankrolls`, `max_drawdowns` and `ruined` flags, and
+    the house profit of each roll over all sessions, `house_profits`.
+    """
+
+    def __init__(
+        self, bankroll, final_bankrolls, max_drawdowns, ruined, house_profits
+    ):
+        self.bankroll = bankroll
+        self.final_bankrolls = final_bankrolls
+        self.max_drawdowns = max_drawdowns
+        self.ruined = ruined
+        self.house_profits = house_profits
+
+    @classmethod
+    def concatenate(cls, results):
+        """Merges results of the same simulation run on session chunks."""
+        return cls(
+            results[0].bankroll,
+            np.concatenate([r.final_bankrolls for r in results]),
+            np.concatenate([r.max_drawdowns for r in results]),
+            np.concatenate([r.ruined for r in results]),
+            np.sum([r.house_profits for r in results], axis=0),
+        )
+
+    @property
+    def ruin_probability(self):
+        return self.ruined.mean()
+
+    @property
+    def profits(self):
+        return self.final_bankrolls - self.bankroll
+
+    @property
+    def house_max_drawdown(self):
+        """Largest house loss from a peak, i.e. the bankroll it needs."""
+        cumulative_profits = np.concatenate([[0], self.house_profits.cumsum()])
+        peaks = np.maximum.accumulate(cumulative_profits)
+        return (peaks - cumulative_profits).max()
+
+    def summary(self):
+        """
+        e.g.
+        >>> {"sessions": 100000, "ruin_probability": 0.12, ...}
+        """
+        drawdowns = np.percentile(self.max_drawdowns, DRAWDOWN_PERCENTILES)
+        return {
+            "sessions": len(self.final_bankrolls),
+            "ruin_probability": float(self.ruin_probability),
+            "expected_profit": float(self.profits.mean()),
+            "profit_std": float(self.profits.std()),
+            "max_drawdown_percentiles": dict(
+                zip(DRAWDOWN_PERCENTILES, drawdowns.tolist())
+            ),
+            "house_profit": float(self.house_profits.sum()),
+            "house_max_drawdown": float(self.house_max_drawdown),
+        }
+
+
+def simulate_sessions(simulator, sessions, rolls, seed_sequence):
+    """Process pool worker, simulates a chunk of sessions."""
+    rng = np.random.default_rng(seed_sequence)
+    return simulator.simulate(sessions, rolls, rng)
+
+
+class Simulator:
+    """
+    Simulates players starting with `bankroll` and betting on `roll_under`
+    with the `strategy` bet sizes.
+    Bets are capped to the player bankroll, a player whose bankroll falls
+    below `min_bet` is ruined and stops playing.
+    """
+
+    def __init__(self, strategy, roll_under=50, bankroll=10.0, min_bet=0.0):
+        chances_win = roll_under - 1
+        if chances_win <= 0 or chances_win >= 100:
+            raise ValueError(f"Invalid roll under {roll_under}")
+        self.strategy = strategy
+        self.roll_under = roll_under
+        self.bankroll = bankroll
+        self.min_bet = min_bet
+        # the payout formula is linear in the bet size
+        profits, _ = EtherollUtils.compute_profits(1.0, chances_win, None)
+        self.profit_ratio = float(profits)
+
+    def simulate(self, sessions, rolls, rng):
+        """Simulates `sessions` side by side, drawing dices from `rng`."""
+        bankrolls = np.full(sessions, float(self.bankroll))
+        peaks = bankrolls.copy()
+        max_drawdowns = np.zeros(sessions)
+        ruined = np.zeros(sessions, dtype=bool)
+        house_profits = np.zeros(rolls)
+        bets = wins = None
+        for roll in range(rolls):
+            bets = self.strategy.bet_sizes(bankrolls, bets, wins)
+            bets = np.where(ruined, 0, np.minimum(bets, bankrolls))
+            # the player wins when the dice result is below `roll_under`
+            wins = rng.integers(1, 101, sessions) < self.roll_under
+            profits = np.where(wins, bets * self.profit_ratio, -bets)
+            bankrolls += profits
+            house_profits[roll] = -profits.sum()
+            np.maximum(peaks, bankrolls, out=peaks)
+            np.maximum(max_drawdowns, peaks - bankrolls, out=max_drawdowns)
+            ruined |= (bankrolls < self.min_bet) | (bankrolls <= 0)
+        return SimulationResult(
+            self.bankroll, bankrolls, max_drawdowns, ruined, house_profits
+        )
+
+    def run(self, sessions, rolls, seed=None, processes=1):
+        """
+        Simulates `sessions` of `rolls` rolls, split across `processes`.
+        Runs with the same `seed` and `processes` give the same result.
+        """
+        seed_sequences = np.random.SeedSequence(seed).spawn(processes)
+        if processes == 1:
+            return simulate_sessions(self, sessions, rolls, seed_sequences[0])
+        chunks_sessions = [
+            sessions // processes + (index < sessions % processes)
+            for index in range(processes)
+        ]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(
+                simulate_sessions,
+                [self] * processes,
+                chunks_sessions,
+                [rolls] * processes,
+                seed_sequences,
+            )
+            return SimulationResult.concatenate(list(results))
@@ -1,33 +1,166 @@
 import json
+import threading
+from functools import lru_cache, partial
+from types import MappingProxyType
 
+import requests
 from eth_abi import decode_abi
-from eth_utils import decode_hex, function_abi_to_4byte_selector
+from eth_utils import decode_hex
+from hexbytes.main import HexBytes
 from web3 import HTTPProvider, Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
 
-from pyetheroll.constants import ChainID
-from pyetheroll.etherscan_utils import ChainEtherscanContractFactory
-from pyetheroll.utils import get_etherscan_api_key, get_infura_project_id
+from pyetheroll.abi_store import AbiResolverFactory
+from pyetheroll.constants import ABI_CACHE_SIZE, JSONRPC_BATCH_SIZE, ChainID
+from pyetheroll.etherscan_utils import fetch_contract_abi
+from pyetheroll.registry import Registry
+from pyetheroll.utils import get_infura_project_id
 
 
 def decode_contract_call(contract_abi: list, call_data: str):
-    """https://ethereum.stackexchange.com/a/33887/34898"""
-    call_data = call_data.lower().replace("0x", "")
-    call_data_bin = decode_hex(call_data)
-    method_signature = call_data_bin[:4]
-    function_descriptions = filter(
-        lambda x: x.get("type") == "function", contract_abi
-    )
-    description = next(
-        filter(
-            lambda description: function_abi_to_4byte_selector(description)
-            == method_signature,
-            function_descriptions,
-        )
-    )
+    """
+    https://ethereum.stackexchange.com/a/33887/34898
+    See `ContractCallDecoder` for decoding many calls.
+    """
+    return ContractCallDecoder(contract_abi).decode(call_data)
+
+
+def freeze(value):
+    """
+    Returns a read only view of a JSON like value, dicts become mapping
+    proxies and lists tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Returns a plain dicts and lists deep copy of a `freeze()` value."""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def get_method_info(description):
+    """
+    Builds the info of a function or event ABI description.
+    Decoding types and names are resolved once here rather than per log.
+    """
     method_name = description["name"]
-    arg_types = [item["type"] for item in description["inputs"]]
-    args = decode_abi(arg_types, call_data_bin[4:])
-    return (method_name, args)
+    inputs = description["inputs"]
+    types = ",".join([x["type"] for x in inputs])
+    definition = "%s(%s)" % (method_name, types)
+    sha3 = Web3.keccak(text=definition)
+    # hot patching `bytes` type to replace it with bytes32 since the former
+    # is crashing with `InsufficientDataBytes` during `LogResult` decoding.
+    decode_types = [
+        "bytes32" if x["type"] == "bytes" else x["type"] for x in inputs
+    ]
+    names = [x["name"] for x in inputs]
+    method_info = {
+        "definition": definition,
+        "sha3": sha3,
+        "abi": description,
+        "decode_types": decode_types,
+        "names": names,
+    }
+    return method_info
+
+
+@lru_cache(maxsize=128)
+def compile_contract_abi(json_abi: str):
+    """
+    Returns the precompiled lookup tables of a JSON encoded ABI:
+    `(methods_infos, topics, selectors)` where `topics` maps events topic0
+    and `selectors` maps functions 4-byte selector to their method info.
+    Cached so instances built from the same ABI share the keccak work, the
+    tables are read only since they're shared, see `thaw()` for copies.
+    """
+    contract_abi = json.loads(json_abi)
+    methods_infos = {}
+    topics = {}
+    selectors = {}
+    # only retrieves functions and events, other existing types are:
+    # "fallback" and "constructor"
+    for description in contract_abi:
+        typ = description["type"]
+        if typ not in ("function", "event"):
+            continue
+        method_info = freeze(get_method_info(description))
+        methods_infos[description["name"]] = method_info
+        sha3 = bytes(method_info["sha3"])
+        if typ == "event":
+            topics[sha3] = method_info
+        else:
+            selectors[sha3[:4]] = method_info
+    return (
+        MappingProxyType(methods_infos),
+        MappingProxyType(topics),
+        MappingProxyType(selectors),
+    )
+
+
+class ContractCallDecoder:
+    """
+    Decodes functions calls input data, functions are looked up by 4-byte
+    selector in a table built once per ABI.
+    """
+
+    # static `uint256` argument hex encoded length
+    UINT256_LENGTH = 2 * 32
+
+    def __init__(self, contract_abi):
+        json_abi = json.dumps(contract_abi, sort_keys=True)
+        _, _, selectors = compile_contract_abi(json_abi)
+        self.functions = {}
+        for selector, method_info in selectors.items():
+            description = method_info["abi"]
+            types = [x["type"] for x in description["inputs"]]
+            self.functions[selector] = (description["name"], types)
+        # e.g. `playerRollDice(uint256)`, by hex selector
+        self.uint256_functions = {
+            selector.hex(): name
+            for selector, (name, types) in self.functions.items()
+            if types == ["uint256"]
+        }
+
+    def decode(self, call_data: str):
+        """Returns the `(method_name, args)` of the call."""
+        call_data_bin = decode_hex(call_data.lower())
+        selector = call_data_bin[:4]
+        try:
+            method_name, types = self.functions[selector]
+        except KeyError:
+            raise ValueError(f"Unknown function selector 0x{selector.hex()}")
+        args = decode_abi(types, call_data_bin[4:])
+        return (method_name, args)
+
+    def decode_many(self, calls_data):
+        """
+        Returns the `(method_name, args)` of each call.
+        Single `uint256` argument calls are parsed straight from their hex.
+        """
+        decoded_calls = []
+        for call_data in calls_data:
+            call_data = call_data.lower()
+            if call_data.startswith("0x"):
+                call_data = call_data[2:]
+            method_name = self.uint256_functions.get(call_data[:8])
+            argument = call_data[8:]
+            if (
+                method_name is not None
+                and len(argument) == self.UINT256_LENGTH
+            ):
+                decoded_calls.append((method_name, (int(argument, 16),)))
+            else:
+                decoded_calls.append(self.decode(call_data))
+        return decoded_calls
 
 
 class HTTPProviderFactory:
@@ -46,57 +179,165 @@ class HTTPProviderFactory:
         ),
     }
 
+    _providers = {}
+    _lock = threading.Lock()
+
     @classmethod
     def create(cls, chain_id=ChainID.MAINNET):
         url = cls.PROVIDER_URLS[chain_id]
         return HTTPProvider(url)
 
+    @classmethod
+    def get_or_create(cls, chain_id=ChainID.MAINNET):
+        """Returns the chain shared provider, creating it on first use."""
+        with cls._lock:
+            if chain_id not in cls._providers:
+                cls._providers[chain_id] = cls.create(chain_id)
+            return cls._providers[chain_id]
+
+
+def format_receipt(receipt):
+    """
+    Formats a raw JSON-RPC receipt like `web3.eth.getTransactionReceipt()`
+    does for the fields used for decoding, i.e. `HexBytes` log topics.
+    """
+    logs = [
+        AttributeDict(
+            dict(log, topics=[HexBytes(topic) for topic in log["topics"]])
+        )
+        for log in receipt["logs"]
+    ]
+    return AttributeDict(dict(receipt, logs=logs))
+
+
+class JSONRPCBatchClient:
+    """
+    Sends JSON-RPC calls to the `provider` endpoint by batches of
+    `batch_size`, so many calls only cost a few round trips.
+    Connections are kept alive between batches.
+    """
+
+    _clients = {}
+    _lock = threading.Lock()
+
+    def __init__(self, provider, batch_size=JSONRPC_BATCH_SIZE):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.session = requests.Session()
+
+    @classmethod
+    def get_or_create(cls, chain_id=ChainID.MAINNET):
+        """Returns the client of the chain shared provider."""
+        with cls._lock:
+            if chain_id not in cls._clients:
+                provider = HTTPProviderFactory.get_or_create(chain_id)
+                cls._clients[chain_id] = cls(provider)
+            return cls._clients[chain_id]
+
+    def call_batch(self, method, params_list):
+        """Returns the `method` calls results, in `params_list` order."""
+        requests_data = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params,
+            }
+            for request_id, params in enumerate(params_list)
+        ]
+        response = self.session.post(
+            self.provider.endpoint_uri,
+            json=requests_data,
+            **self.provider.get_request_kwargs(),
+        )
+        response.raise_for_status()
+        responses = response.json()
+        # the whole batch can be rejected with a single error object
+        if not isinstance(responses, list):
+            raise ValueError(responses.get("error", responses))
+        # batch responses can come in any order
+        responses = sorted(responses, key=lambda r: r["id"])
+        errors = [r["error"] for r in responses if "error" in r]
+        if errors:
+            raise ValueError(errors[0])
+        return [r["result"] for r in responses]
+
+    def call_many(self, method, params_list):
+        """Same as `call_batch()`, splitting the calls in batches."""
+        results = []
+        for start in range(0, len(params_list), self.batch_size):
+            end = start + self.batch_size
+            results += self.call_batch(method, params_list[start:end])
+        return results
+
+    def get_transaction_receipts(self, transaction_hashes):
+        """Returns the receipts of the transactions, in the same order."""
+        receipts = self.call_many(
+            "eth_getTransactionReceipt",
+            [[transaction_hash] for transaction_hash in transaction_hashes],
+        )
+        for transaction_hash, receipt in zip(transaction_hashes, receipts):
+            if receipt is None:
+                raise TransactionNotFound(
+                    f"Transaction with hash: {transaction_hash} not found."
+                )
+        return [format_receipt(receipt) for receipt in receipts]
+
 
 class TransactionDebugger:
+
+    # debuggers shared per `(chain_id, contract_address)`
+    _registry = Registry(maxsize=ABI_CACHE_SIZE)
+
     def __init__(self, contract_abi):
         self.contract_abi = contract_abi
-        self._methods_infos = None
+        # sorting keys so equivalent ABIs share the same compiled tables
+        json_abi = json.dumps(contract_abi, sort_keys=True)
+        (
+            self._methods_infos,
+            self._methods_by_topic,
+            self._methods_by_selector,
+        ) = compile_contract_abi(json_abi)
 
     @staticmethod
     def get_contract_abi(chain_id, contract_address) -> dict:
         """
-        Given a contract address returns the contract ABI from Etherscan,
-        refs #2
+        Given a contract address returns the contract ABI from memory or
+        the local `AbiStore`, falling back to Etherscan, refs #2
         """
-        api_key = get_etherscan_api_key()
-        ChainEtherscanContract = ChainEtherscanContractFactory.create(chain_id)
-        api = ChainEtherscanContract(address=contract_address, api_key=api_key)
-        json_abi = api.get_abi()
-        abi = json.loads(json_abi)
+        abi_resolver = AbiResolverFactory.get_or_create()
+        abi = abi_resolver.get_or_fetch(
+            chain_id,
+            contract_address,
+            partial(fetch_contract_abi, chain_id, contract_address),
+        )
         return abi
 
+    @classmethod
+    def get_or_create(cls, chain_id, contract_address):
+        """
+        Returns the debugger of the contract, so its ABI is only looked up
+        and serialized once rather than per decoded log.
+        """
+        return cls._registry.get_or_create(
+            (chain_id, contract_address.lower()),
+            lambda: cls(cls.get_contract_abi(chain_id, contract_address)),
+        )
+
     @staticmethod
     def get_methods_infos(contract_abi):
         """List of infos for each events."""
-        methods_infos = {}
-        # only retrieves functions and events, other existing types are:
-        # "fallback" and "constructor"
-        types = ["function", "event"]
-        methods = [a for a in contract_abi if a["type"] in types]
-        for description in methods:
-            method_name = description["name"]
-            types = ",".join([x["type"] for x in description["inputs"]])
-            event_definition = "%s(%s)" % (method_name, types)
-            event_sha3 = Web3.keccak(text=event_definition)
-            method_info = {
-                "definition": event_definition,
-                "sha3": event_sha3,
-                "abi": description,
-            }
-            methods_infos = dict(methods_infos, **{method_name: method_info})
-        return methods_infos
+        json_abi = json.dumps(contract_abi, sort_keys=True)
+        methods_infos, _, _ = compile_contract_abi(json_abi)
+        return thaw(methods_infos)
 
     @property
     def methods_infos(self):
-        """Cached property so it's computed once."""
-        if not self._methods_infos:
-            self._methods_infos = self.get_methods_infos(self.contract_abi)
-        return self._methods_infos
+        """
+        Computed once per ABI, see `compile_contract_abi()`, returned as a
+        plain copy so callers can't alter the shared tables.
+        """
+        return thaw(self._methods_infos)
 
     def decode_method(self, topics, log_data):
         """Given a topic and log data, decode the event."""
@@ -109,21 +350,17 @@ class TransactionDebugger:
         log_data = log_data.lower().replace("0x", "")
         log_data = bytes.fromhex(log_data)
         topics_log_data += log_data
-        method_info = next(
-            filter(
-                lambda info: info["sha3"].lower() == topic.lower(),
-                self.methods_infos.values(),
-            )
-        )
-        event_inputs = method_info["abi"]["inputs"]
-        types = [e_input["type"] for e_input in event_inputs]
-        # hot patching `bytes` type to replace it with bytes32 since the former
-        # is crashing with `InsufficientDataBytes` during `LogResult` decoding.
-        types = ["bytes32" if t == "bytes" else t for t in types]
-        names = [e_input["name"] for e_input in event_inputs]
+        try:
+            method_info = self._methods_by_topic[bytes(topic)]
+        except KeyError:
+            # same exception as the former scan, e.g. for a log emitted by
+            # another contract in the same transaction
+            raise StopIteration(f"Unknown event topic {bytes(topic).hex()}")
+        types = method_info["decode_types"]
+        names = method_info["names"]
         values = decode_abi(types, topics_log_data)
         call = {name: value for name, value in zip(names, values)}
-        decoded_method = {"method_info": method_info, "call": call}
+        decoded_method = {"method_info": thaw(method_info), "call": call}
         return decoded_method
 
     @classmethod
@@ -133,9 +370,7 @@ class TransactionDebugger:
         1) downloads the ABI associated to the recipient address
         2) uses it to decode methods calls
         """
-        contract_address = log.address
-        contract_abi = cls.get_contract_abi(chain_id, contract_address)
-        transaction_debugger = cls(contract_abi)
+        transaction_debugger = cls.get_or_create(chain_id, log.address)
         topics = log.topics
         log_data = log.data
         decoded_method = transaction_debugger.decode_method(topics, log_data)
@@ -144,7 +379,7 @@ class TransactionDebugger:
     @classmethod
     def decode_transaction_logs(cls, chain_id, transaction_hash):
         """Given a transaction hash, reads and decode the event log."""
-        provider = HTTPProviderFactory.create(chain_id)
+        provider = HTTPProviderFactory.get_or_create(chain_id)
         web3 = Web3(provider)
         transaction_receipt = web3.eth.getTransactionReceipt(transaction_hash)
         logs = transaction_receipt.logs
@@ -152,3 +387,26 @@ class TransactionDebugger:
             cls.decode_transaction_log(chain_id, log) for log in logs
         )
         return decoded_methods
+
+    @classmethod
+    def decode_transactions_logs(
+        cls, chain_id, transaction_hashes, client=None
+    ):
+        """
+        Batch version of `decode_transaction_logs()`, receipts are fetched
+        with JSON-RPC batch requests, see `JSONRPCBatchClient`.
+        Returns the decoded methods of each transaction, in the same order.
+        """
+        if client is None:
+            client = JSONRPCBatchClient.get_or_create(chain_id)
+        receipts = client.get_transaction_receipts(transaction_hashes)
+        decoded_transactions = []
+        for receipt in receipts:
+            decoded_methods = []
+            for log in receipt.logs:
+                transaction_debugger = cls.get_or_create(chain_id, log.address)
+                decoded_methods.append(
+                    transaction_debugger.decode_method(log.topics, log.data)
+                )
+            decoded_transactions.append(tuple(decoded_methods))
+        return tuple(decoded_transactions)
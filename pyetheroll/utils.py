@@ -1,9 +1,14 @@
 import os
+import tempfile
 from datetime import datetime
 
+import numpy as np
+
 from pyetheroll.constants import (
     DEFAULT_ETHERSCAN_API_KEY,
     DEFAULT_INFURA_PROJECT_ID,
+    HOUSE_EDGE,
+    HOUSE_EDGE_DIVISOR,
     ROUND_DIGITS,
 )
 
@@ -22,6 +27,63 @@ class EtherollUtils:
         profit = round(profit, ROUND_DIGITS)
         return profit
 
+    @staticmethod
+    def compute_profits(bet_sizes, chances_win, digits=ROUND_DIGITS):
+        """
+        NumPy version of `compute_profit()`, `bet_sizes` and `chances_win`
+        are broadcast together, e.g. a column and a row for a payout table.
+        Returns the `(profits, payouts)` masked arrays, rounded the same way
+        unless `digits` is None, with invalid chances masked.
+        """
+        bet_sizes = np.asarray(bet_sizes, dtype=np.float64)
+        chances_win = np.asarray(chances_win, dtype=np.float64)
+        invalid = (chances_win <= 0) | (chances_win >= 100)
+        # masked anyway, avoids dividing by zero
+        chances_win = np.where(invalid, 1, chances_win)
+        house_edge = 1.0 / 100
+        chances_loss = 100 - chances_win
+        payouts = ((chances_loss / chances_win) * bet_sizes) + bet_sizes
+        payouts *= 1 - house_edge
+        profits = payouts - bet_sizes
+        if digits is not None:
+            profits = round_array(profits, digits)
+            payouts = round_array(payouts, digits)
+        mask = np.broadcast_to(invalid, profits.shape)
+        return np.ma.array(profits, mask=mask), np.ma.array(payouts, mask=mask)
+
+    @staticmethod
+    def compute_profit_wei(bet_size_wei, chances_win):
+        """
+        Exact integer version of `compute_profit()`, following the contract
+        payout formula and its integer divisions.
+        """
+        if chances_win <= 0 or chances_win >= 100:
+            return
+        chances_loss = 100 - chances_win
+        payout_wei = bet_size_wei * chances_loss // chances_win + bet_size_wei
+        payout_wei = payout_wei * HOUSE_EDGE // HOUSE_EDGE_DIVISOR
+        return payout_wei - bet_size_wei
+
+
+def round_array(values, digits):
+    """
+    Same as `round()` over a float array.
+    `np.round()` rounds the scaled float rather than the exact decimal value,
+    so both only differ on ties, which are rounded one by one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.asarray(np.round(scaled) / scale)
+    ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    rounded[ties] = [round(value, digits) for value in values[ties].tolist()]
+    return rounded
+
+
+def wei_to_ether(wei):
+    """Converts integer Wei to Ether, rounded for display."""
+    return round(wei / 1e18, ROUND_DIGITS)
+
 
 def timestamp2datetime(timestamp: str) -> datetime:
     """
@@ -47,3 +109,26 @@ def get_etherscan_api_key():
 def get_infura_project_id():
     """Returns WEB3_INFURA_PROJECT_ID from environment variable."""
     return os.environ.get("WEB3_INFURA_PROJECT_ID", DEFAULT_INFURA_PROJECT_ID)
+
+
+def get_cache_dir():
+    """
+    Returns PYETHEROLL_CACHE_DIR from environment variable, defaults to
+    `~/.cache/pyetheroll`.
+    """
+    default = os.path.join(os.path.expanduser("~"), ".cache", "pyetheroll")
+    return os.environ.get("PYETHEROLL_CACHE_DIR", default)
+
+
+def write_atomic(path, data):
+    """Writes then renames, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
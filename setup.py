@@ -18,15 +18,22 @@ setup_params = {
     "author": "Andre Miras",
     "url": "https://github.com/AndreMiras/pyetheroll",
     "packages": ["pyetheroll"],
+    # ABIs seeded with `make abis/seed`
+    "package_data": {
+        "pyetheroll": ["abis/*/*.json", "abis/contracts/*/*"],
+    },
     "install_requires": [
+        "aiohttp",
         "eth-account<0.5",
         "eth-utils",
+        "numpy",
         "py-etherscan-api==0.8.0",
         "pycryptodome",
-        "requests-cache",
         "rlp",
         "web3<6",
     ],
+    # `pyetheroll.export` Parquet export
+    "extras_require": {"arrow": ["pyarrow"]},
     "dependency_links": [
         (
             "https://github.com/corpetty/py-etherscan-api"
@@ -0,0 +1,22 @@
+import pytest
+
+from pyetheroll.abi_store import AbiResolverFactory, AbiStoreFactory
+from pyetheroll.nonce_manager import NonceManagerFactory
+from pyetheroll.transaction_debugger import TransactionDebugger
+
+
+@pytest.fixture(autouse=True)
+def abi_store(tmp_path):
+    """Isolates each test with an empty ABI store and no seed."""
+    abi_store = AbiStoreFactory.configure(str(tmp_path), seed_path=None)
+    yield abi_store
+    AbiStoreFactory._abi_store = None
+    AbiResolverFactory._abi_resolver = None
+    TransactionDebugger._registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def nonce_managers():
+    """Isolates each test nonces, managers are otherwise process-wide."""
+    yield NonceManagerFactory._nonce_managers
+    NonceManagerFactory._nonce_managers.clear()
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from unittest import mock
+
+import pytest
+
+from pyetheroll.abi_store import (
+    AbiResolver,
+    AbiResolverFactory,
+    AbiStore,
+    compute_signatures,
+    seed,
+)
+from pyetheroll.constants import ChainID
+from pyetheroll.etheroll import Etheroll
+from tests.test_etheroll import TestEtheroll as EtherollFixtures
+from tests.test_etheroll import patch_get_abi
+
+
+class TestAbiStore:
+
+    contract_abi = [
+        EtherollFixtures.log_bet_abi,
+        EtherollFixtures.player_roll_dice_abi,
+    ]
+    address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+
+    def test_put_get(self, tmp_path):
+        """ABIs are stored by content, contracts point to them."""
+        abi_store = AbiStore(str(tmp_path), seed_path=None)
+        assert abi_store.get(ChainID.MAINNET, self.address) is None
+        abi_hash = abi_store.put(
+            ChainID.MAINNET, self.address, self.contract_abi
+        )
+        # equivalent ABI on another chain shares the same blob
+        assert abi_hash == abi_store.put(
+            ChainID.ROPSTEN, self.address.lower(), self.contract_abi[:]
+        )
+        assert os.listdir(os.path.join(tmp_path, "abis")) == [
+            f"{abi_hash}.json"
+        ]
+        assert abi_store.get(ChainID.MAINNET, self.address.lower()) == (
+            self.contract_abi
+        )
+        assert abi_store.get(ChainID.ROPSTEN, self.address) == (
+            self.contract_abi
+        )
+
+    def test_get_signatures(self, tmp_path):
+        """Precomputed signatures match the `Etheroll` computed ones."""
+        abi_store = AbiStore(str(tmp_path), seed_path=None)
+        assert abi_store.get_signatures(ChainID.MAINNET, self.address) is None
+        abi_store.put(ChainID.MAINNET, self.address, self.contract_abi)
+        with patch_get_abi(json.dumps(self.contract_abi)):
+            etheroll = Etheroll()
+        signatures = abi_store.get_signatures(ChainID.MAINNET, self.address)
+        assert signatures["events"] == etheroll.get_events_signatures(
+            self.contract_abi
+        )
+        assert signatures["functions"] == etheroll.get_functions_signatures(
+            self.contract_abi
+        )
+        assert signatures["selectors"] == {"0xdc6dd152": "playerRollDice"}
+        assert compute_signatures([]) == {
+            "events": {},
+            "functions": {},
+            "selectors": {},
+        }
+
+    def test_get_or_fetch(self, tmp_path):
+        """ABIs are only fetched on store misses."""
+        abi_store = AbiStore(str(tmp_path), seed_path=None)
+        fetch = mock.Mock(return_value=json.dumps(self.contract_abi))
+        for _ in range(2):
+            contract_abi = abi_store.get_or_fetch(
+                ChainID.MAINNET, self.address, fetch
+            )
+            assert contract_abi == self.contract_abi
+        assert fetch.call_args_list == [mock.call()]
+
+    def test_abi_resolver(self, tmp_path):
+        """ABIs are kept in memory, in front of the persistent store."""
+        abi_store = AbiStore(str(tmp_path), seed_path=None)
+        abi_resolver = AbiResolver(abi_store, maxsize=1)
+        fetch = mock.Mock(return_value=json.dumps(self.contract_abi))
+        with mock.patch.object(abi_store, "get", wraps=abi_store.get) as m_get:
+            for address in (self.address, self.address.lower()):
+                contract_abi = abi_resolver.get_or_fetch(
+                    ChainID.MAINNET, address, fetch
+                )
+                assert contract_abi == self.contract_abi
+            assert m_get.call_count == 1
+            # evicts the least recently used, read back from the store
+            abi_resolver.get_or_fetch(ChainID.ROPSTEN, self.address, fetch)
+            abi_resolver.get_or_fetch(ChainID.MAINNET, self.address, fetch)
+            assert m_get.call_count == 3
+        assert fetch.call_count == 2
+        # without a store ABIs are only kept in memory
+        abi_resolver = AbiResolver()
+        abi_resolver.get_or_fetch(ChainID.MAINNET, self.address, fetch)
+        assert fetch.call_count == 3
+        assert AbiResolverFactory.get_or_create().abi_store is not None
+
+    def test_abi_resolver_in_flight(self):
+        """Concurrent lookups of the same contract share a single fetch."""
+        abi_resolver = AbiResolver()
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            fetching.set()
+            release.wait()
+            return json.dumps(self.contract_abi)
+
+        m_fetch = mock.Mock(side_effect=fetch)
+        results = []
+
+        def get_abi():
+            results.append(
+                abi_resolver.get_or_fetch(
+                    ChainID.MAINNET, self.address, m_fetch
+                )
+            )
+
+        threads = [threading.Thread(target=get_abi) for _ in range(4)]
+        threads[0].start()
+        fetching.wait()
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert m_fetch.call_count == 1
+        assert results == [self.contract_abi] * 4
+
+    def test_abi_resolver_error(self):
+        """Failed fetches aren't cached and are retried."""
+        abi_resolver = AbiResolver()
+        fetch = mock.Mock(
+            side_effect=[ValueError(), json.dumps(self.contract_abi)]
+        )
+        with pytest.raises(ValueError):
+            abi_resolver.get_or_fetch(ChainID.MAINNET, self.address, fetch)
+        contract_abi = abi_resolver.get_or_fetch(
+            ChainID.MAINNET, self.address, fetch
+        )
+        assert contract_abi == self.contract_abi
+        assert abi_resolver._in_flight == {}
+
+    def test_seed(self, tmp_path):
+        """Seeded contracts are found without any network call."""
+        seed_path = str(tmp_path / "seed")
+        with mock.patch(
+            "pyetheroll.abi_store.fetch_contract_abi",
+            return_value=json.dumps(self.contract_abi),
+        ) as m_fetch_contract_abi:
+            seed({ChainID.MAINNET: self.address}, seed_path)
+        assert m_fetch_contract_abi.call_args_list == [
+            mock.call(ChainID.MAINNET, self.address)
+        ]
+        abi_store = AbiStore(str(tmp_path / "store"), seed_path)
+        with mock.patch("etherscan.contracts.Contract.get_abi") as m_get_abi:
+            contract_abi = abi_store.get_or_fetch(
+                ChainID.MAINNET, self.address, m_get_abi
+            )
+        assert m_get_abi.call_count == 0
+        assert contract_abi == self.contract_abi
+        # the store directory itself was left untouched
+        assert not os.path.exists(tmp_path / "store")
+
+    def test_etheroll_init(self):
+        """The contract ABI is only fetched on the first initialization."""
+        with patch_get_abi(json.dumps(self.contract_abi)) as m_get_abi:
+            Etheroll()
+            etheroll = Etheroll()
+        assert m_get_abi.call_count == 1
+        assert etheroll.contract_abi == self.contract_abi
+        assert set(etheroll.events_signatures) == {"LogBet"}
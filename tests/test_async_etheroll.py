@@ -0,0 +1,323 @@
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+from etherscan.client import ClientException
+from hexbytes.main import HexBytes
+
+from pyetheroll.async_etheroll import AsyncEtheroll
+from pyetheroll.etheroll import Etheroll
+from pyetheroll.etherscan_utils import NO_RATE_LIMIT, EtherscanSessionFactory
+from tests import test_etheroll
+from tests.test_etheroll import patch_get_abi
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def patch_etherscan_get(responses):
+    """Patches `AsyncEtheroll.etherscan_get()` to return `responses`."""
+    responses = iter(responses)
+
+    async def etherscan_get(url):
+        return next(responses)
+
+    return mock.patch(
+        "pyetheroll.async_etheroll.AsyncEtheroll.etherscan_get",
+        side_effect=etherscan_get,
+    )
+
+
+class FakeResponse:
+    """Minimal `aiohttp.ClientResponse` async context manager."""
+
+    def __init__(self, status, text):
+        self.status = status
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def text(self):
+        return self._text
+
+
+class TestAsyncEtheroll:
+
+    fixtures = test_etheroll.TestEtheroll
+
+    def create_async_etheroll(self, contract_abi, **kwargs):
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll(**kwargs)
+        return AsyncEtheroll(etheroll)
+
+    def teardown_method(self, method):
+        EtherscanSessionFactory._session = None
+
+    def test_rate_limiter(self):
+        """The shared rate limiter follows the session configuration."""
+        async_etheroll = self.create_async_etheroll([])
+        adapter = EtherscanSessionFactory.get_adapter()
+        assert async_etheroll.rate_limiter is adapter.rate_limiter
+        EtherscanSessionFactory.configure(rate_limiter=NO_RATE_LIMIT)
+        assert async_etheroll.rate_limiter is None
+
+    def test_etherscan_get(self):
+        """Rate limited responses are retried after an async backoff."""
+        async_etheroll = self.create_async_etheroll([])
+        EtherscanSessionFactory.configure(rate_limiter=NO_RATE_LIMIT)
+        async_etheroll._session = mock.Mock()
+        async_etheroll._session.get.side_effect = [
+            FakeResponse(200, '{"result":"Max rate limit reached"}'),
+            FakeResponse(200, '{"status":"1","result":[]}'),
+        ]
+        sleeps = []
+
+        async def sleep(delay):
+            sleeps.append(delay)
+
+        with mock.patch("asyncio.sleep", side_effect=sleep):
+            response = run(async_etheroll.etherscan_get("url"))
+        assert response == {"status": "1", "result": []}
+        assert async_etheroll._session.get.call_args_list == 2 * [
+            mock.call("url")
+        ]
+        assert len(sleeps) == 1
+
+    def test_get_bets_logs(self):
+        """Decodes the same as the synchronous `Etheroll.get_bets_logs()`."""
+        async_etheroll = self.create_async_etheroll(
+            [self.fixtures.log_bet_abi]
+        )
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        with patch_etherscan_get(
+            [{"result": self.fixtures.log_bet_events}]
+        ) as m_etherscan_get:
+            logs = run(async_etheroll.get_bets_logs(address, 5394067, 5394095))
+        expected_url = async_etheroll.etheroll.get_logs_url(
+            async_etheroll.etheroll.contract_address,
+            5394067,
+            5394095,
+            **async_etheroll.etheroll.get_log_bet_topics(address),
+        )
+        assert m_etherscan_get.call_args_list == [mock.call(expected_url)]
+        assert logs == async_etheroll.etheroll.decode_bet_events(
+            self.fixtures.log_bet_events
+        )
+        assert len(logs) == 2
+
+    def test_get_logs_chunked(self):
+        """Full block ranges are bisected, halves are fetched concurrently."""
+        async_etheroll = self.create_async_etheroll([])
+        full = [
+            {
+                "blockNumber": hex(10),
+                "logIndex": hex(index),
+                "transactionHash": "0x1",
+            }
+            for index in range(1000)
+        ]
+        second_half = [
+            {
+                "blockNumber": hex(16),
+                "logIndex": "0x1",
+                "transactionHash": "0x2",
+            }
+        ]
+        with patch_etherscan_get(
+            [{"result": full}, {"result": []}, {"result": second_half}]
+        ) as m_etherscan_get:
+            logs = run(async_etheroll.get_logs_chunked("0x1", 10, 20))
+        assert m_etherscan_get.call_count == 3
+        urls = [call[0][0] for call in m_etherscan_get.call_args_list]
+        assert "fromBlock=10&toBlock=15" in urls[1]
+        assert "fromBlock=16&toBlock=20" in urls[2]
+        assert logs == second_half
+
+    def test_get_logs_chunked_full_block(self):
+        """A single block hitting the records limit can't be truncated."""
+        async_etheroll = self.create_async_etheroll([])
+        full = [
+            {
+                "blockNumber": hex(10),
+                "logIndex": hex(index),
+                "transactionHash": "0x1",
+            }
+            for index in range(1000)
+        ]
+        with patch_etherscan_get([{"result": full}]), pytest.raises(
+            ValueError, match="Block 10 logs exceed"
+        ):
+            run(async_etheroll.get_logs_chunked("0x1", 10, 10))
+
+    def test_get_logs_chunked_max_workers(self):
+        """Bisected ranges are fetched at most `max_workers` at a time."""
+        async_etheroll = self.create_async_etheroll([])
+        full = [
+            {
+                "blockNumber": hex(0),
+                "logIndex": hex(index),
+                "transactionHash": "0x1",
+            }
+            for index in range(1000)
+        ]
+        requests = []
+        running = []
+        concurrency = []
+
+        async def get_logs(address, from_block, to_block, **topics):
+            requests.append((from_block, to_block))
+            running.append(mock.sentinel.request)
+            concurrency.append(len(running))
+            await asyncio.sleep(0)
+            running.pop()
+            # ranges larger than 2 blocks are full
+            return full if to_block - from_block > 1 else []
+
+        with mock.patch.object(
+            async_etheroll, "get_logs", side_effect=get_logs
+        ):
+            logs = run(
+                async_etheroll.get_logs_chunked("0x1", 0, 15, max_workers=2)
+            )
+        assert logs == []
+        assert len(requests) == 15
+        assert max(concurrency) == 2
+
+    def test_get_merged_logs(self):
+        """`LogBet` and `LogResult` are fetched concurrently then merged."""
+        async_etheroll = self.create_async_etheroll([])
+        bet_logs = self.fixtures.bet_logs
+        bet_results_logs = self.fixtures.bet_results_logs
+
+        async def get_player_roll_dice_tx(address):
+            return [mock.sentinel.transaction]
+
+        async def get_bets_logs(address, from_block, to_block, wei):
+            return bet_logs
+
+        async def get_bet_results_logs(address, from_block, to_block, wei):
+            return bet_results_logs
+
+        with mock.patch.object(
+            async_etheroll,
+            "get_player_roll_dice_tx",
+            side_effect=get_player_roll_dice_tx,
+        ), mock.patch.object(
+            async_etheroll, "get_bets_logs", side_effect=get_bets_logs
+        ), mock.patch.object(
+            async_etheroll,
+            "get_bet_results_logs",
+            side_effect=get_bet_results_logs,
+        ), mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_bets_blocks",
+            return_value={"from_block": 1, "to_block": 2},
+        ):
+            merged_logs = run(async_etheroll.get_merged_logs("0x1"))
+        assert merged_logs == (
+            {"bet_log": bet_logs[0], "bet_result": bet_results_logs[0]},
+            {"bet_log": bet_logs[1], "bet_result": bet_results_logs[1]},
+            {"bet_log": bet_logs[2], "bet_result": None},
+        )
+
+    def test_get_merged_logs_empty_tx(self):
+        async_etheroll = self.create_async_etheroll(
+            [self.fixtures.player_roll_dice_abi]
+        )
+        with patch_etherscan_get(
+            [{"status": "0", "message": "No transactions found", "result": []}]
+        ):
+            merged_logs = run(async_etheroll.get_merged_logs("0x1"))
+        assert merged_logs == ()
+
+    def test_get_transaction_page(self):
+        """Only "No transactions found" is an empty page, not errors."""
+        async_etheroll = self.create_async_etheroll([])
+        with patch_etherscan_get(
+            [
+                {
+                    "status": "0",
+                    "message": "No transactions found",
+                    "result": [],
+                },
+                {
+                    "status": "0",
+                    "message": "NOTOK",
+                    "result": "Max rate limit reached",
+                },
+            ]
+        ):
+            assert run(async_etheroll.get_transaction_page("0x1")) == []
+            with pytest.raises(ClientException) as ex_info:
+                run(async_etheroll.get_transaction_page("0x1"))
+        assert ex_info.value.args == ("Max rate limit reached",)
+
+    def test_player_roll_dice_signer(self):
+        """Transactions are signed by the given `UnlockedSigner`."""
+        async_etheroll = self.create_async_etheroll(
+            [self.fixtures.player_roll_dice_abi]
+        )
+        signer = mock.Mock(
+            address="0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        )
+        signer.sign_transaction.return_value.rawTransaction = HexBytes("0x01")
+
+        async def rpc(method, params):
+            return "0x" + "ab" * 32
+
+        with mock.patch.object(
+            async_etheroll, "rpc", side_effect=rpc
+        ) as m_rpc, mock.patch(
+            "web3.eth.Eth.getTransactionCount", return_value=3
+        ) as m_getTransactionCount:
+            tx_hash = run(
+                async_etheroll.player_roll_dice(10 ** 17, 50, signer=signer)
+            )
+        assert tx_hash == HexBytes("ab" * 32)
+        assert m_rpc.call_args_list == [
+            mock.call("eth_sendRawTransaction", ["0x01"]),
+        ]
+        # nonces are allocated locally, shared with the synchronous calls
+        assert m_getTransactionCount.call_args_list == [
+            mock.call(signer.address, "pending")
+        ]
+        transaction = signer.sign_transaction.call_args[0][0]
+        assert transaction["nonce"] == 3
+        nonce_manager = async_etheroll.etheroll.nonce_manager
+        assert nonce_manager.next_nonce(signer.address) == 4
+
+    def test_get_balance(self):
+        async_etheroll = self.create_async_etheroll([])
+        address = "0xAb5801a7D398351b8bE11C439e05C5B3259aeC9B"
+        with patch_etherscan_get(
+            [{"status": "1", "result": "365003278106457867877843"}]
+        ) as m_etherscan_get:
+            balance = run(async_etheroll.get_balance(address))
+        expected_url = (
+            "https://api.etherscan.io/api?module=account&action=balance"
+            "&address=0xAb5801a7D398351b8bE11C439e05C5B3259aeC9B"
+            "&tag=latest&apikey=YourApiKeyToken"
+        )
+        assert m_etherscan_get.call_args_list == [mock.call(expected_url)]
+        assert balance == 365003.28
+
+    def test_get_balance_error(self):
+        """Etherscan errors are raised rather than parsed as a balance."""
+        async_etheroll = self.create_async_etheroll([])
+        address = "0xAb5801a7D398351b8bE11C439e05C5B3259aeC9B"
+        with patch_etherscan_get(
+            [
+                {
+                    "status": "0",
+                    "message": "NOTOK",
+                    "result": "Max rate limit reached",
+                }
+            ]
+        ), pytest.raises(ClientException) as ex_info:
+            run(async_etheroll.get_balance(address))
+        assert ex_info.value.args == ("Max rate limit reached",)
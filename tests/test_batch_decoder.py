@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from pyetheroll.batch_decoder import (
+    BetsColumns,
+    BetTransactionsColumns,
+    PlayerRollDiceParser,
+    decimal_to_limbs,
+    decimal_to_uint64,
+    hex_to_uint64,
+    limbs_to_ether,
+    limbs_to_wei,
+    words_to_limbs,
+)
+from pyetheroll.etheroll import decode_bet_transaction
+
+
+class TestBatchDecoder:
+
+    log_bet_abi = {
+        "inputs": [
+            {"indexed": True, "type": "bytes32", "name": "BetID"},
+            {"indexed": True, "type": "address", "name": "PlayerAddress"},
+            {"indexed": True, "type": "uint256", "name": "RewardValue"},
+            {"indexed": False, "type": "uint256", "name": "ProfitValue"},
+            {"indexed": False, "type": "uint256", "name": "BetValue"},
+            {"indexed": False, "type": "uint256", "name": "PlayerNumber"},
+            {"indexed": False, "type": "uint256", "name": "RandomQueryID"},
+        ],
+        "type": "event",
+        "name": "LogBet",
+        "anonymous": False,
+    }
+
+    def test_hex_to_uint64(self):
+        """Etherscan returns "0x" rather than "0x0" for zero quantities."""
+        assert hex_to_uint64(["0x", "0x2a", "0x5ac80e02"]).tolist() == [
+            0,
+            42,
+            1523060226,
+        ]
+
+    def test_decimal_to_uint64(self):
+        assert decimal_to_uint64(["0", "42", "1523060626"]).tolist() == [
+            0,
+            42,
+            1523060626,
+        ]
+        assert decimal_to_uint64([]).tolist() == []
+        for decimal_strings in (["42", ""], ["0x2a"], ["-1"], ["4 2"]):
+            with pytest.raises(ValueError):
+                decimal_to_uint64(decimal_strings)
+        with pytest.raises(OverflowError):
+            decimal_to_uint64([str(2 ** 64)])
+
+    def test_decimal_to_limbs(self):
+        """Amounts above 2**64 Wei fall back to exact integer parsing."""
+        values = [0, 450000000000000000]
+        limbs = decimal_to_limbs([str(value) for value in values])
+        assert limbs.shape == (2, 2)
+        assert limbs_to_wei(limbs) == values
+        values.append(44550000000000000000)
+        limbs = decimal_to_limbs([str(value) for value in values])
+        assert limbs.dtype == np.uint64
+        assert limbs_to_wei(limbs) == values
+
+    def test_player_roll_dice_parser(self):
+        """
+        Only well formed `playerRollDice` calls to the contract are kept,
+        and decode like `decode_bet_transaction()`.
+        """
+        contract_address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        parser = PlayerRollDiceParser(contract_address, "0xDC6DD152")
+        roll_dice_input = "0xdc6dd152" + "%064x" % 14
+        transaction = {
+            "blockNumber": "5394094",
+            "hash": "0x0440f101",
+            "input": roll_dice_input,
+            "timeStamp": "1523060626",
+            "to": contract_address.lower(),
+            "value": "197996051600000005",
+        }
+        transactions = [
+            transaction,
+            dict(
+                transaction, to=contract_address, value="44550000000000000000"
+            ),
+            dict(transaction, input=roll_dice_input.upper()),
+            # other contract, input too short or too large to be a bet
+            dict(transaction, to="0x00e695c5d7b2f6a2e83e1b34db1390f89e2741ef"),
+            dict(transaction, input="0x"),
+            dict(transaction, input=roll_dice_input[:-2]),
+            dict(transaction, input="0xdc6dd152" + "1" * 64),
+        ]
+        assert parser.filter(transactions) == transactions[:3]
+        columns = parser.parse(transactions)
+        assert len(columns) == 3
+        assert columns["roll_under"].tolist() == [14, 14, 14]
+        records = columns.to_records()
+        expected_records = tuple(
+            decode_bet_transaction(t) for t in transactions[:3]
+        )
+        assert records == expected_records
+        assert records[1].bet_size_wei == 44550000000000000000
+        assert columns.to_records(wei=True)[0] == decode_bet_transaction(
+            transaction, wei=True
+        )
+        columns = BetTransactionsColumns.from_transactions([])
+        assert columns.to_records() == ()
+
+    def test_words_to_limbs(self):
+        """Wei amounts above 2**64 are kept exact."""
+        values = [0, 1, 2 ** 64 - 1, 2 ** 64, 44550000000000000000]
+        words = np.array(
+            [list(value.to_bytes(32, "big")) for value in values],
+            dtype=np.uint8,
+        )
+        limbs = words_to_limbs(words)
+        assert limbs.shape == (5, 2)
+        assert limbs_to_wei(limbs) == values
+        assert limbs_to_ether(limbs)[-1] == 44.55
+        words[0, 0] = 1
+        with pytest.raises(OverflowError):
+            words_to_limbs(words)
+
+    def test_from_logs_empty(self):
+        columns = BetsColumns.from_logs(self.log_bet_abi, [])
+        assert len(columns) == 0
+        assert columns["bet_id"].shape == (0, 32)
+        assert columns.to_dicts() == ()
+
+    def test_from_logs_malformed(self):
+        """Logs not matching the event layout are rejected."""
+        log = {
+            "blockNumber": "0x524e94",
+            "data": "0x00",
+            "logIndex": "0x",
+            "timeStamp": "0x5ac80e02",
+            "topics": ["00" * 32] * 4,
+            "transactionHash": "0x" + "00" * 32,
+        }
+        with pytest.raises(ValueError):
+            BetsColumns.from_logs(self.log_bet_abi, [log])
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+from unittest import mock
+
+from pyetheroll.bet_store import BetStore
+from pyetheroll.etheroll import Etheroll, merge_logs
+from tests import test_etheroll
+from tests.test_etheroll import patch_get_abi
+
+
+def patch_block_number(block_number):
+    return mock.patch(
+        "web3.eth.Eth.blockNumber",
+        new_callable=mock.PropertyMock,
+        return_value=block_number,
+    )
+
+
+def patch_get_log_bet_and_result_events(bet_events, result_events):
+    return mock.patch(
+        "pyetheroll.etheroll.Etheroll.get_log_bet_and_result_events",
+        return_value=(bet_events, result_events),
+    )
+
+
+class TestBetStore:
+
+    fixtures = test_etheroll.TestEtheroll
+    address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+
+    def setup_method(self):
+        contract_abi = [
+            self.fixtures.log_bet_abi,
+            self.fixtures.log_result_abi,
+        ]
+        with patch_get_abi(json.dumps(contract_abi)):
+            self.etheroll = Etheroll()
+        self.bet_store = BetStore(self.etheroll, ":memory:", reorg_depth=10)
+
+    def teardown_method(self):
+        self.bet_store.close()
+
+    def test_sync(self):
+        """Stored logs are the same as the ones decoded by `Etheroll`."""
+        bet_events = self.fixtures.log_bet_events
+        result_events = self.fixtures.log_result_events
+        assert self.bet_store.get_checkpoint(self.address) is None
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            bet_events, result_events
+        ) as m_get_events:
+            counts = self.bet_store.sync(self.address, from_block=5394000)
+        assert counts == (len(bet_events), len(result_events))
+        assert m_get_events.call_args_list == [
+            mock.call(self.address, 5394000, 5394200)
+        ]
+        # node head minus the reorg depth
+        assert self.bet_store.get_checkpoint(self.address) == 5394190
+        bet_logs = self.etheroll.decode_bet_events(bet_events)
+        bet_results_logs = self.etheroll.decode_result_events(result_events)
+        assert self.bet_store.get_bets_logs(self.address) == bet_logs
+        assert self.bet_store.get_bet_results_logs(self.address.lower()) == (
+            bet_results_logs
+        )
+        assert self.bet_store.get_merged_logs(self.address) == merge_logs(
+            bet_logs, bet_results_logs
+        )
+        # other players and block ranges are filtered out
+        assert self.bet_store.get_bets_logs("0x1") == ()
+        assert self.bet_store.get_bets_logs(self.address, 5394200) == ()
+
+    def test_sync_incremental(self):
+        """
+        Following syncs start from the checkpoint, minus the reorg depth
+        which gets rewound.
+        """
+        bet_events = self.fixtures.log_bet_events
+        # `LogBet` events are in blocks 0x524e94 (5394068) and higher
+        with patch_block_number(5394068), patch_get_log_bet_and_result_events(
+            bet_events[:1], []
+        ):
+            self.bet_store.sync(self.address, from_block=5394000)
+        # the first bet got reorged out, e.g. uncled
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            bet_events[1:], []
+        ) as m_get_events:
+            self.bet_store.sync(self.address)
+        assert m_get_events.call_args_list == [
+            mock.call(self.address, 5394059, 5394200)
+        ]
+        assert self.bet_store.get_bets_logs(self.address) == (
+            self.etheroll.decode_bet_events(bet_events[1:])
+        )
+
+    def test_sync_etherscan_lag(self):
+        """
+        Blocks Etherscan didn't serve yet are fetched again on next sync,
+        as long as it lags less than the reorg depth behind the node head.
+        """
+        bet_events = self.fixtures.log_bet_events
+        # the first bet in block 5394068 isn't served yet
+        with patch_block_number(5394070), patch_get_log_bet_and_result_events(
+            [], []
+        ):
+            self.bet_store.sync(self.address, from_block=5394000)
+        assert self.bet_store.get_checkpoint(self.address) == 5394060
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            bet_events, []
+        ) as m_get_events:
+            self.bet_store.sync(self.address)
+        assert m_get_events.call_args_list == [
+            mock.call(self.address, 5394051, 5394200)
+        ]
+        assert len(self.bet_store.get_bets_logs(self.address)) == 2
+        assert self.bet_store.get_checkpoint(self.address) == 5394190
+
+    def test_sync_no_events(self):
+        """
+        Players without events are checkpointed too, following syncs only
+        query the new blocks.
+        """
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            [], []
+        ):
+            assert self.bet_store.sync(self.address) == (0, 0)
+        assert self.bet_store.get_checkpoint(self.address) == 5394190
+        with patch_block_number(5394300), patch_get_log_bet_and_result_events(
+            [], []
+        ) as m_get_events:
+            self.bet_store.sync(self.address)
+        assert m_get_events.call_args_list == [
+            mock.call(self.address, 5394181, 5394300)
+        ]
+        assert self.bet_store.get_checkpoint(self.address) == 5394290
+
+    def test_wei(self):
+        """Wei amounts are stored exactly, beyond 64 bits integers."""
+        bet_events = self.fixtures.log_bet_events
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            bet_events, []
+        ):
+            self.bet_store.sync(self.address, from_block=5394000)
+        bets = self.bet_store.get_bets_logs(self.address, wei=True)
+        assert bets == self.etheroll.decode_bet_events(bet_events, wei=True)
+        assert bets[0]["reward_value_wei"] == 44550000000000000000
+
+    def test_schema_version(self, tmp_path):
+        """Stores with an older schema are dropped to be synced again."""
+        path = str(tmp_path / "bets.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE bets (bet_value_ether REAL)")
+        connection.commit()
+        connection.close()
+        bet_store = BetStore(self.etheroll, path)
+        with patch_block_number(5394200), patch_get_log_bet_and_result_events(
+            self.fixtures.log_bet_events, []
+        ):
+            bet_store.sync(self.address, from_block=5394000)
+        assert len(bet_store.get_bets_logs(self.address)) == 2
+        bet_store.close()
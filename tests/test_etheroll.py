@@ -1,6 +1,7 @@
 import json
 import os
 import shutil
+import threading
 from datetime import datetime
 from tempfile import mkdtemp
 from unittest import mock
@@ -9,10 +10,13 @@ import eth_account
 import pytest
 from eth_account._utils.transactions import assert_valid_fields
 from etherscan.accounts import Account as EtherscanAccount
+from etherscan.client import ClientException, EmptyResponse
 from hexbytes.main import HexBytes
 
-from pyetheroll.constants import ChainID
-from pyetheroll.etheroll import Etheroll, merge_logs
+from pyetheroll.constants import ChainID, LogsStrategy
+from pyetheroll.etheroll import Etheroll, iter_merge_logs, merge_logs
+from pyetheroll.signer import UnlockedSigner
+from pyetheroll.utils import EtherollUtils
 
 
 def patch_get_abi(abi_str):
@@ -163,6 +167,154 @@ class TestEtheroll:
         },
     ]
 
+    # simplified (a bit) for tests
+    log_bet_events = [
+        {
+            "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
+            "blockNumber": "0x524e94",
+            "data": (
+                "0x"
+                "00000000000000000000000000000000"
+                "00000000000000026402ac5922ba0000"
+                "00000000000000000000000000000000"
+                "0000000000000000063eb89da4ed0000"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000002"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000002aea"
+            ),
+            "logIndex": "0x2a",
+            "timeStamp": "0x5ac80e02",
+            "topics": [
+                "56b3f1a6cd856076d6f8adbf8170c43a"
+                "0b0f532fc5696a2699a0e0cabc704163",
+                "15e007148ec621d996c886de0f2b88a0"
+                "3af083aa819e851a51133dc17b6e0e5b",
+                "00000000000000000000000046044bea"
+                "a1e985c67767e04de58181de5daaa00f",
+                "00000000000000000000000000000000"
+                "00000000000000026a4164f6c7a70000",
+            ],
+            "transactionHash": (
+                "0xf363906a9278c4dd300c50a3c9a2790"
+                "0bb85df60596c49f7833c232f2944d1cb"
+            ),
+        },
+        {
+            "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
+            "blockNumber": "0x524eae",
+            "data": (
+                "0x"
+                "00000000000000000000000000000000"
+                "00000000000000002de748a1024ac4eb"
+                "00000000000000000000000000000000"
+                "000000000000000006f05b59d3b20000"
+                "00000000000000000000000000000000"
+                "0000000000000000000000000000000e"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000002af9"
+            ),
+            "logIndex": "0x1c",
+            "timeStamp": "0x5ac80f92",
+            "topics": [
+                "56b3f1a6cd856076d6f8adbf8170c43a"
+                "0b0f532fc5696a2699a0e0cabc704163",
+                "c2997a1bad35841b2c30ca95eea9cb08"
+                "c7b101bc14d5aa8b1b8a0facea793e05",
+                "00000000000000000000000046044bea"
+                "a1e985c67767e04de58181de5daaa00f",
+                "00000000000000000000000000000000"
+                "000000000000000034d7a3fad5fcc4eb",
+            ],
+            "transactionHash": (
+                "0x0440f1013a5eafd88f16be6b5612b6e"
+                "051a4eb1b0b91a160c680295e7fab5bfe"
+            ),
+        },
+    ]
+
+    # simplified (a bit) for tests
+    log_result_events = [
+        {
+            "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
+            "blockNumber": "0x524e97",
+            "data": (
+                "0x"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000002"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000056"
+                "00000000000000000000000000000000"
+                "0000000000000000063eb89da4ed0000"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000000"
+                "000000000000000000000000000000a0"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000022"
+                "12209856f69aa7983168979d4b0c4197"
+                "8807202b14cc7ffc6e31a17d443f017f"
+                "cdff0000000000000000000000000000"
+                "00000000000000000000000000000000"
+            ),
+            "logIndex": "0xc",
+            "timeStamp": "0x5ac80e33",
+            "topics": [
+                "8dd0b145385d04711e29558ceab40b45"
+                "6976a2b9a7d648cc1bcd416161bf97b9",
+                "00000000000000000000000000000000"
+                "0000000000000000000000000004511d",
+                "15e007148ec621d996c886de0f2b88a0"
+                "3af083aa819e851a51133dc17b6e0e5b",
+                "00000000000000000000000046044bea"
+                "a1e985c67767e04de58181de5daaa00f",
+            ],
+            "transactionHash": (
+                "0x3505de688dc20748eb5f6b3efd6e6d3"
+                "66ea7f0737b4ab17035c6b60ab4329f2a"
+            ),
+        },
+        {
+            "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
+            "blockNumber": "0x524eaa",
+            "data": (
+                "0x"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000002"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000004"
+                "00000000000000000000000000000000"
+                "0000000000000000063eb89da4ed0000"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000000"
+                "000000000000000000000000000000a0"
+                "00000000000000000000000000000000"
+                "00000000000000000000000000000022"
+                "12205a95b896176efeb912d5d4937c54"
+                "1ee511092aced04eb764eab4e9629c61"
+                "3c3c0000000000000000000000000000"
+                "00000000000000000000000000000000"
+            ),
+            "logIndex": "0x4f",
+            "timeStamp": "0x5ac80f38",
+            "topics": [
+                "8dd0b145385d04711e29558ceab40b45"
+                "6976a2b9a7d648cc1bcd416161bf97b9",
+                "00000000000000000000000000000000"
+                "0000000000000000000000000004512b",
+                "f2fb7902894213d47c482fb155cafd96"
+                "77286d930fba1a1434265be0dbe80e66",
+                "00000000000000000000000046044bea"
+                "a1e985c67767e04de58181de5daaa00f",
+            ],
+            "transactionHash": (
+                "0x6123e2a19f649df79c6cf2dfbe99811"
+                "530d0770ade8e2c71488b8eb881ad20e9"
+            ),
+        },
+    ]
+
     def setup_method(self, method):
         self.keystore_dir = mkdtemp()
 
@@ -182,24 +334,59 @@ class TestEtheroll:
             etheroll = Etheroll()
         assert etheroll.contract is not None
 
+    def test_init_missing_signatures(self):
+        """Signatures missing from the store are recomputed."""
+        contract_abi = [self.log_bet_abi, self.player_roll_dice_abi]
+        with patch_get_abi(json.dumps(contract_abi)), mock.patch(
+            "pyetheroll.abi_store.AbiStore.get_signatures", return_value=None
+        ):
+            etheroll = Etheroll()
+        assert etheroll.events_signatures == (
+            etheroll.get_events_signatures(contract_abi)
+        )
+        assert etheroll.functions_signatures == (
+            etheroll.get_functions_signatures(contract_abi)
+        )
+
     def test_get_or_create(self):
         """
         Checks that etheroll is cached.
         The cached value should be updated on (testnet/mainnet) network change.
         """
         abi_str = "[]"
-        assert Etheroll._etheroll is None
+        Etheroll._registry.clear()
+        assert len(Etheroll._registry) == 0
         with patch_get_abi(abi_str):
             etheroll = Etheroll.get_or_create()
-        assert etheroll._etheroll is not None
+        assert len(Etheroll._registry) == 1
         # it's obviously pointing to the same object for now,
         # but shouldn't not be later after we update some settings
-        assert etheroll == Etheroll.get_or_create() == Etheroll._etheroll
+        assert etheroll == Etheroll.get_or_create()
         assert etheroll.chain_id == ChainID.MAINNET
-        # the cached object is invalidated if the network changes
+        # another object is created if the network changes
         with patch_get_abi(abi_str):
-            assert etheroll != Etheroll.get_or_create(chain_id=ChainID.ROPSTEN)
-        assert Etheroll._etheroll.chain_id == ChainID.ROPSTEN
+            ropsten_etheroll = Etheroll.get_or_create(chain_id=ChainID.ROPSTEN)
+        assert etheroll != ropsten_etheroll
+        assert ropsten_etheroll.chain_id == ChainID.ROPSTEN
+        # but switching back doesn't rebuild the previous one
+        assert etheroll == Etheroll.get_or_create(chain_id=ChainID.MAINNET)
+        assert ropsten_etheroll == Etheroll.get_or_create(
+            chain_id=ChainID.ROPSTEN
+        )
+        assert Etheroll._registry.stats == {
+            "size": 2,
+            "hits": 3,
+            "misses": 2,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        # the address case doesn't matter
+        contract_address = Etheroll.CONTRACT_ADDRESSES[ChainID.MAINNET]
+        assert etheroll == Etheroll.get_or_create(
+            contract_address=contract_address.lower()
+        )
+        assert len(Etheroll._registry) == 2
+        Etheroll._registry.clear()
 
     def create_account_helper(self, password):
         """
@@ -308,9 +495,8 @@ class TestEtheroll:
             # and getTransactionCount been called with the normalized address
             normalized_address = account.address
             assert m_getTransactionCount.call_args_list == [
-                mock.call(normalized_address)
+                mock.call(normalized_address, "pending")
             ]
-            # getTransactionCount
             # a second one with custom gas (in gwei), refs #23
             gas_price_gwei = 12
             gas_price_wei = int(gas_price_gwei * 1e9)
@@ -322,8 +508,8 @@ class TestEtheroll:
                 gas_price_wei,
             )
             assert transaction is not None
-        # the nonce was retrieved
-        assert m_getTransactionCount.called is True
+        # the nonce was only retrieved once, then allocated locally
+        assert m_getTransactionCount.call_count == 1
         # the transaction was sent
         assert m_sendRawTransaction.called is True
         # the transaction should be built that way
@@ -341,6 +527,7 @@ class TestEtheroll:
         }
         expected_transaction2 = expected_transaction1.copy()
         expected_transaction2["gasPrice"] = 12 * 1e9
+        expected_transaction2["nonce"] = 1
         expected_call1 = mock.call(expected_transaction1, account.key)
         expected_call2 = mock.call(expected_transaction2, account.key)
         # the method should have been called only once
@@ -359,6 +546,57 @@ class TestEtheroll:
         # because float are not accepted
         assert type(transaction_dict["value"]) is float
 
+    def test_player_roll_dice_already_known(self):
+        """
+        A transaction the node already has is only sent once, its locally
+        computed hash is returned rather than betting again on a new nonce.
+        """
+        contract_abi = [self.player_roll_dice_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        signer = mock.Mock(
+            address="0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        )
+        signer.sign_transaction.return_value.hash = HexBytes("ab" * 32)
+        with mock.patch(
+            "web3.eth.Eth.sendRawTransaction",
+            side_effect=ValueError(
+                {"code": -32000, "message": "already known"}
+            ),
+        ) as m_sendRawTransaction, mock.patch(
+            "web3.eth.Eth.getTransactionCount", return_value=3
+        ):
+            tx_hash = etheroll.player_roll_dice(10 ** 17, 50, signer=signer)
+            assert etheroll.nonce_manager.next_nonce(signer.address) == 4
+        assert tx_hash == HexBytes("ab" * 32)
+        assert m_sendRawTransaction.call_count == 1
+        assert signer.sign_transaction.call_count == 1
+
+    def test_player_roll_dice_signer(self):
+        """An `UnlockedSigner` is used in place of the wallet."""
+        contract_abi = [self.player_roll_dice_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        account = self.create_account_helper("password")
+        signer = UnlockedSigner(account.path, "password")
+        with mock.patch(
+            "web3.eth.Eth.sendRawTransaction"
+        ) as m_sendRawTransaction, mock.patch(
+            "web3.eth.Eth.getTransactionCount", return_value=3
+        ), mock.patch(
+            "eth_account.account.Account.decrypt"
+        ) as m_decrypt:
+            for chances in (10, 20):
+                transaction = etheroll.player_roll_dice(
+                    10 ** 17, chances, signer=signer
+                )
+                assert transaction is not None
+        # the wallet wasn't decrypted again
+        assert m_decrypt.call_args_list == []
+        assert m_sendRawTransaction.call_count == 2
+        with pytest.raises(ValueError, match="wallet or a signer"):
+            etheroll.player_roll_dice(10 ** 17, 10)
+
     def test_transaction(self):
         """Verifies the transaction is properly built and sent."""
         # simplified contract ABI
@@ -388,7 +626,7 @@ class TestEtheroll:
         # and getTransactionCount been called with the normalized address
         normalized_address = account.address
         assert m_getTransactionCount.call_args_list == [
-            mock.call(normalized_address)
+            mock.call(normalized_address, "pending")
         ]
         # the nonce was retrieved
         assert m_getTransactionCount.called is True
@@ -523,6 +761,136 @@ class TestEtheroll:
         expected_calls = [expected_call]
         assert m_get_transaction_page.call_args_list == expected_calls
 
+    def test_get_last_bets_transactions_columns(self):
+        """Columns are decoded to the same records on demand."""
+        contract_address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        with patch_get_abi(json.dumps([self.player_roll_dice_abi])):
+            etheroll = Etheroll(contract_address=contract_address)
+        transactions = self.create_roll_dice_transactions(contract_address, 6)
+        address = "0x46044beaa1e985c67767e04de58181de5daaa00f"
+        with patch_get_transaction_page(transactions):
+            columns = etheroll.get_last_bets_transactions_columns(address)
+            bets = etheroll.get_last_bets_transactions(address)
+        assert len(columns) == len(bets) == 4
+        assert columns.to_records() == bets
+        assert list(columns["roll_under"]) == 4 * [2]
+
+    def test_get_transaction_page_empty(self):
+        """
+        Only "No transactions found" is an empty page, other errors raise.
+        """
+        with patch_get_abi(json.dumps([])):
+            etheroll = Etheroll()
+        with mock.patch(
+            "etherscan.accounts.Account.get_transaction_page",
+            side_effect=[
+                EmptyResponse("No transactions found"),
+                EmptyResponse("NOTOK"),
+            ],
+        ):
+            assert etheroll.get_transaction_page("0x1") == []
+            with pytest.raises(EmptyResponse, match="NOTOK"):
+                etheroll.get_transaction_page("0x1")
+
+    def create_roll_dice_transactions(self, contract_address, count):
+        """Returns `count` bets transactions, most recent first."""
+        return [
+            {
+                "blockNumber": str(5394000 + block),
+                "hash": f"0x{block:064x}",
+                "input": "0xdc6dd152" + f"{2:064x}",
+                "timeStamp": str(1523060000 + block),
+                # every third transaction isn't sent to the contract
+                "to": contract_address.lower() if block % 3 else "0x0",
+                "value": "450000000000000000",
+            }
+            for block in reversed(range(count))
+        ]
+
+    def test_iter_transaction_pages(self):
+        """Pages are fetched lazily, prefetching the next one."""
+        contract_address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        with patch_get_abi(json.dumps([self.player_roll_dice_abi])):
+            etheroll = Etheroll(contract_address=contract_address)
+        transactions = self.create_roll_dice_transactions(contract_address, 5)
+        pages = [transactions[0:2], transactions[2:4], transactions[4:5]]
+        address = "0x46044beaa1e985c67767e04de58181de5daaa00f"
+        next_page_fetched = threading.Event()
+
+        def get_transaction_page(address, page, offset, internal):
+            if page == 2:
+                next_page_fetched.set()
+            return pages[page - 1]
+
+        with mock.patch.object(
+            etheroll,
+            "get_transaction_page",
+            side_effect=get_transaction_page,
+        ) as m_get_transaction_page:
+            iter_pages = etheroll.iter_transaction_pages(address, offset=2)
+            assert m_get_transaction_page.call_count == 0
+            assert next(iter_pages) == pages[0]
+            # the second page gets fetched while the first is consumed
+            assert next_page_fetched.wait(timeout=1)
+            assert list(iter_pages) == pages[1:]
+        assert m_get_transaction_page.call_args_list == [
+            mock.call(address, 1, 2, False),
+            mock.call(address, 2, 2, False),
+            mock.call(address, 3, 2, False),
+        ]
+
+    def test_iter_bets_transactions(self):
+        """Bets are filtered and decoded as pages stream, down to cutoffs."""
+        contract_address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        with patch_get_abi(json.dumps([self.player_roll_dice_abi])):
+            etheroll = Etheroll(contract_address=contract_address)
+        transactions = self.create_roll_dice_transactions(contract_address, 9)
+        pages = [transactions[0:3], transactions[3:6], transactions[6:9], []]
+        address = "0x46044beaa1e985c67767e04de58181de5daaa00f"
+        with mock.patch.object(
+            etheroll, "get_transaction_page", side_effect=pages
+        ):
+            bets = list(etheroll.iter_bets_transactions(address, offset=3))
+        assert [bet["block_number"] for bet in bets] == [
+            "5394008",
+            "5394007",
+            "5394005",
+            "5394004",
+            "5394002",
+            "5394001",
+        ]
+        assert bets[0] == {
+            "bet_size_ether": 0.45,
+            "roll_under": 2,
+            "block_number": "5394008",
+            "timestamp": "1523060008",
+            "datetime": datetime(2018, 4, 7, 0, 13, 28),
+            "transaction_hash": f"0x{8:064x}",
+        }
+        # the block cutoff is reached on the second page, no third fetch
+        with mock.patch.object(
+            etheroll, "get_transaction_page", side_effect=pages
+        ) as m_get_transaction_page:
+            bets = etheroll.iter_bets_transactions(
+                address, offset=3, from_block=5394004
+            )
+            assert [bet["block_number"] for bet in bets] == [
+                "5394008",
+                "5394007",
+                "5394005",
+                "5394004",
+            ]
+        assert m_get_transaction_page.call_count == 2
+        # same goes with a time cutoff
+        with mock.patch.object(
+            etheroll, "get_transaction_page", side_effect=pages
+        ) as m_get_transaction_page:
+            bets = etheroll.iter_bets_transactions(
+                address, offset=3, since=datetime(2018, 4, 7, 0, 13, 27)
+            )
+            assert len(list(bets)) == 2
+        assert m_get_transaction_page.call_count == 1
+
     def test_get_logs_url(self):
         with patch_get_abi("[]"):
             etheroll = Etheroll()
@@ -613,7 +981,8 @@ class TestEtheroll:
         player_address = "0x46044beaa1e985c67767e04de58181de5daaa00f"
         from_block = 5394085
         to_block = 5442078
-        with mock.patch("requests.get") as m_get:
+        with mock.patch("requests.sessions.Session.get") as m_get:
+            m_get.return_value.json.return_value = {"result": []}
             etheroll.get_log_bet_events(player_address, from_block, to_block)
         expected_call = mock.call(
             "https://api.etherscan.io/api?module=logs&action=getLogs"
@@ -623,8 +992,7 @@ class TestEtheroll:
             "56b3f1a6cd856076d6f8adbf8170c43a0b0f532fc5696a2699a0e0cabc704163"
             "&topic2=0x"
             "00000000000000000000000046044beaa1e985c67767e04de58181de5daaa00f"
-            "&topic0_2_opr=and&",
-            headers={"User-Agent": "https://github.com/AndreMiras/pyetheroll"},
+            "&topic0_2_opr=and&"
         )
         expected_calls = [expected_call]
         assert m_get.call_args_list == expected_calls
@@ -641,7 +1009,8 @@ class TestEtheroll:
         player_address = "0x46044beaa1e985c67767e04de58181de5daaa00f"
         from_block = 5394085
         to_block = 5442078
-        with mock.patch("requests.get") as m_get:
+        with mock.patch("requests.sessions.Session.get") as m_get:
+            m_get.return_value.json.return_value = {"result": []}
             etheroll.get_log_result_events(
                 player_address, from_block, to_block
             )
@@ -654,83 +1023,106 @@ class TestEtheroll:
             "8dd0b145385d04711e29558ceab40b456976a2b9a7d648cc1bcd416161bf97b9"
             "&topic3=0x"
             "00000000000000000000000046044beaa1e985c67767e04de58181de5daaa00f"
-            "&topic0_3_opr=and&",
-            headers={"User-Agent": "https://github.com/AndreMiras/pyetheroll"},
+            "&topic0_3_opr=and&"
         )
         expected_calls = [expected_call]
         assert m_get.call_args_list == expected_calls
 
+    def test_get_logs_error(self):
+        """Errors returned in place of the logs are raised."""
+        with patch_get_abi("[]"):
+            etheroll = Etheroll()
+        address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        with mock.patch("requests.sessions.Session.get") as m_get:
+            m_get.return_value.json.return_value = {
+                "status": "0",
+                "message": "NOTOK",
+                "result": "Max rate limit reached",
+            }
+            with pytest.raises(ClientException, match="Max rate limit"):
+                etheroll.get_logs(address, 5394085)
+
+    def test_get_logs_chunked(self):
+        """
+        Full `getLogs` responses get their block range bisected until all
+        logs are retrieved, then merged in order without duplicates.
+        """
+        with patch_get_abi("[]"):
+            etheroll = Etheroll()
+        address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        # two logs per block, the last block having the latest ones
+        all_logs = [
+            {
+                "blockNumber": hex(block),
+                "logIndex": hex(log_index) if log_index else "0x",
+                "transactionHash": f"0x{block:064x}",
+            }
+            for block in range(100, 110)
+            for log_index in range(2)
+        ]
+
+        def get_logs(address, from_block, to_block, *args):
+            to_block = 109 if to_block == "latest" else to_block
+            logs = [
+                log
+                for log in all_logs
+                if from_block <= int(log["blockNumber"], 16) <= to_block
+            ]
+            # simulates the results limit, returning duplicates on purpose
+            if from_block != to_block:
+                logs = (logs + logs)[:3]
+            return logs
+
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_logs", side_effect=get_logs
+        ) as m_get_logs, mock.patch(
+            "pyetheroll.etheroll.ETHERSCAN_LOGS_LIMIT", 3
+        ), mock.patch(
+            "web3.eth.Eth.blockNumber", new_callable=mock.PropertyMock
+        ) as m_blockNumber:
+            m_blockNumber.return_value = 109
+            logs = etheroll.get_logs_chunked(address, 100, max_workers=2)
+        assert logs == all_logs
+        assert m_get_logs.call_args_list[0] == mock.call(
+            address, 100, "latest", None, None, None, None, None
+        )
+        # only the initial call had to resolve the latest block number
+        assert m_blockNumber.call_count == 1
+        # the range was bisected down to the last block
+        block_ranges = [c[0][1:3] for c in m_get_logs.call_args_list]
+        assert (109, 109) in block_ranges
+
+    def test_get_logs_chunked_full_block(self):
+        """A single block hitting the records limit can't be truncated."""
+        with patch_get_abi("[]"):
+            etheroll = Etheroll()
+        logs = [
+            {
+                "blockNumber": hex(100),
+                "logIndex": hex(log_index),
+                "transactionHash": "0x1",
+            }
+            for log_index in range(3)
+        ]
+
+        def get_logs(address, from_block, to_block, *args):
+            return logs if to_block >= 100 else []
+
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_logs", side_effect=get_logs
+        ), mock.patch(
+            "pyetheroll.etheroll.ETHERSCAN_LOGS_LIMIT", 3
+        ), pytest.raises(
+            ValueError, match="Block 100 logs exceed"
+        ):
+            etheroll.get_logs_chunked("0x1", 99, 100)
+
     def test_get_bets_logs(self):
         """
         Verifies `get_bets_logs()` can retrieve bet info out from the logs.
         """
         # simplified contract ABI
         contract_abi = [self.log_bet_abi]
-        # simplified (a bit) for tests
-        get_log_bet_events = [
-            {
-                "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
-                "blockNumber": "0x524e94",
-                "data": (
-                    "0x"
-                    "00000000000000000000000000000000"
-                    "00000000000000026402ac5922ba0000"
-                    "00000000000000000000000000000000"
-                    "0000000000000000063eb89da4ed0000"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000002"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000002aea"
-                ),
-                "logIndex": "0x2a",
-                "timeStamp": "0x5ac80e02",
-                "topics": [
-                    "56b3f1a6cd856076d6f8adbf8170c43a"
-                    "0b0f532fc5696a2699a0e0cabc704163",
-                    "15e007148ec621d996c886de0f2b88a0"
-                    "3af083aa819e851a51133dc17b6e0e5b",
-                    "00000000000000000000000046044bea"
-                    "a1e985c67767e04de58181de5daaa00f",
-                    "00000000000000000000000000000000"
-                    "00000000000000026a4164f6c7a70000",
-                ],
-                "transactionHash": (
-                    "0xf363906a9278c4dd300c50a3c9a2790"
-                    "0bb85df60596c49f7833c232f2944d1cb"
-                ),
-            },
-            {
-                "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
-                "blockNumber": "0x524eae",
-                "data": (
-                    "0x"
-                    "00000000000000000000000000000000"
-                    "00000000000000002de748a1024ac4eb"
-                    "00000000000000000000000000000000"
-                    "000000000000000006f05b59d3b20000"
-                    "00000000000000000000000000000000"
-                    "0000000000000000000000000000000e"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000002af9"
-                ),
-                "logIndex": "0x1c",
-                "timeStamp": "0x5ac80f92",
-                "topics": [
-                    "56b3f1a6cd856076d6f8adbf8170c43a"
-                    "0b0f532fc5696a2699a0e0cabc704163",
-                    "c2997a1bad35841b2c30ca95eea9cb08"
-                    "c7b101bc14d5aa8b1b8a0facea793e05",
-                    "00000000000000000000000046044bea"
-                    "a1e985c67767e04de58181de5daaa00f",
-                    "00000000000000000000000000000000"
-                    "000000000000000034d7a3fad5fcc4eb",
-                ],
-                "transactionHash": (
-                    "0x0440f1013a5eafd88f16be6b5612b6e"
-                    "051a4eb1b0b91a160c680295e7fab5bfe"
-                ),
-            },
-        ]
         with patch_get_abi(json.dumps(contract_abi)):
             etheroll = Etheroll()
         address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
@@ -739,7 +1131,7 @@ class TestEtheroll:
         with mock.patch(
             "pyetheroll.etheroll.Etheroll.get_log_bet_events"
         ) as m_get_log_bet_events:
-            m_get_log_bet_events.return_value = get_log_bet_events
+            m_get_log_bet_events.return_value = self.log_bet_events
             logs = etheroll.get_bets_logs(address, from_block, to_block)
         expected_logs = (
             {
@@ -777,93 +1169,36 @@ class TestEtheroll:
         )
         assert logs == expected_logs
 
+    def test_get_bets_logs_wei(self):
+        """Amounts stay exact integer Wei, matching the contract payout."""
+        contract_abi = [self.log_bet_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_log_bet_events",
+            return_value=self.log_bet_events,
+        ):
+            logs = etheroll.get_bets_logs(address, 5394067, 5394095, wei=True)
+        assert [log["bet_value_wei"] for log in logs] == [
+            450000000000000000,
+            500000000000000000,
+        ]
+        assert "bet_value_ether" not in logs[0]
+        for log in logs:
+            chances_win = log["roll_under"] - 1
+            assert log["profit_value_wei"] == (
+                EtherollUtils.compute_profit_wei(
+                    log["bet_value_wei"], chances_win
+                )
+            )
+
     def test_get_bet_results_logs(self):
         """
         Checks `get_bet_results_logs()` can retrieve bet info from the logs.
         """
         # simplified contract ABI
         contract_abi = [self.log_result_abi]
-        # simplified (a bit) for tests
-        get_log_result_events = [
-            {
-                "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
-                "blockNumber": "0x524e97",
-                "data": (
-                    "0x"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000002"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000056"
-                    "00000000000000000000000000000000"
-                    "0000000000000000063eb89da4ed0000"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                    "000000000000000000000000000000a0"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000022"
-                    "12209856f69aa7983168979d4b0c4197"
-                    "8807202b14cc7ffc6e31a17d443f017f"
-                    "cdff0000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                ),
-                "logIndex": "0xc",
-                "timeStamp": "0x5ac80e33",
-                "topics": [
-                    "8dd0b145385d04711e29558ceab40b45"
-                    "6976a2b9a7d648cc1bcd416161bf97b9",
-                    "00000000000000000000000000000000"
-                    "0000000000000000000000000004511d",
-                    "15e007148ec621d996c886de0f2b88a0"
-                    "3af083aa819e851a51133dc17b6e0e5b",
-                    "00000000000000000000000046044bea"
-                    "a1e985c67767e04de58181de5daaa00f",
-                ],
-                "transactionHash": (
-                    "0x3505de688dc20748eb5f6b3efd6e6d3"
-                    "66ea7f0737b4ab17035c6b60ab4329f2a"
-                ),
-            },
-            {
-                "address": "0x048717ea892f23fb0126f00640e2b18072efd9d2",
-                "blockNumber": "0x524eaa",
-                "data": (
-                    "0x"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000002"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000004"
-                    "00000000000000000000000000000000"
-                    "0000000000000000063eb89da4ed0000"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                    "000000000000000000000000000000a0"
-                    "00000000000000000000000000000000"
-                    "00000000000000000000000000000022"
-                    "12205a95b896176efeb912d5d4937c54"
-                    "1ee511092aced04eb764eab4e9629c61"
-                    "3c3c0000000000000000000000000000"
-                    "00000000000000000000000000000000"
-                ),
-                "logIndex": "0x4f",
-                "timeStamp": "0x5ac80f38",
-                "topics": [
-                    "8dd0b145385d04711e29558ceab40b45"
-                    "6976a2b9a7d648cc1bcd416161bf97b9",
-                    "00000000000000000000000000000000"
-                    "0000000000000000000000000004512b",
-                    "f2fb7902894213d47c482fb155cafd96"
-                    "77286d930fba1a1434265be0dbe80e66",
-                    "00000000000000000000000046044bea"
-                    "a1e985c67767e04de58181de5daaa00f",
-                ],
-                "transactionHash": (
-                    "0x6123e2a19f649df79c6cf2dfbe99811"
-                    "530d0770ade8e2c71488b8eb881ad20e9"
-                ),
-            },
-        ]
         with patch_get_abi(json.dumps(contract_abi)):
             etheroll = Etheroll()
         address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
@@ -872,7 +1207,7 @@ class TestEtheroll:
         with mock.patch(
             "pyetheroll.etheroll.Etheroll.get_log_result_events"
         ) as m_get_log_result_events:
-            m_get_log_result_events.return_value = get_log_result_events
+            m_get_log_result_events.return_value = self.log_result_events
             results = etheroll.get_bet_results_logs(
                 address, from_block, to_block
             )
@@ -910,6 +1245,50 @@ class TestEtheroll:
         )
         assert results == expected_results
 
+    def test_get_bets_columns(self):
+        """
+        Batch decoding gives the same bets as `get_bets_logs()`.
+        """
+        contract_abi = [self.log_bet_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        from_block = 5394067
+        to_block = 5394095
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_log_bet_events"
+        ) as m_get_log_bet_events:
+            m_get_log_bet_events.return_value = self.log_bet_events
+            logs = etheroll.get_bets_logs(address, from_block, to_block)
+            columns = etheroll.get_bets_columns(address, from_block, to_block)
+        assert len(columns) == 2
+        assert columns["roll_under"].tolist() == [2, 14]
+        assert columns["block_number"].tolist() == [5394068, 5394094]
+        assert columns.to_dicts() == logs
+
+    def test_get_bet_results_columns(self):
+        """
+        Batch decoding gives the same results as `get_bet_results_logs()`.
+        """
+        contract_abi = [self.log_result_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        from_block = 5394067
+        to_block = 5394095
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_log_result_events"
+        ) as m_get_log_result_events:
+            m_get_log_result_events.return_value = self.log_result_events
+            results = etheroll.get_bet_results_logs(
+                address, from_block, to_block
+            )
+            columns = etheroll.get_bet_results_columns(
+                address, from_block, to_block
+            )
+        assert columns["dice_result"].tolist() == [86, 4]
+        assert columns.to_dicts() == results
+
     def test_get_last_bets_blocks(self):
         transactions = [
             {
@@ -995,6 +1374,50 @@ class TestEtheroll:
         merged_logs = merge_logs(bet_logs, bet_results_logs)
         assert merged_logs == expected_merged_logs
 
+    def test_iter_merge_logs(self):
+        """
+        Merged logs are yielded in resolution order as inputs stream in.
+        """
+        bet_logs = self.bet_logs
+        bet_results_logs = self.bet_results_logs
+        merged_logs = iter_merge_logs(
+            iter(bet_logs), iter(reversed(bet_results_logs))
+        )
+        # the second bet result arrives first and is kept pending
+        # until the second bet shows up
+        assert next(merged_logs) == {
+            "bet_log": bet_logs[0],
+            "bet_result": bet_results_logs[0],
+        }
+        assert list(merged_logs) == [
+            {"bet_log": bet_logs[1], "bet_result": bet_results_logs[1]},
+            # not yet resolved (no `LogResult`)
+            {"bet_log": bet_logs[2], "bet_result": None},
+        ]
+
+    def test_iter_merge_logs_max_pending(self):
+        """
+        Oldest pending bets and results get evicted past `max_pending` and
+        are yielded right away, with a `None` counterpart.
+        """
+        bet_logs = self.bet_logs
+        bet_results_logs = self.bet_results_logs
+        # both results arrive before their bets
+        merged_logs = iter_merge_logs(
+            [bet_logs[2], bet_logs[2], bet_logs[0], bet_logs[1]],
+            bet_results_logs[:2],
+            max_pending=1,
+        )
+        assert list(merged_logs) == [
+            # evicted from the pending results
+            {"bet_log": None, "bet_result": bet_results_logs[0]},
+            # evicted from the pending bets
+            {"bet_log": bet_logs[2], "bet_result": None},
+            {"bet_log": bet_logs[1], "bet_result": bet_results_logs[1]},
+            # its result was evicted earlier
+            {"bet_log": bet_logs[0], "bet_result": None},
+        ]
+
     def test_get_merged_logs(self):
         """
         Checking we can merge both `LogBet` and `LogResult` events.
@@ -1032,6 +1455,81 @@ class TestEtheroll:
         )
         assert merged_logs == expected_merged_logs
 
+    @pytest.mark.parametrize(
+        "strategy", [LogsStrategy.SEQUENTIAL, LogsStrategy.THREADS]
+    )
+    def test_get_merged_logs_strategy(self, strategy):
+        """Both events are fetched, sequentially or concurrently."""
+        contract_abi = [self.log_bet_abi, self.log_result_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        last_bets_blocks = {"from_block": 5394067, "to_block": 5394194}
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_last_bets_blocks",
+            return_value=last_bets_blocks,
+        ), mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_bets_logs",
+            return_value=self.bet_logs,
+        ) as m_get_bets_logs, mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_bet_results_logs",
+            return_value=self.bet_results_logs,
+        ) as m_get_bet_results_logs:
+            merged_logs = etheroll.get_merged_logs(address, strategy)
+        expected_call = mock.call(address, 5394067, 5394194, False)
+        assert m_get_bets_logs.call_args_list == [expected_call]
+        assert m_get_bet_results_logs.call_args_list == [expected_call]
+        assert merged_logs == merge_logs(self.bet_logs, self.bet_results_logs)
+
+    def test_get_merged_logs_combined(self):
+        """
+        A single `getLogs` query retrieves both events which then get split.
+        Events not involving the player at the expected topic are dropped.
+        """
+        contract_abi = [self.log_bet_abi, self.log_result_abi]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+        last_bets_blocks = {"from_block": 5394067, "to_block": 5394194}
+        # player address as the `LogBet` topic3 (`RewardValue`)
+        unrelated_event = dict(
+            self.log_bet_events[0],
+            topics=self.log_bet_events[0]["topics"][:2]
+            + [self.log_bet_events[0]["topics"][3]]
+            + [self.log_bet_events[0]["topics"][2]],
+        )
+        logs = (
+            self.log_bet_events + self.log_result_events + [unrelated_event]
+        )
+        with mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_last_bets_blocks",
+            return_value=last_bets_blocks,
+        ), mock.patch(
+            "pyetheroll.etheroll.Etheroll.get_logs_chunked", return_value=logs
+        ) as m_get_logs_chunked:
+            merged_logs = etheroll.get_merged_logs(
+                address, LogsStrategy.COMBINED
+            )
+        player_topic = (
+            "0x00000000000000000000000046044bea"
+            "a1e985c67767e04de58181de5daaa00f"
+        )
+        assert m_get_logs_chunked.call_args_list == [
+            mock.call(
+                etheroll.contract_address,
+                5394067,
+                5394194,
+                topic2=player_topic,
+                topic3=player_topic,
+                topic_opr={"topic2_3_opr": "or"},
+            )
+        ]
+        assert merged_logs == merge_logs(
+            etheroll.decode_bet_events(self.log_bet_events),
+            etheroll.decode_result_events(self.log_result_events),
+        )
+        assert len(merged_logs) == len(self.log_bet_events)
+
     def test_get_merged_logs_empty_tx(self):
         """
         Empty transaction history should not crash the application, refs:
@@ -1122,6 +1620,15 @@ class TestEtheroll:
         expected_calls = [expected_call]
         assert m_get.call_args_list == expected_calls
         assert balance == 365003.28
+        with mock.patch("requests.sessions.Session.get") as m_get:
+            m_get.return_value.status_code = 200
+            m_get.return_value.json.return_value = {
+                "status": "1",
+                "message": "OK",
+                "result": "365003278106457867877843",
+            }
+            balance = etheroll.get_balance(address, wei=True)
+        assert balance == 365003278106457867877843
 
     def test_get_transaction_page(self):
         """Should use the address passed in parameter or the contract one."""
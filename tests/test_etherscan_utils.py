@@ -0,0 +1,70 @@
+from unittest import mock
+
+from pyetheroll.etherscan_utils import (
+    NO_RATE_LIMIT,
+    EtherscanAdapter,
+    EtherscanSessionFactory,
+)
+from pyetheroll.rate_limiter import TokenBucket
+
+
+class TestEtherscanSessionFactory:
+    def teardown_method(self, method):
+        EtherscanSessionFactory._session = None
+
+    def test_get_or_create(self):
+        """The session is shared and sends the custom user agent."""
+        session = EtherscanSessionFactory.get_or_create()
+        assert session is EtherscanSessionFactory.get_or_create()
+        assert session.headers["User-Agent"] == (
+            "https://github.com/AndreMiras/pyetheroll"
+        )
+
+    def test_configure(self):
+        """Configuring replaces and closes the previous session."""
+        session = EtherscanSessionFactory.get_or_create()
+        with mock.patch.object(session, "close") as m_close:
+            new_session = EtherscanSessionFactory.configure(pool_size=32)
+        assert m_close.call_args_list == [mock.call()]
+        assert new_session is EtherscanSessionFactory.get_or_create()
+        adapter = new_session.get_adapter("https://api.etherscan.io/api?")
+        assert adapter._pool_maxsize == 32
+        # throttling is kept unless explicitly disabled
+        assert isinstance(adapter.rate_limiter, TokenBucket)
+        session = EtherscanSessionFactory.configure(rate_limiter=NO_RATE_LIMIT)
+        assert session.get_adapter("https://").rate_limiter is None
+
+
+class TestEtherscanAdapter:
+    def test_send(self):
+        """Rate limited responses are retried after a backoff."""
+        rate_limiter = mock.Mock()
+        adapter = EtherscanAdapter(rate_limiter=rate_limiter)
+        rate_limited = mock.Mock(
+            status_code=200, text='{"result":"Max rate limit reached"}'
+        )
+        ok = mock.Mock(status_code=200, text='{"status":"1"}')
+        request = mock.sentinel.request
+        with mock.patch(
+            "requests.adapters.HTTPAdapter.send",
+            side_effect=[rate_limited, ok],
+        ) as m_send, mock.patch("time.sleep") as m_sleep:
+            response = adapter.send(request, timeout=10)
+        assert response == ok
+        assert m_send.call_args_list == 2 * [
+            mock.call(request, stream=False, timeout=10)
+        ]
+        assert rate_limiter.acquire.call_count == 2
+        assert m_sleep.call_count == 1
+        assert rate_limited.close.call_count == 1
+
+    def test_send_max_retries(self):
+        """The last response is returned once retries are exhausted."""
+        adapter = EtherscanAdapter(rate_limit_retries=2)
+        server_error = mock.Mock(status_code=500)
+        with mock.patch(
+            "requests.adapters.HTTPAdapter.send", return_value=server_error
+        ) as m_send, mock.patch("time.sleep"):
+            response = adapter.send(mock.sentinel.request)
+        assert response == server_error
+        assert m_send.call_count == 3
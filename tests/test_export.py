@@ -0,0 +1,126 @@
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from pyetheroll.batch_decoder import BetResultsColumns, BetsColumns
+from tests import test_etheroll
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+export = pytest.importorskip("pyetheroll.export")
+
+
+class TestExport:
+
+    fixtures = test_etheroll.TestEtheroll
+
+    def get_bets(self):
+        return BetsColumns.from_logs(
+            self.fixtures.log_bet_abi, self.fixtures.log_bet_events
+        )
+
+    def get_results(self, events=None):
+        if events is None:
+            events = self.fixtures.log_result_events
+        return BetResultsColumns.from_logs(
+            self.fixtures.log_result_abi, events
+        )
+
+    def test_export_merged_bets(self, tmp_path):
+        path = str(tmp_path / "bets.parquet")
+        chunks = [(self.get_bets(), self.get_results())]
+        assert export.export_merged_bets(path, chunks) == 2
+        table = pq.read_table(path)
+        assert table.schema.equals(export.MERGED_BETS_SCHEMA)
+        assert table.schema.field("timestamp").type == pa.timestamp("ms")
+        rows = table.to_pylist()
+        # first bet is resolved, the second one isn't
+        assert rows[0]["bet_id"].hex() == (
+            "15e007148ec621d996c886de0f2b88a03af083aa819e851a51133dc17b6e0e5b"
+        )
+        assert rows[0]["player"].hex() == (
+            "46044beaa1e985c67767e04de58181de5daaa00f"
+        )
+        assert rows[0]["block_number"] == 5394068
+        assert rows[0]["reward_value_wei"] == Decimal(44550000000000000000)
+        assert rows[0]["bet_value_wei"] == Decimal(450000000000000000)
+        assert rows[0]["roll_under"] == 2
+        assert rows[0]["timestamp"] == datetime(2018, 4, 7, 0, 17, 6)
+        assert rows[0]["dice_result"] == 86
+        assert rows[0]["result_value_wei"] == Decimal(450000000000000000)
+        result_event = self.fixtures.log_result_events[0]
+        assert rows[0]["result_transaction_hash"] == (
+            result_event["transactionHash"]
+        )
+        assert rows[1]["roll_under"] == 14
+        assert rows[1]["dice_result"] is None
+        assert rows[1]["result_value_wei"] is None
+        assert rows[1]["result_timestamp"] is None
+
+    def test_export_merged_bets_later_result(self, tmp_path):
+        """Bets wait for their result coming in a later chunk."""
+        path = str(tmp_path / "bets.parquet")
+        chunks = [
+            (self.get_bets(), self.get_results([])),
+            (self.get_bets().take([]), self.get_results()),
+        ]
+        assert export.export_merged_bets(path, chunks) == 2
+        rows = pq.read_table(path).to_pylist()
+        # unresolved pending bets are written on close
+        assert [row["dice_result"] for row in rows] == [86, None]
+
+    def test_max_pending(self, tmp_path):
+        """Bets over the pending limit are written unresolved."""
+        path = str(tmp_path / "bets.parquet")
+        with export.ParquetExporter(path, max_pending=0) as exporter:
+            exporter.write(self.get_bets(), self.get_results([]))
+            assert exporter.pending_bets is not None
+            assert len(exporter.pending_bets) == 0
+            exporter.write(self.get_bets().take([]), self.get_results())
+        rows = pq.read_table(path).to_pylist()
+        assert [row["dice_result"] for row in rows] == [None, None]
+
+    def test_block_order(self, tmp_path):
+        """Rows are written by block whatever the chunk they come from."""
+        path = str(tmp_path / "bets.parquet")
+        bets = self.get_bets()
+        # the older bet comes in the later chunk
+        with export.ParquetExporter(path, max_pending=1) as exporter:
+            exporter.write(bets.take([1]), self.get_results([]))
+            exporter.write(bets.take([0]), self.get_results([]))
+            # the oldest pending bet was written unresolved
+            assert exporter.pending_bets.to_dicts() == (
+                bets.take([1]).to_dicts()
+            )
+        rows = pq.read_table(path).to_pylist()
+        assert [row["block_number"] for row in rows] == sorted(
+            bets["block_number"].tolist()
+        )
+
+    def test_wei_array(self):
+        """Limbs are converted exactly, above 2**64 Wei too."""
+        values = [0, 2 ** 64 - 1, 2 ** 64, 10 ** 38]
+        limbs = np.array(
+            [(value >> 64, value & (2 ** 64 - 1)) for value in values],
+            dtype=np.uint64,
+        )
+        array = export.wei_array(limbs)
+        assert array.type == export.WEI_TYPE
+        assert array.to_pylist() == [Decimal(value) for value in values]
+        mask = np.array([False, True, False, True])
+        assert export.wei_array(limbs, mask).to_pylist() == [
+            Decimal(0),
+            None,
+            Decimal(2 ** 64),
+            None,
+        ]
+
+    def test_row_groups(self, tmp_path):
+        path = str(tmp_path / "bets.parquet")
+        chunks = [(self.get_bets(), self.get_results())]
+        export.export_merged_bets(path, chunks, row_group_size=1)
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.metadata.num_rows == 2
@@ -0,0 +1,180 @@
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+from etherscan.client import ClientException
+
+from pyetheroll.batch_decoder import BetsColumns
+from pyetheroll.etheroll import Etheroll
+from pyetheroll.indexer import Indexer, parse_args
+from tests import test_etheroll
+from tests.test_etheroll import patch_get_abi
+
+
+class FakeEtherscanHandler(BaseHTTPRequestHandler):
+    """Serves `getLogs` calls from the server `logs`."""
+
+    def do_GET(self):
+        params = {
+            key: values[0]
+            for key, values in parse_qs(urlparse(self.path).query).items()
+        }
+        from_block = int(params["fromBlock"])
+        to_block = int(params["toBlock"])
+        self.server.requests.append(params)
+        if from_block in self.server.failing_blocks:
+            self.send_json(
+                {"status": "0", "message": "NOTOK", "result": "Error!"}
+            )
+            return
+        logs = [
+            log
+            for log in self.server.logs
+            if from_block <= int(log["blockNumber"], 16) <= to_block
+            and log["topics"][0] == params["topic0"][2:]
+        ]
+        self.send_json({"status": "1", "message": "OK", "result": logs})
+
+    def send_json(self, data):
+        body = json.dumps(data)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def fake_etherscan():
+    server = Server(("127.0.0.1", 0), FakeEtherscanHandler)
+    server.logs = []
+    server.failing_blocks = set()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestIndexer:
+
+    fixtures = test_etheroll.TestEtheroll
+
+    def create_indexer(self, fake_etherscan, path):
+        contract_abi = [
+            self.fixtures.log_bet_abi,
+            self.fixtures.log_result_abi,
+        ]
+        with patch_get_abi(json.dumps(contract_abi)):
+            etheroll = Etheroll()
+        host, port = fake_etherscan.server_address
+        return Indexer(
+            etheroll,
+            str(path),
+            shard_size=10,
+            processes=2,
+            etherscan_prefix=f"http://{host}:{port}/api?",
+        )
+
+    def test_get_shards(self, fake_etherscan, tmp_path):
+        """Shards are aligned on the shard size, the last is partial."""
+        indexer = self.create_indexer(fake_etherscan, tmp_path)
+        assert list(indexer.get_shards(5, 32)) == [
+            (5, 9),
+            (10, 19),
+            (20, 29),
+            (30, 32),
+        ]
+
+    def test_run(self, fake_etherscan, tmp_path):
+        """
+        Shards are fetched and decoded by the process pool, following runs
+        only index the shards not complete yet.
+        """
+        fake_etherscan.logs = (
+            self.fixtures.log_bet_events + self.fixtures.log_result_events
+        )
+        indexer = self.create_indexer(fake_etherscan, tmp_path)
+        # `LogBet` and `LogResult` blocks range from 5394068 to 5394094
+        stats = indexer.run(5394060, 5394085)
+        assert stats == {"shards": 6, "events": 2}
+        assert len(fake_etherscan.requests) == 6
+        assert len(indexer.load("LogBet")) == 1
+        # the last partial shard is completed on the next run
+        fake_etherscan.requests.clear()
+        stats = indexer.run(5394060, 5394099)
+        assert stats == {"shards": 4, "events": 2}
+        assert sorted(
+            (request["fromBlock"], request["toBlock"])
+            for request in fake_etherscan.requests
+        ) == 2 * [("5394080", "5394089")] + 2 * [("5394090", "5394099")]
+        assert indexer.run(5394060, 5394099) == {"shards": 0, "events": 0}
+        # indexed columns match the decoded events
+        bets = indexer.load("LogBet")
+        expected_bets = BetsColumns.from_logs(
+            self.fixtures.log_bet_abi, self.fixtures.log_bet_events
+        )
+        assert bets.to_dicts() == expected_bets.to_dicts()
+        assert np.array_equal(bets["player"], expected_bets["player"])
+        assert len(indexer.load("LogResult")) == 2
+        # shard by shard, missing shards are empty
+        chunks = list(indexer.iter_load())
+        assert [(len(bets), len(results)) for bets, results in chunks] == [
+            (1, 0),
+            (0, 1),
+            (0, 0),
+            (1, 1),
+        ]
+
+    def test_run_failing_shard(self, fake_etherscan, tmp_path):
+        """
+        Completed shards are recorded even if another one fails, the error
+        is raised after the loop and the next run only retries the failure.
+        """
+        fake_etherscan.logs = (
+            self.fixtures.log_bet_events + self.fixtures.log_result_events
+        )
+        fake_etherscan.failing_blocks.add(5394070)
+        indexer = self.create_indexer(fake_etherscan, tmp_path)
+        with pytest.raises(ClientException):
+            indexer.run(5394060, 5394099)
+        shards = indexer.read_manifest()["shards"]
+        assert len(shards) == 6
+        assert "LogBet/5394070" not in shards
+        assert "LogResult/5394070" not in shards
+        fake_etherscan.failing_blocks.clear()
+        fake_etherscan.requests.clear()
+        assert indexer.run(5394060, 5394099) == {"shards": 2, "events": 1}
+        assert sorted(
+            request["fromBlock"] for request in fake_etherscan.requests
+        ) == 2 * ["5394070"]
+
+    def test_read_manifest_other_contract(self, fake_etherscan, tmp_path):
+        indexer = self.create_indexer(fake_etherscan, tmp_path)
+        manifest = indexer.read_manifest()
+        manifest["contract_address"] = "0x1"
+        indexer.write_manifest(manifest)
+        with pytest.raises(ValueError):
+            indexer.read_manifest()
+
+    def test_parse_args_chain(self):
+        """Chains without Etherscan API can't be indexed."""
+        argv = ["indexer", "--path", "index", "--chain"]
+        with mock.patch("sys.argv", argv + ["ropsten"]):
+            assert parse_args().chain == "ropsten"
+        with mock.patch("sys.argv", argv + ["morden"]), pytest.raises(
+            SystemExit
+        ):
+            parse_args()
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+
+from pyetheroll.constants import ChainID
+from pyetheroll.nonce_manager import (
+    NonceManager,
+    NonceManagerFactory,
+    is_known_transaction,
+    is_nonce_error,
+)
+
+
+class TestNonceManager:
+
+    address = "0x46044beAa1E985C67767E04dE58181de5DAAA00F"
+
+    def create_nonce_manager(self, *transaction_counts):
+        web3 = mock.Mock()
+        web3.eth.getTransactionCount.side_effect = transaction_counts
+        return NonceManager(web3)
+
+    def test_next_nonce(self):
+        """Nonces are seeded from the chain once, then allocated locally."""
+        nonce_manager = self.create_nonce_manager(5, 0)
+        other_address = "0x048717Ea892F23Fb0126F00640e2b18072efd9D2"
+        assert nonce_manager.next_nonce(self.address) == 5
+        assert nonce_manager.next_nonce(self.address) == 6
+        assert nonce_manager.next_nonce(other_address) == 0
+        assert nonce_manager.next_nonce(self.address) == 7
+        get_transaction_count = nonce_manager.web3.eth.getTransactionCount
+        assert get_transaction_count.call_args_list == [
+            mock.call(self.address, "pending"),
+            mock.call(other_address, "pending"),
+        ]
+
+    def test_next_nonce_threads(self):
+        """Concurrent senders never get the same nonce."""
+        nonce_manager = self.create_nonce_manager(3)
+        nonces = []
+
+        def allocate():
+            for _ in range(100):
+                nonces.append(nonce_manager.next_nonce(self.address))
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(nonces) == list(range(3, 803))
+
+    def test_send_resync(self):
+        """Nonces rejected by the node are resynced and retried once."""
+        nonce_manager = self.create_nonce_manager(3, 10, 12)
+        send = mock.Mock(
+            side_effect=[
+                ValueError({"code": -32000, "message": "nonce too low"}),
+                "0xtx_hash",
+            ]
+        )
+        assert nonce_manager.send(self.address, send) == "0xtx_hash"
+        assert send.call_args_list == [mock.call(3), mock.call(10)]
+        assert nonce_manager.next_nonce(self.address) == 11
+        send = mock.Mock(side_effect=ValueError("nonce too low"))
+        with pytest.raises(ValueError):
+            nonce_manager.send(self.address, send, max_retries=0)
+        assert send.call_args_list == [mock.call(12)]
+
+    def test_send_nonce_taken(self):
+        """
+        Nonces taken by a pending transaction are skipped without resync,
+        known transactions aren't retried and keep their nonce.
+        """
+        nonce_manager = self.create_nonce_manager(3)
+        send = mock.Mock(
+            side_effect=[
+                ValueError("replacement transaction underpriced"),
+                "0xtx_hash",
+            ]
+        )
+        assert nonce_manager.send(self.address, send) == "0xtx_hash"
+        assert send.call_args_list == [mock.call(3), mock.call(4)]
+        send = mock.Mock(side_effect=ValueError("already known"))
+        with pytest.raises(ValueError):
+            nonce_manager.send(self.address, send)
+        assert send.call_args_list == [mock.call(5)]
+        assert nonce_manager.next_nonce(self.address) == 6
+        get_transaction_count = nonce_manager.web3.eth.getTransactionCount
+        assert get_transaction_count.call_count == 1
+
+    def test_send_error(self):
+        """
+        Other errors aren't retried nor resynced, the nonce is rolled back
+        unless a later one was handed out in the meantime.
+        """
+        nonce_manager = self.create_nonce_manager(3)
+        send = mock.Mock(side_effect=ValueError("insufficient funds"))
+        with pytest.raises(ValueError, match="insufficient funds"):
+            nonce_manager.send(self.address, send)
+        assert send.call_args_list == [mock.call(3)]
+        assert nonce_manager.next_nonce(self.address) == 3
+
+        def send(nonce):
+            # another send got the next nonce while this one was in flight
+            assert nonce_manager.next_nonce(self.address) == nonce + 1
+            raise ValueError("insufficient funds")
+
+        with pytest.raises(ValueError, match="insufficient funds"):
+            nonce_manager.send(self.address, send)
+        assert nonce_manager.next_nonce(self.address) == 6
+        get_transaction_count = nonce_manager.web3.eth.getTransactionCount
+        assert get_transaction_count.call_count == 1
+
+    def test_async_send(self):
+        """Same as `send()` with a coroutine function."""
+        nonce_manager = self.create_nonce_manager(3, 10)
+        nonces = []
+
+        async def send(nonce):
+            nonces.append(nonce)
+            if nonce == 3:
+                raise ValueError({"code": -32000, "message": "nonce too low"})
+            return "0xtx_hash"
+
+        tx_hash = asyncio.get_event_loop().run_until_complete(
+            nonce_manager.async_send(self.address, send)
+        )
+        assert tx_hash == "0xtx_hash"
+        assert nonces == [3, 10]
+        assert nonce_manager.next_nonce(self.address) == 11
+
+    def test_factory(self):
+        """Managers are shared process-wide, one per chain."""
+        web3 = mock.Mock()
+        nonce_manager = NonceManagerFactory.get_or_create(
+            ChainID.ROPSTEN, web3
+        )
+        assert nonce_manager.web3 is web3
+        assert nonce_manager is NonceManagerFactory.get_or_create(
+            ChainID.ROPSTEN, mock.Mock()
+        )
+        assert nonce_manager is not NonceManagerFactory.get_or_create(
+            ChainID.MAINNET, web3
+        )
+
+    def test_is_nonce_error(self):
+        assert is_nonce_error(
+            ValueError({"code": -32000, "message": "Nonce too low"})
+        )
+        assert is_nonce_error(
+            ValueError("replacement transaction underpriced")
+        )
+        assert not is_nonce_error(ValueError("insufficient funds"))
+        assert not is_nonce_error(ValueError("already known"))
+
+    def test_is_known_transaction(self):
+        assert is_known_transaction(
+            ValueError({"code": -32000, "message": "already known"})
+        )
+        assert is_known_transaction(ValueError("Known transaction: 0x12"))
+        assert not is_known_transaction(ValueError("nonce too low"))
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from pyetheroll.rate_limiter import TokenBucket, backoff_delay, is_rate_limited
+
+
+def patch_monotonic(return_value):
+    return mock.patch("time.monotonic", return_value=return_value)
+
+
+class TestTokenBucket:
+    def test_reserve(self):
+        """Tokens are borrowed ahead once the bucket is empty."""
+        with patch_monotonic(100):
+            token_bucket = TokenBucket(rate=2)
+            assert token_bucket.reserve() == 0
+            assert token_bucket.reserve() == 0
+            assert token_bucket.reserve() == 0.5
+            assert token_bucket.reserve() == 1
+        # refilled meanwhile, but still in debt
+        with patch_monotonic(101):
+            assert token_bucket.reserve() == 0.5
+        assert token_bucket.stats == {"acquired": 5, "waited": 2}
+
+    def test_acquire(self):
+        with patch_monotonic(100):
+            token_bucket = TokenBucket(rate=1)
+            with mock.patch("time.sleep") as m_sleep:
+                assert token_bucket.acquire() == 0
+                assert token_bucket.acquire() == 1
+        assert m_sleep.call_args_list == [mock.call(1)]
+
+
+class TestRateLimiter:
+    def test_backoff_delay(self):
+        with mock.patch("random.uniform") as m_uniform:
+            backoff_delay(0)
+            backoff_delay(3)
+            backoff_delay(10)
+        assert m_uniform.call_args_list == [
+            mock.call(0, 0.5),
+            mock.call(0, 4),
+            mock.call(0, 30),
+        ]
+
+    def test_is_rate_limited(self):
+        assert is_rate_limited(200, '{"status":"1"}') is False
+        text = (
+            '{"status":"0","message":"NOTOK",'
+            '"result":"Max rate limit reached"}'
+        )
+        assert is_rate_limited(200, text) is True
+        assert is_rate_limited(502, "Bad Gateway") is True
@@ -0,0 +1,143 @@
+import sys
+from datetime import datetime
+
+import pytest
+
+from pyetheroll.records import (
+    Bet,
+    BetResult,
+    BetTransaction,
+    WeiBet,
+    WeiBetTransaction,
+)
+
+
+class TestRecords:
+
+    def create_bet(self, record_class=Bet):
+        return record_class(
+            bet_id=(
+                "15e007148ec621d996c886de0f2b88a0"
+                "3af083aa819e851a51133dc17b6e0e5b"
+            ),
+            reward_value_wei=44550000000000000000,
+            profit_value_wei=44100000000000000000,
+            bet_value_wei=450000000000000000,
+            roll_under=2,
+            timestamp="0x5ac80e02",
+            transaction_hash=(
+                "0xf363906a9278c4dd300c50a3c9a27900"
+                "bb85df60596c49f7833c232f2944d1cb"
+            ),
+        )
+
+    def test_bet(self):
+        """Records read and compare like the dicts they replace."""
+        bet = self.create_bet()
+        expected_bet = {
+            "bet_id": (
+                "15e007148ec621d996c886de0f2b88a0"
+                "3af083aa819e851a51133dc17b6e0e5b"
+            ),
+            "reward_value_ether": 44.55,
+            "profit_value_ether": 44.1,
+            "bet_value_ether": 0.45,
+            "roll_under": 2,
+            "timestamp": "0x5ac80e02",
+            "datetime": datetime(2018, 4, 7, 0, 17, 6),
+            "transaction_hash": (
+                "0xf363906a9278c4dd300c50a3c9a27900"
+                "bb85df60596c49f7833c232f2944d1cb"
+            ),
+        }
+        assert bet == expected_bet
+        assert expected_bet == bet
+        assert dict(bet) == expected_bet
+        assert list(bet) == list(expected_bet)
+        assert bet["bet_value_ether"] == 0.45
+        assert bet.get("dice_result") is None
+        assert "roll_under" in bet
+        # integer Wei are exact, but not part of the dict view
+        assert bet.reward_value_wei == 44550000000000000000
+        assert "reward_value_wei" not in bet
+        with pytest.raises(KeyError):
+            bet["reward_value_wei"]
+        assert bet != dict(expected_bet, roll_under=3)
+
+    def test_datetime(self):
+        """The datetime is computed once, on first access."""
+        bet = self.create_bet()
+        assert bet._datetime is None
+        assert bet.datetime == datetime(2018, 4, 7, 0, 17, 6)
+        assert bet["datetime"] is bet.datetime
+
+    def test_slots(self):
+        bet = self.create_bet()
+        with pytest.raises(AttributeError):
+            bet.player = "0x46044beaa1e985c67767e04de58181de5daaa00f"
+        assert sys.getsizeof(bet) < sys.getsizeof(dict(bet))
+
+    def test_bet_result(self):
+        result = BetResult(
+            bet_id="f2fb7902",
+            roll_under=2,
+            dice_result=4,
+            bet_value_wei=44550000000000000000,
+            timestamp="0x5ac80f38",
+            transaction_hash="0x6123e2a1",
+        )
+        assert result == {
+            "bet_id": "f2fb7902",
+            "roll_under": 2,
+            "dice_result": 4,
+            "bet_value_ether": 44.55,
+            "timestamp": "0x5ac80f38",
+            "datetime": datetime(2018, 4, 7, 0, 22, 16),
+            "transaction_hash": "0x6123e2a1",
+        }
+
+    def test_bet_transaction(self):
+        """Transactions bet size isn't rounded."""
+        bet = BetTransaction(
+            bet_size_wei=197996051600000005,
+            roll_under=14,
+            block_number="5394094",
+            timestamp="1523060626",
+            transaction_hash="0x0440f101",
+        )
+        assert bet == {
+            "bet_size_ether": 0.197996051600000005,
+            "roll_under": 14,
+            "block_number": "5394094",
+            "timestamp": "1523060626",
+            "datetime": datetime(2018, 4, 7, 0, 23, 46),
+            "transaction_hash": "0x0440f101",
+        }
+        assert repr(bet).startswith("BetTransaction({'bet_size_ether': ")
+
+    def test_wei_records(self):
+        """`Wei*` records expose Wei amounts in place of Ether ones."""
+        bet = self.create_bet(WeiBet)
+        assert list(bet) == [
+            "bet_id",
+            "reward_value_wei",
+            "profit_value_wei",
+            "bet_value_wei",
+            "roll_under",
+            "timestamp",
+            "datetime",
+            "transaction_hash",
+        ]
+        assert bet["profit_value_wei"] == 44100000000000000000
+        # Ether amounts are still available as attributes
+        assert bet.profit_value_ether == 44.1
+        assert bet != self.create_bet()
+        bet = WeiBetTransaction(
+            bet_size_wei=197996051600000005,
+            roll_under=14,
+            block_number="5394094",
+            timestamp="1523060626",
+            transaction_hash="0x0440f101",
+        )
+        assert bet["bet_size_wei"] == 197996051600000005
+        assert "bet_size_ether" not in bet
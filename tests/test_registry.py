@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from pyetheroll.registry import Registry
+
+
+def patch_monotonic(return_value):
+    return mock.patch("time.monotonic", return_value=return_value)
+
+
+class TestRegistry:
+    def test_get_or_create(self):
+        registry = Registry()
+        create = mock.Mock(side_effect=[mock.sentinel.a, mock.sentinel.b])
+        assert registry.get_or_create("a", create) == mock.sentinel.a
+        assert registry.get_or_create("a", create) == mock.sentinel.a
+        assert registry.get_or_create("b", create) == mock.sentinel.b
+        assert create.call_count == 2
+        assert "a" in registry
+        assert registry.stats == {
+            "size": 2,
+            "hits": 1,
+            "misses": 2,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        assert registry.pop("a") == mock.sentinel.a
+        assert "a" not in registry
+        registry.clear()
+        assert len(registry) == 0
+
+    def test_create_error(self):
+        """A failing `create()` doesn't leak its key lock and is retried."""
+        registry = Registry()
+        create = mock.Mock(side_effect=[ValueError, mock.sentinel.a])
+        with pytest.raises(ValueError):
+            registry.get_or_create("a", create)
+        assert registry._key_locks == {}
+        assert "a" not in registry
+        assert registry.get_or_create("a", create) == mock.sentinel.a
+        assert registry._key_locks == {}
+
+    def test_lru_eviction(self):
+        """The least recently used object gets evicted."""
+        registry = Registry(maxsize=2)
+        registry.get_or_create("a", lambda: "a")
+        registry.get_or_create("b", lambda: "b")
+        # makes "b" the least recently used one
+        registry.get_or_create("a", lambda: "a")
+        registry.get_or_create("c", lambda: "c")
+        assert "a" in registry
+        assert "b" not in registry
+        assert "c" in registry
+        assert registry.stats["evictions"] == 1
+
+    def test_ttl(self):
+        """Expired objects are recreated."""
+        registry = Registry(ttl=10)
+        with patch_monotonic(100):
+            assert registry.get_or_create("a", lambda: 1) == 1
+        with patch_monotonic(110):
+            assert registry.get_or_create("a", lambda: 2) == 1
+        with patch_monotonic(111):
+            assert registry.get_or_create("a", lambda: 3) == 3
+        assert registry.stats["expirations"] == 1
+
+    def test_concurrent_create(self):
+        """Concurrent threads asking for the same key share one object."""
+        registry = Registry()
+        create = mock.Mock(side_effect=lambda: time.sleep(0.05) or object())
+        results = []
+
+        def target():
+            results.append(registry.get_or_create("a", create))
+
+        threads = [threading.Thread(target=target) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert create.call_count == 1
+        assert len(set(map(id, results))) == 1
+        assert registry.stats["hits"] == 4
@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+
+import eth_account
+import pytest
+
+from pyetheroll.signer import UnlockedSigner
+
+
+class TestUnlockedSigner:
+
+    transaction = {
+        "nonce": 0,
+        "chainId": 1,
+        "to": "0x46044beAa1E985C67767E04dE58181de5DAAA00F",
+        "gas": 25000,
+        "value": 1,
+        "gasPrice": 12000000000,
+    }
+
+    def create_wallet(self, tmp_path, password="password"):
+        account = eth_account.Account.create()
+        encrypted = eth_account.Account.encrypt(
+            account.key, password, iterations=1
+        )
+        wallet_path = tmp_path / "wallet.json"
+        wallet_path.write_text(json.dumps(encrypted))
+        return account, str(wallet_path)
+
+    def test_sign_transaction(self, tmp_path):
+        """The keyfile is decrypted once and signs many transactions."""
+        account, wallet_path = self.create_wallet(tmp_path)
+        with mock.patch.object(
+            eth_account.Account,
+            "decrypt",
+            wraps=eth_account.Account.decrypt,
+        ) as m_decrypt:
+            signer = UnlockedSigner(wallet_path, "password")
+            for nonce in range(3):
+                transaction = dict(self.transaction, nonce=nonce)
+                signed_tx = signer.sign_transaction(transaction)
+                assert signed_tx == eth_account.Account.signTransaction(
+                    transaction, account.key
+                )
+        assert m_decrypt.call_count == 1
+        assert signer.address == account.address
+
+    def test_close(self, tmp_path):
+        """The key is zeroed on close and can't sign anymore."""
+        _, wallet_path = self.create_wallet(tmp_path)
+        with UnlockedSigner(wallet_path, "password") as signer:
+            private_key = signer._private_key
+            assert private_key.count(0) < len(private_key)
+            assert signer.closed is False
+        assert signer.closed is True
+        assert private_key == bytearray(32)
+        with pytest.raises(ValueError, match="closed or expired"):
+            signer.sign_transaction(self.transaction)
+        # closing twice is fine
+        signer.close()
+
+    def test_ttl(self, tmp_path):
+        _, wallet_path = self.create_wallet(tmp_path)
+        with mock.patch("time.monotonic", return_value=1000):
+            signer = UnlockedSigner(wallet_path, "password", ttl=60)
+        private_key = signer._private_key
+        with mock.patch("time.monotonic", return_value=1059):
+            assert signer.expired is False
+            signer.sign_transaction(self.transaction)
+        with mock.patch("time.monotonic", return_value=1060):
+            assert signer.expired is True
+            with pytest.raises(ValueError, match="closed or expired"):
+                signer.sign_transaction(self.transaction)
+        assert signer.closed is True
+        assert private_key == bytearray(32)
+        # never expires without TTL
+        signer = UnlockedSigner(wallet_path, "password", ttl=None)
+        with mock.patch("time.monotonic", return_value=10 ** 9):
+            assert signer.expired is False
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from pyetheroll.simulator import (
+    FlatStrategy,
+    MartingaleStrategy,
+    ProportionalStrategy,
+    SimulationResult,
+    Simulator,
+)
+from pyetheroll.utils import EtherollUtils
+
+
+class TestSimulator:
+    def test_init(self):
+        """The profit ratio follows the contract payout formula."""
+        simulator = Simulator(FlatStrategy(0.1), roll_under=35)
+        profit = EtherollUtils.compute_profit(0.10, 34)
+        assert round(simulator.profit_ratio * 0.10, 2) == profit
+        with pytest.raises(ValueError):
+            Simulator(FlatStrategy(0.1), roll_under=1)
+
+    def test_strategies(self):
+        bankrolls = np.array([10.0, 5.0])
+        bets = FlatStrategy(0.1).bet_sizes(bankrolls, None, None)
+        assert bets.tolist() == [0.1, 0.1]
+        bets = ProportionalStrategy(0.1).bet_sizes(bankrolls, None, None)
+        assert bets.tolist() == [1.0, 0.5]
+        strategy = MartingaleStrategy(0.1)
+        bets = strategy.bet_sizes(bankrolls, None, None)
+        assert bets.tolist() == [0.1, 0.1]
+        # doubles after a loss, resets after a win
+        bets = strategy.bet_sizes(bankrolls, bets, np.array([False, True]))
+        assert bets.tolist() == [0.2, 0.1]
+
+    def test_run(self):
+        """Runs are reproducible and lose the house edge on average."""
+        simulator = Simulator(FlatStrategy(0.1), roll_under=50, bankroll=10)
+        result = simulator.run(sessions=2000, rolls=100, seed=42)
+        summary = result.summary()
+        assert summary == simulator.run(2000, 100, seed=42).summary()
+        assert summary != simulator.run(2000, 100, seed=43).summary()
+        assert summary["sessions"] == 2000
+        assert summary["ruin_probability"] == 0
+        # 10 Ether wagered per session
+        assert -0.3 < summary["expected_profit"] < 0.1
+        assert summary["house_profit"] == pytest.approx(-result.profits.sum())
+        assert list(summary["max_drawdown_percentiles"]) == [50, 90, 99]
+
+    def test_run_processes(self):
+        simulator = Simulator(MartingaleStrategy(1), bankroll=10)
+        result = simulator.run(sessions=1001, rolls=50, seed=1, processes=2)
+        assert len(result.final_bankrolls) == 1001
+        assert len(result.house_profits) == 50
+        assert result.summary() == (
+            simulator.run(1001, 50, seed=1, processes=2).summary()
+        )
+        # bets are capped to the bankroll, so ruined players end at zero
+        assert result.ruined.any()
+        assert (result.final_bankrolls[result.ruined] == 0).all()
+        assert (result.final_bankrolls >= 0).all()
+
+    def test_house_max_drawdown(self):
+        result = SimulationResult(
+            10,
+            np.zeros(1),
+            np.zeros(1),
+            np.zeros(1, dtype=bool),
+            np.array([1.0, -3.0, 2.0, -1.0, 4.0]),
+        )
+        assert result.house_max_drawdown == 3
@@ -1,14 +1,75 @@
 import json
+import pickle
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest import mock
 
+import pytest
 from hexbytes.main import HexBytes
+from web3 import HTTPProvider
 from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
 
 from pyetheroll.constants import ChainID
 from pyetheroll.transaction_debugger import (
+    ContractCallDecoder,
+    JSONRPCBatchClient,
     TransactionDebugger,
     decode_contract_call,
+    thaw,
 )
+from tests.test_etheroll import TestEtheroll as EtherollFixtures
+
+
+class FakeJSONRPCHandler(BaseHTTPRequestHandler):
+    """Serves `eth_getTransactionReceipt` batches from the server receipts."""
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        batch = json.loads(self.rfile.read(length))
+        self.server.batches.append(batch)
+        responses = [
+            {
+                "jsonrpc": "2.0",
+                "id": request["id"],
+                "result": self.server.receipts.get(request["params"][0]),
+            }
+            for request in batch
+        ]
+        # batch responses order isn't guaranteed
+        responses = responses[::-1]
+        if self.server.error is not None:
+            responses = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": self.server.error,
+            }
+        body = json.dumps(responses)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def fake_jsonrpc():
+    server = Server(("127.0.0.1", 0), FakeJSONRPCHandler)
+    server.receipts = {}
+    server.error = None
+    server.batches = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 class TestTransactionDebugger:
@@ -263,6 +324,49 @@ class TestTransactionDebugger:
             "27bd6bb4c034ff82359aefd7443775c4"
         )
 
+    def test_methods_registry(self):
+        """
+        Methods infos are indexed by topic0 and 4-byte selector and the
+        compiled tables are shared by debuggers built from the same ABI.
+        """
+        json_abi = (
+            '[{"constant":false,"inputs":[{"name":"_to","type":"address"},{"na'
+            'me":"_value","type":"uint256"}],"name":"transfer","outputs":[{"na'
+            'me":"success","type":"bool"}],"payable":false,"type":"function"},'
+            '{"anonymous":false,"inputs":[{"indexed":true,"name":"BetID","type'
+            '":"bytes32"},{"indexed":true,"name":"PlayerAddress","type":"addre'
+            'ss"},{"indexed":true,"name":"RefundValue","type":"uint256"}],"nam'
+            'e":"LogRefund","type":"event"}]'
+        )
+        transaction_debugger = TransactionDebugger(json.loads(json_abi))
+        methods_infos = transaction_debugger.methods_infos
+        log_refund = methods_infos["LogRefund"]
+        transfer = methods_infos["transfer"]
+        assert thaw(transaction_debugger._methods_by_topic) == {
+            bytes(log_refund["sha3"]): log_refund
+        }
+        assert thaw(transaction_debugger._methods_by_selector) == {
+            bytes.fromhex("a9059cbb"): transfer
+        }
+        assert log_refund["decode_types"] == ["bytes32", "address", "uint256"]
+        assert log_refund["names"] == ["BetID", "PlayerAddress", "RefundValue"]
+        # callers get plain copies, same types as the ABI
+        assert log_refund["abi"] == json.loads(json_abi)[1]
+        assert pickle.loads(pickle.dumps(methods_infos)) == methods_infos
+        with mock.patch("web3.Web3.keccak") as m_keccak:
+            other_debugger = TransactionDebugger(json.loads(json_abi))
+        assert m_keccak.call_args_list == []
+        assert other_debugger._methods_infos is (
+            transaction_debugger._methods_infos
+        )
+        # altering a copy doesn't alter the shared read only tables
+        log_refund["abi"]["inputs"][0]["name"] = "betId"
+        assert other_debugger.methods_infos["LogRefund"]["names"][0] == (
+            "BetID"
+        )
+        with pytest.raises(TypeError):
+            other_debugger._methods_infos["transfer"] = log_refund
+
     def test_decode_contract_call(self):
         """
         Uses actual data from:
@@ -292,6 +396,48 @@ class TestTransactionDebugger:
             1000000000000000000,
         )
 
+    def test_contract_call_decoder(self):
+        """
+        Calls are decoded in bulk, single `uint256` argument ones without
+        going through `decode_abi()`.
+        """
+        transfer_abi = json.loads(
+            '{"constant":false,"inputs":[{"name":"_to","type":"address"},{"na'
+            'me":"_value","type":"uint256"}],"name":"transfer","outputs":[{"na'
+            'me":"success","type":"bool"}],"payable":false,"type":"function"}'
+        )
+        contract_abi = [EtherollFixtures.player_roll_dice_abi, transfer_abi]
+        call_decoder = ContractCallDecoder(contract_abi)
+        assert call_decoder.uint256_functions == {"dc6dd152": "playerRollDice"}
+        calls_data = [
+            "0xdc6dd152" + f"{roll_under:064x}" for roll_under in range(2, 99)
+        ]
+        transfer_call_data = (
+            "a9059cbb00000000000000000000000067fa2c06c9c6d4332f330e14a66bdf18"
+            "73ef3d2b0000000000000000000000000000000000000000000000000de0b6b3"
+            "a7640000"
+        )
+        with mock.patch(
+            "pyetheroll.transaction_debugger.decode_abi"
+        ) as m_decode_abi:
+            decoded_calls = call_decoder.decode_many(calls_data)
+        assert m_decode_abi.call_args_list == []
+        assert decoded_calls == [
+            ("playerRollDice", (roll_under,)) for roll_under in range(2, 99)
+        ]
+        assert decoded_calls[0] == call_decoder.decode(calls_data[0])
+        assert call_decoder.decode_many([transfer_call_data]) == [
+            (
+                "transfer",
+                (
+                    "0x67fa2c06c9c6d4332f330e14a66bdf1873ef3d2b",
+                    1000000000000000000,
+                ),
+            )
+        ]
+        with pytest.raises(ValueError, match="Unknown function selector"):
+            call_decoder.decode_many(["0x12345678"])
+
     def test_decode_contract_call_callback(self):
         """
         Decode `__callback()` method call.
@@ -377,107 +523,109 @@ class TestTransactionDebugger:
             return abi2
         return None
 
-    def test_decode_transaction_logs(self):
-        """
-        Mocking `web3.eth.Eth.getTransactionReceipt()` response and verifies
-        decoding transaction works as expected.
-        """
-        mocked_logs = [
-            AttributeDict(
-                {
-                    "address": "0xCBf1735Aad8C4B337903cD44b419eFE6538aaB40",
-                    "topics": [
-                        HexBytes(
-                            "b76d0edd90c6a07aa3ff7a222d7f5933"
-                            "e29c6acc660c059c97837f05c4ca1a84"
-                        )
-                    ],
-                    "data": (
-                        "000000000000000000000000fe8a5f3a"
-                        "7bb446e1cb4566717691cd3139289ed4"
+    transaction_logs = [
+        AttributeDict(
+            {
+                "address": "0xCBf1735Aad8C4B337903cD44b419eFE6538aaB40",
+                "topics": [
+                    HexBytes(
+                        "b76d0edd90c6a07aa3ff7a222d7f5933"
+                        "e29c6acc660c059c97837f05c4ca1a84"
+                    )
+                ],
+                "data": (
+                    "000000000000000000000000fe8a5f3a"
+                    "7bb446e1cb4566717691cd3139289ed4"
+                    "b0230ab70b78e47050766089ea333f2f"
+                    "f7ad41c6f31e8bed8c2acfcb8e911841"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000100"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000140"
+                    "00000000000000000000000000000000"
+                    "000000000000000000000000000395f8"
+                    "11000000000000000000000000000000"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000000"
+                    "000000000000000000000004a817c800"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000006"
+                    "6e657374656400000000000000000000"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000000"
+                    "000000000000000000000000000001b4"
+                    "5b55524c5d205b276a736f6e28687474"
+                    "70733a2f2f6170692e72616e646f6d2e"
+                    "6f72672f6a736f6e2d7270632f312f69"
+                    "6e766f6b65292e726573756c742e7261"
+                    "6e646f6d5b2273657269616c4e756d62"
+                    "6572222c2264617461225d272c20275c"
+                    "6e7b226a736f6e727063223a22322e30"
+                    "222c226d6574686f64223a2267656e65"
+                    "726174655369676e6564496e74656765"
+                    "7273222c22706172616d73223a7b2261"
+                    "70694b6579223a247b5b646563727970"
+                    "745d20424b6733544373376c6b7a4e72"
+                    "316b523670786a50434d32534f656a63"
+                    "466f6a55504d544f73426b432f343748"
+                    "485066317350326f78564c546a4e4275"
+                    "2b736c523953675a797144746a564f56"
+                    "35597a67313269556b62756270304470"
+                    "636a434564654a54486e477743366744"
+                    "3732394755566f47766f393668757877"
+                    "526f5a6c436a594f3830725771325747"
+                    "596f522f4c433357616d704475767632"
+                    "426f3d7d2c226e223a312c226d696e22"
+                    "3a312c226d6178223a3130302c227265"
+                    "706c6163656d656e74223a747275652c"
+                    "2262617365223a3130247b5b6964656e"
+                    "746974795d20227d227d2c226964223a"
+                    "31247b5b6964656e746974795d20227d"
+                    "227d275d000000000000000000000000"
+                ),
+            }
+        ),
+        AttributeDict(
+            {
+                "address": "0xFE8a5f3a7Bb446e1cB4566717691cD3139289ED4",
+                "topics": [
+                    HexBytes(
+                        "1cb5bfc4e69cbacf65c8e05bdb84d7a3"
+                        "27bd6bb4c034ff82359aefd7443775c4"
+                    ),
+                    HexBytes(
                         "b0230ab70b78e47050766089ea333f2f"
                         "f7ad41c6f31e8bed8c2acfcb8e911841"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000100"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000140"
-                        "00000000000000000000000000000000"
-                        "000000000000000000000000000395f8"
-                        "11000000000000000000000000000000"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000000"
-                        "000000000000000000000004a817c800"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000006"
-                        "6e657374656400000000000000000000"
-                        "00000000000000000000000000000000"
-                        "00000000000000000000000000000000"
-                        "000000000000000000000000000001b4"
-                        "5b55524c5d205b276a736f6e28687474"
-                        "70733a2f2f6170692e72616e646f6d2e"
-                        "6f72672f6a736f6e2d7270632f312f69"
-                        "6e766f6b65292e726573756c742e7261"
-                        "6e646f6d5b2273657269616c4e756d62"
-                        "6572222c2264617461225d272c20275c"
-                        "6e7b226a736f6e727063223a22322e30"
-                        "222c226d6574686f64223a2267656e65"
-                        "726174655369676e6564496e74656765"
-                        "7273222c22706172616d73223a7b2261"
-                        "70694b6579223a247b5b646563727970"
-                        "745d20424b6733544373376c6b7a4e72"
-                        "316b523670786a50434d32534f656a63"
-                        "466f6a55504d544f73426b432f343748"
-                        "485066317350326f78564c546a4e4275"
-                        "2b736c523953675a797144746a564f56"
-                        "35597a67313269556b62756270304470"
-                        "636a434564654a54486e477743366744"
-                        "3732394755566f47766f393668757877"
-                        "526f5a6c436a594f3830725771325747"
-                        "596f522f4c433357616d704475767632"
-                        "426f3d7d2c226e223a312c226d696e22"
-                        "3a312c226d6178223a3130302c227265"
-                        "706c6163656d656e74223a747275652c"
-                        "2262617365223a3130247b5b6964656e"
-                        "746974795d20227d227d2c226964223a"
-                        "31247b5b6964656e746974795d20227d"
-                        "227d275d000000000000000000000000"
                     ),
-                }
-            ),
-            AttributeDict(
-                {
-                    "address": "0xFE8a5f3a7Bb446e1cB4566717691cD3139289ED4",
-                    "topics": [
-                        HexBytes(
-                            "1cb5bfc4e69cbacf65c8e05bdb84d7a3"
-                            "27bd6bb4c034ff82359aefd7443775c4"
-                        ),
-                        HexBytes(
-                            "b0230ab70b78e47050766089ea333f2f"
-                            "f7ad41c6f31e8bed8c2acfcb8e911841"
-                        ),
-                        HexBytes(
-                            "00000000000000000000000066d4bacf"
-                            "e61df23be813089a7a6d1a749a5c936a"
-                        ),
-                        HexBytes(
-                            "00000000000000000000000000000000"
-                            "0000000000000000016a98b78c556c34"
-                        ),
-                    ],
-                    "data": (
-                        "00000000000000000000000000000000"
-                        "00000000000000000007533f2ecb6c34"
-                        "00000000000000000000000000000000"
-                        "0000000000000000016345785d8a0000"
+                    HexBytes(
+                        "00000000000000000000000066d4bacf"
+                        "e61df23be813089a7a6d1a749a5c936a"
+                    ),
+                    HexBytes(
                         "00000000000000000000000000000000"
-                        "00000000000000000000000000000062"
+                        "0000000000000000016a98b78c556c34"
                     ),
-                }
-            ),
-        ]
+                ],
+                "data": (
+                    "00000000000000000000000000000000"
+                    "00000000000000000007533f2ecb6c34"
+                    "00000000000000000000000000000000"
+                    "0000000000000000016345785d8a0000"
+                    "00000000000000000000000000000000"
+                    "00000000000000000000000000000062"
+                ),
+            }
+        ),
+    ]
+
+    def test_decode_transaction_logs(self):
+        """
+        Mocking `web3.eth.Eth.getTransactionReceipt()` response and verifies
+        decoding transaction works as expected.
+        """
+        mocked_logs = self.transaction_logs
         chain_id = ChainID.ROPSTEN
         transaction_hash = (
             "0x"
@@ -505,3 +653,109 @@ class TestTransactionDebugger:
         assert decoded_method["method_info"]["definition"] == (
             "LogBet(bytes32,address,uint256,uint256,uint256,uint256)"
         )
+
+    def test_decode_method_unknown_topic(self):
+        """Logs of events missing from the ABI aren't decoded."""
+        transaction_debugger = TransactionDebugger(
+            [EtherollFixtures.log_bet_abi]
+        )
+        # e.g. a `Transfer` log emitted by a token in the same transaction
+        topics = [
+            HexBytes(
+                "ddf252ad1be2c89b69c2b068fc378daa"
+                "952ba7f163c4a11628f55a4df523b3ef"
+            )
+        ]
+        with pytest.raises(StopIteration, match="Unknown event topic"):
+            transaction_debugger.decode_method(topics, "0x")
+
+    def test_decode_transaction_logs_abi_cache(self):
+        """ABIs are fetched and read once per contract, not once per log."""
+        mocked_logs = self.transaction_logs * 3
+        with mock.patch(
+            "web3.eth.Eth.getTransactionReceipt"
+        ) as m_getTransactionReceipt, mock.patch(
+            "etherscan.contracts.Contract.get_abi",
+            side_effect=self.m_get_abi,
+            autospec=True,
+        ) as m_get_abi, mock.patch(
+            "pyetheroll.abi_store.AbiStore.get", autospec=True
+        ) as m_get:
+            m_getTransactionReceipt.return_value.logs = mocked_logs
+            m_get.return_value = None
+            decoded_methods = TransactionDebugger.decode_transaction_logs(
+                ChainID.ROPSTEN, "0x330df22d"
+            )
+        assert len(decoded_methods) == 6
+        assert m_get_abi.call_count == 2
+        assert m_get.call_count == 2
+        # debuggers are kept per contract
+        transaction_debugger = TransactionDebugger.get_or_create(
+            ChainID.ROPSTEN, mocked_logs[0]["address"]
+        )
+        assert len(TransactionDebugger._registry) == 2
+        assert decoded_methods[0]["method_info"] == (
+            transaction_debugger.methods_infos["Log1"]
+        )
+
+    def test_decode_transactions_logs(self, fake_jsonrpc):
+        """Receipts are fetched by batches and their logs decoded."""
+        raw_logs = [
+            {
+                "address": log["address"],
+                "topics": [topic.hex() for topic in log["topics"]],
+                "data": "0x" + log["data"],
+            }
+            for log in self.transaction_logs
+        ]
+        transaction_hashes = [f"0x{index:064x}" for index in range(5)]
+        fake_jsonrpc.receipts = {
+            transaction_hash: {
+                "transactionHash": transaction_hash,
+                # each transaction gets a different number of logs
+                "logs": raw_logs[: index % 3],
+            }
+            for index, transaction_hash in enumerate(transaction_hashes)
+        }
+        host, port = fake_jsonrpc.server_address
+        client = JSONRPCBatchClient(
+            HTTPProvider(f"http://{host}:{port}"), batch_size=2
+        )
+        with mock.patch(
+            "etherscan.contracts.Contract.get_abi",
+            side_effect=self.m_get_abi,
+            autospec=True,
+        ) as m_get_abi:
+            transactions_logs = TransactionDebugger.decode_transactions_logs(
+                ChainID.ROPSTEN, transaction_hashes, client
+            )
+        assert [len(batch) for batch in fake_jsonrpc.batches] == [2, 2, 1]
+        assert fake_jsonrpc.batches[0][1] == {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_getTransactionReceipt",
+            "params": [transaction_hashes[1]],
+        }
+        assert [len(decoded) for decoded in transactions_logs] == [
+            0,
+            1,
+            2,
+            0,
+            1,
+        ]
+        decoded_method = transactions_logs[2][1]
+        assert decoded_method["method_info"]["definition"] == (
+            "LogBet(bytes32,address,uint256,uint256,uint256,uint256)"
+        )
+        assert decoded_method["call"]["PlayerNumber"] == 98
+        # one ABI lookup per contract
+        assert m_get_abi.call_count == 2
+        fake_jsonrpc.receipts.clear()
+        with pytest.raises(TransactionNotFound):
+            client.get_transaction_receipts(transaction_hashes)
+        # the node can reject the whole batch with a single error
+        error = {"code": -32600, "message": "batch too large"}
+        fake_jsonrpc.error = error
+        with pytest.raises(ValueError) as ex_info:
+            client.get_transaction_receipts(transaction_hashes)
+        assert ex_info.value.args == (error,)
@@ -1,6 +1,15 @@
 from datetime import datetime
+from unittest import mock
 
-from pyetheroll.utils import EtherollUtils, timestamp2datetime
+import numpy as np
+
+from pyetheroll.utils import (
+    EtherollUtils,
+    get_cache_dir,
+    round_array,
+    timestamp2datetime,
+    wei_to_ether,
+)
 
 
 class TestEtherollUtils:
@@ -15,8 +24,47 @@ class TestEtherollUtils:
         payout = EtherollUtils.compute_profit(bet_size, chances_win)
         assert payout is None
 
+    def test_compute_profits(self):
+        """Same results as the scalar version, invalid chances are masked."""
+        bet_sizes = np.arange(1, 1001) / 1000
+        chances_win = np.arange(0, 101)
+        profits, payouts = EtherollUtils.compute_profits(
+            bet_sizes[:, np.newaxis], chances_win
+        )
+        assert profits.shape == payouts.shape == (1000, 101)
+        assert profits.mask[:, [0, 100]].all()
+        assert not profits.mask[:, 1:100].any()
+        expected_profits = [
+            [
+                EtherollUtils.compute_profit(bet_size, chances)
+                for chances in range(1, 100)
+            ]
+            for bet_size in bet_sizes.tolist()
+        ]
+        assert profits[:, 1:100].tolist() == expected_profits
+        profits, payouts = EtherollUtils.compute_profits(0.10, 34)
+        assert profits == 0.19
+        assert payouts == 0.29
+
+    def test_compute_profit_wei(self):
+        """Integer divisions are applied in the contract order."""
+        profit = EtherollUtils.compute_profit_wei(10 ** 17, 34)
+        assert profit == 191176470588235293
+        assert wei_to_ether(profit) == 0.19
+        # 0.45 Ether bet rolling under 2 gives a 44.1 Ether profit
+        profit = EtherollUtils.compute_profit_wei(450000000000000000, 1)
+        assert profit == 44100000000000000000
+        assert EtherollUtils.compute_profit_wei(10 ** 17, 100) is None
+
 
 class TestUtils:
+    def test_round_array(self):
+        """Ties are rounded on their exact decimal value like `round()`."""
+        values = [0.125, 2.675, 1.005, 0.5, -0.125]
+        assert round_array(values, 2).tolist() == [
+            round(value, 2) for value in values
+        ]
+
     def test_timestamp2datetime(self):
         assert timestamp2datetime("1566645978") == (
             datetime(2019, 8, 24, 11, 26, 18)
@@ -24,3 +72,9 @@ class TestUtils:
         assert timestamp2datetime("0x5d611eda") == (
             datetime(2019, 8, 24, 11, 26, 18)
         )
+
+    def test_get_cache_dir(self):
+        with mock.patch.dict("os.environ", {"PYETHEROLL_CACHE_DIR": "/cache"}):
+            assert get_cache_dir() == "/cache"
+        with mock.patch.dict("os.environ", {"HOME": "/home/user"}, clear=True):
+            assert get_cache_dir() == "/home/user/.cache/pyetheroll"